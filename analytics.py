@@ -0,0 +1,447 @@
+import argparse, base64, html, io, math, sys, time
+
+import numpy as np
+
+import runway_engine
+import workload
+from event_store import STATE_CODE, QUEUED, WAITING, RUNNING, COMPLETED
+from policies import POLICIES, make_policy
+from protocol import RECORD_DTYPE
+from recording import SessionReader
+
+# Post-run analytics over a completed run's event log.
+#
+# The log (a recording's RECORD_DTYPE array, or engine Events) is reduced once to one row
+# per plane: arrival (first QUEUED/WAITING), start (RUNNING), end (COMPLETED), runway,
+# service and priority. Everything after that is interval arithmetic on those columns:
+# runway occupancy and queue length are step functions built from sorted +1/-1 changes,
+# and per-bin averages are differences of their running integral at the bin edges, so
+# there is no per-event Python loop anywhere. A what-if replays the same arrivals (times,
+# priorities and service times) through RunwayEngine with a different runway count.
+#
+# matplotlib is only imported to export a PNG/HTML report.
+
+PERCENTILES = (50, 90, 99)
+
+
+class RunLog:
+    # Per-plane columns, indexed by plane (not pid). NaN marks what never happened in the
+    # log: no start for a plane still waiting at the end, no end for one still on a runway.
+
+    def __init__(self, pid, priority, arrival, start, end, runway, service, num_runways,
+                 horizon=None):
+        self.pid = pid
+        self.priority = priority
+        self.arrival = arrival
+        self.start = start
+        self.end = end
+        self.runway = runway
+        self.service = service
+        self.num_runways = num_runways
+        known = np.concatenate([arrival, start, end])
+        known = known[~np.isnan(known)]
+        self.horizon = horizon or (float(known.max()) if len(known) else 0.0)
+
+    def __len__(self):
+        return len(self.pid)
+
+    @property
+    def wait(self):
+        return self.start - self.arrival
+
+    def arrivals(self):
+        # the run's arrival trace, for re-simulation
+        order = np.argsort(self.arrival, kind='stable')
+        order = order[~np.isnan(self.arrival[order])]
+        service = self.service[order]
+        for pid, t, prio, d in zip(self.pid[order].tolist(), self.arrival[order].tolist(),
+                                   self.priority[order].tolist(), service.tolist()):
+            yield workload.Arrival(t, pid, prio, None if math.isnan(d) else d)
+
+
+def _first(pids, values, size, mask):
+    out = np.full(size, np.nan)
+    p = pids[mask]
+    if len(p):
+        uniq, idx = np.unique(p, return_index=True)
+        out[uniq] = values[mask][idx]
+    return out
+
+
+def from_records(records, priorities=None, num_runways=None):
+    # priorities: the CONFIG line's list (pid i has priorities[i - 1]); streamed planes
+    # carry theirs in the QUEUED event instead
+    if not len(records):
+        empty = np.empty(0)
+        return RunLog(empty.astype(np.int64), empty.astype(np.int64), empty, empty, empty,
+                      empty.astype(np.int64), empty, num_runways or 0)
+    pids = records['pid'].astype(np.int64)
+    state = records['state']
+    times = records['time'].astype(np.float64)
+    value = records['value'].astype(np.float64)
+    size = int(pids.max()) + 1
+
+    arrival = _first(pids, times, size, (state == QUEUED) | (state == WAITING))
+    start = _first(pids, times, size, state == RUNNING)
+    service = _first(pids, value, size, state == RUNNING)
+    end = _first(pids, times, size, state == COMPLETED)
+    runway = _first(pids, records['runway'].astype(np.float64), size, state == RUNNING)
+    prio = _first(pids, value, size, state == QUEUED)
+    if priorities:
+        config = np.full(size, np.nan)
+        n = min(len(priorities), size - 1)
+        config[1:n + 1] = priorities[:n]
+        prio = np.where(np.isnan(prio), config, prio)
+
+    seen = ~(np.isnan(arrival) & np.isnan(start))
+    seen[0] = False
+    planes = np.flatnonzero(seen)
+    arrival = arrival[planes]
+    start = start[planes]
+    # a plane first seen RUNNING (log began mid-run) arrived no later than it started
+    arrival = np.where(np.isnan(arrival), start, arrival)
+    if num_runways is None:
+        runways = records['runway'][state == RUNNING]
+        num_runways = int(runways.max()) if len(runways) else 0
+    return RunLog(planes, np.nan_to_num(prio[planes]).astype(np.int64), arrival, start,
+                  end[planes], np.nan_to_num(runway[planes]).astype(np.int64),
+                  service[planes], num_runways, float(times.max()))
+
+
+def records_from_events(events):
+    return np.array([(ev.pid, STATE_CODE[ev.state], ev.runway, ev.value, ev.time)
+                     for ev in events], dtype=RECORD_DTYPE)
+
+
+def from_recording(path):
+    reader = SessionReader(path)
+    try:
+        num_runways, priorities = runway_engine.parse_config(reader.config)
+    except ValueError:
+        num_runways, priorities = None, None
+    try:
+        return from_records(reader.records, priorities, num_runways)
+    finally:
+        reader.close()
+
+
+def from_segments(segments, num_runways=None):
+    # a Gantt segment list (event_store.SegmentStore): occupancy only, arrivals are unknown
+    runway = segments.view('runway').astype(np.int64)
+    start = segments.view('start').astype(np.float64)
+    end = segments.view('end').astype(np.float64)
+    nan = np.full(len(runway), np.nan)
+    return RunLog(segments.view('plane').astype(np.int64), np.zeros(len(runway), np.int64),
+                  nan, start, end, runway, end - start,
+                  num_runways or (int(runway.max()) if len(runway) else 0))
+
+
+def occupancy(starts, ends):
+    # how many [start, end) intervals are open: (change times, level from each time on)
+    t = np.concatenate([starts, ends])
+    step = np.concatenate([np.ones(len(starts), np.int64), -np.ones(len(ends), np.int64)])
+    order = np.argsort(t, kind='stable')
+    t, level = t[order], np.cumsum(step[order])
+    keep = np.append(t[1:] != t[:-1], True) if len(t) else np.empty(0, bool)
+    return t[keep], level[keep]
+
+
+def binned_mean(t, level, edges):
+    # time-average of a step function over each [edges[k], edges[k + 1])
+    if not len(t):
+        return np.zeros(len(edges) - 1)
+    area = np.concatenate([[0.0], np.cumsum(level[:-1] * np.diff(t))])
+    j = np.searchsorted(t, edges, side='right') - 1
+    jc = np.maximum(j, 0)
+    at_edge = np.where(j < 0, 0.0, area[jc] + level[jc] * (edges - t[jc]))
+    return np.diff(at_edge) / np.diff(edges)
+
+
+def binned_max(t, level, edges):
+    # peak of a step function over each bin: its level entering the bin or any change inside
+    j = np.searchsorted(t, edges[:-1], side='right') - 1
+    peak = np.where(j < 0, 0, level[np.maximum(j, 0)]) if len(t) else np.zeros(len(edges) - 1)
+    b = np.searchsorted(edges, t, side='right') - 1
+    inside = (b >= 0) & (b < len(edges) - 1)
+    np.maximum.at(peak, b[inside], level[inside])
+    return peak
+
+
+def _closed(run, column):
+    # open intervals run to the end of the log
+    return np.where(np.isnan(column), run.horizon, column)
+
+
+def bin_edges(run, bin_s=None):
+    horizon = max(run.horizon, 1e-9)
+    bin_s = bin_s or horizon / 200
+    edges = np.arange(0.0, horizon, bin_s)
+    # no sliver of a last bin when the horizon is (to rounding) a multiple of bin_s
+    return np.append(edges[edges < horizon - bin_s * 1e-6], horizon)
+
+
+def utilisation_timeline(run, edges):
+    # (num_runways, bins) busy fraction of each runway per bin
+    started = ~np.isnan(run.start)
+    start, end, runway = run.start[started], _closed(run, run.end)[started], run.runway[started]
+    out = np.zeros((run.num_runways, len(edges) - 1))
+    order = np.argsort(runway, kind='stable')
+    bounds = np.searchsorted(runway[order], np.arange(1, run.num_runways + 2))
+    for r in range(run.num_runways):
+        sel = order[bounds[r]:bounds[r + 1]]
+        out[r] = binned_mean(*occupancy(start[sel], end[sel]), edges)
+    return out
+
+
+def utilisation(run):
+    started = ~np.isnan(run.start)
+    busy = np.bincount(run.runway[started],
+                       weights=_closed(run, run.end)[started] - run.start[started],
+                       minlength=run.num_runways + 1)[1:run.num_runways + 1]
+    return busy / run.horizon if run.horizon else busy
+
+
+def queue_length(run):
+    known = ~np.isnan(run.arrival)
+    return occupancy(run.arrival[known], _closed(run, run.start)[known])
+
+
+def wait_by_priority(run):
+    # {priority: {count, mean, p50, p90, p99, max}} over planes that reached a runway
+    wait = run.wait
+    ok = ~np.isnan(wait)
+    prio, wait = run.priority[ok], wait[ok]
+    order = np.lexsort((wait, prio))
+    prio, wait = prio[order], wait[order]
+    classes, first = np.unique(prio, return_index=True)
+    bounds = np.append(first, len(prio))
+    stats = {}
+    for c, lo, hi in zip(classes.tolist(), bounds[:-1], bounds[1:]):
+        w = wait[lo:hi]
+        row = {'count': hi - lo, 'mean': float(w.mean()), 'max': float(w[-1])}
+        for q, v in zip(PERCENTILES, np.percentile(w, PERCENTILES)):
+            row[f'p{q}'] = float(v)
+        stats[c] = row
+    return stats
+
+
+def summarise(run):
+    wait = run.wait
+    wait = wait[~np.isnan(wait)]
+    util = utilisation(run)
+    return {
+        'runways': run.num_runways,
+        'planes': len(run),
+        'completed': int(np.count_nonzero(~np.isnan(run.end))),
+        'horizon': run.horizon,
+        'wait_mean': float(wait.mean()) if len(wait) else float('nan'),
+        'wait_p99': float(np.percentile(wait, 99)) if len(wait) else float('nan'),
+        'utilisation': float(util.mean()) if len(util) else 0.0,
+    }
+
+
+def what_if(run, runway_counts, policy=None):
+    # re-simulate the same arrivals with each runway count; transitions only
+    rows = []
+    for n in runway_counts:
+        engine = runway_engine.RunwayEngine(
+            n, [], progress_interval=None, arrivals=run.arrivals(),
+            policy=make_policy(policy) if policy else None)
+        alt = from_records(records_from_events(engine.run()), num_runways=n)
+        rows.append(summarise(alt))
+    return rows
+
+
+class Report:
+    def __init__(self, run, bin_s=None, what_if_runways=(), policy=None):
+        t0 = time.perf_counter()
+        self.run = run
+        self.edges = bin_edges(run, bin_s)
+        self.summary = summarise(run)
+        self.utilisation = utilisation(run)
+        self.timeline = utilisation_timeline(run, self.edges)
+        self.queue_t, self.queue_level = queue_length(run)
+        self.queue_binned = binned_mean(self.queue_t, self.queue_level, self.edges)
+        self.queue_peak = binned_max(self.queue_t, self.queue_level, self.edges)
+        self.waits = wait_by_priority(run)
+        self.analysis_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        self.what_if = what_if(run, what_if_runways, policy) if what_if_runways else []
+        self.what_if_s = time.perf_counter() - t0
+
+    def summary_lines(self):
+        s = self.summary
+        lines = [f"{s['planes']} planes ({s['completed']} completed) on {s['runways']} runways "
+                 f"over {s['horizon']:.1f}s; mean wait {s['wait_mean']:.2f}s, "
+                 f"p99 {s['wait_p99']:.2f}s; peak queue "
+                 f"{int(self.queue_level.max()) if len(self.queue_level) else 0}",
+                 "utilisation " + " ".join(f"R{i + 1}={u:.0%}"
+                                            for i, u in enumerate(self.utilisation)),
+                 f"{'prio':>5}{'count':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for c, w in self.waits.items():
+            lines.append(f"{c:>5}{w['count']:>8}{w['mean']:>9.2f}{w['p50']:>9.2f}"
+                         f"{w['p90']:>9.2f}{w['p99']:>9.2f}{w['max']:>9.2f}")
+        if self.what_if:
+            lines.append(f"{'runways':>7}{'makespan':>10}{'wait':>9}{'p99':>9}{'util':>7}")
+            for row in self.what_if:
+                lines.append(f"{row['runways']:>7}{row['horizon']:>10.1f}{row['wait_mean']:>9.2f}"
+                             f"{row['wait_p99']:>9.2f}{row['utilisation']:>7.0%}")
+        return lines
+
+    def figure(self):
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(12, 8), layout='constrained')
+        ax_util, ax_queue, ax_wait, ax_what = fig.subplots(2, 2).ravel()
+        mid = (self.edges[:-1] + self.edges[1:]) / 2
+        if self.run.num_runways > 8:
+            ax_util.imshow(self.timeline, aspect='auto', interpolation='nearest', vmin=0, vmax=1,
+                           extent=(0, self.edges[-1], self.run.num_runways + 0.5, 0.5))
+            ax_util.set_ylabel("runway")
+        else:
+            for r, row in enumerate(self.timeline):
+                ax_util.plot(mid, row, label=f"R{r + 1}")
+            ax_util.set_ylim(0, 1.05)
+            ax_util.set_ylabel("busy fraction")
+            ax_util.legend(loc='lower right', fontsize=8)
+        ax_util.set_title("Runway utilisation")
+        ax_util.set_xlabel("time (s)")
+
+        # per-bin peak rather than the raw step curve, which can have millions of points
+        ax_queue.fill_between(self.edges[:-1], self.queue_peak, step='post', alpha=0.35,
+                              label="bin peak")
+        ax_queue.plot(mid, self.queue_binned, lw=1.5, label="bin mean")
+        ax_queue.set_title("Planes waiting")
+        ax_queue.set_xlabel("time (s)")
+        ax_queue.legend(loc='upper right', fontsize=8)
+
+        classes = list(self.waits)
+        x = np.arange(len(classes))
+        for k, q in enumerate(PERCENTILES):
+            ax_wait.bar(x + (k - 1) * 0.27, [self.waits[c][f'p{q}'] for c in classes], 0.27,
+                        label=f"p{q}")
+        ax_wait.set_xticks(x, [str(c) for c in classes])
+        ax_wait.set_title("Wait by priority class")
+        ax_wait.set_xlabel("priority")
+        ax_wait.set_ylabel("wait (s)")
+        ax_wait.legend(fontsize=8)
+
+        if self.what_if:
+            n = [row['runways'] for row in self.what_if]
+            ax_what.plot(n, [row['wait_mean'] for row in self.what_if], 'o-', label="mean wait")
+            ax_what.plot(n, [row['wait_p99'] for row in self.what_if], 's--', label="p99 wait")
+            ax_what.axvline(self.run.num_runways, color='grey', lw=0.8)
+            ax_what.set_xticks(n)
+            ax_what.set_xlabel("runways")
+            ax_what.set_ylabel("wait (s)")
+            ax_what.legend(fontsize=8)
+        else:
+            ax_what.axis('off')
+        ax_what.set_title("What-if: runway count")
+        return fig
+
+    def to_png(self, path):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = self.figure()
+        FigureCanvasAgg(fig)
+        fig.savefig(path, dpi=100)
+
+    def to_html(self, path, title="Runway run report"):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = self.figure()
+        FigureCanvasAgg(fig)
+        png = io.BytesIO()
+        fig.savefig(png, format='png', dpi=100)
+        image = base64.b64encode(png.getvalue()).decode('ascii')
+
+        def table(header, rows):
+            head = "".join(f"<th>{html.escape(h)}</th>" for h in header)
+            body = "".join("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row)
+                           + "</tr>" for row in rows)
+            return f"<table><tr>{head}</tr>{body}</table>"
+
+        s = self.summary
+        parts = [
+            f"<h1>{html.escape(title)}</h1>",
+            table(("planes", "completed", "runways", "horizon s", "mean wait s", "p99 wait s",
+                   "utilisation"),
+                  [(s['planes'], s['completed'], s['runways'], f"{s['horizon']:.1f}",
+                    f"{s['wait_mean']:.2f}", f"{s['wait_p99']:.2f}", f"{s['utilisation']:.1%}")]),
+            f'<img src="data:image/png;base64,{image}" alt="charts">',
+            "<h2>Runway utilisation</h2>",
+            table(("runway", "busy"), [(f"R{i + 1}", f"{u:.1%}")
+                                       for i, u in enumerate(self.utilisation)]),
+            "<h2>Wait by priority class (s)</h2>",
+            table(("priority", "count", "mean", "p50", "p90", "p99", "max"),
+                  [(c, w['count'], *(f"{w[k]:.2f}" for k in ('mean', 'p50', 'p90', 'p99', 'max')))
+                   for c, w in self.waits.items()]),
+        ]
+        if self.what_if:
+            parts += ["<h2>What-if: runway count</h2>",
+                      table(("runways", "makespan s", "mean wait s", "p99 wait s", "utilisation"),
+                            [(r['runways'], f"{r['horizon']:.1f}", f"{r['wait_mean']:.2f}",
+                              f"{r['wait_p99']:.2f}", f"{r['utilisation']:.1%}")
+                             for r in self.what_if])]
+        style = ("body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;"
+                 "margin:1em 0}td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}"
+                 "img{max-width:100%}")
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+                     f"<title>{html.escape(title)}</title><style>{style}</style></head>"
+                     f"<body>{''.join(parts)}</body></html>\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post-run analytics and what-if report")
+    parser.add_argument('recording', nargs='?', help="session recording (see --record)")
+    parser.add_argument('--workload', default=None,
+                        help="simulate this workload instead of reading a recording")
+    parser.add_argument('--runways', type=int, default=3, help="runways for --workload")
+    parser.add_argument('--horizon', type=float, default=None,
+                        help="simulated seconds for --workload (needed unless it has limit=)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bin', type=float, default=None,
+                        help="timeline bin width in seconds (default: 1/200 of the run)")
+    parser.add_argument('--what-if', default="",
+                        help="comma-separated runway counts to re-simulate, e.g. 2,4,5")
+    parser.add_argument('--policy', choices=list(POLICIES), default=None,
+                        help="waiting-queue policy for the what-if runs")
+    parser.add_argument('--html', default=None)
+    parser.add_argument('--png', default=None)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.recording:
+        run = from_recording(args.recording)
+    elif args.workload:
+        if args.horizon is None and 'limit=' not in args.workload \
+                and not args.workload.startswith('trace:'):
+            parser.error("an open-ended --workload needs --horizon or limit=")
+        engine = runway_engine.RunwayEngine(args.runways, [], seed=args.seed,
+                                            arrivals=workload.from_spec(args.workload, args.seed))
+        engine.reset()
+        records = records_from_events(engine.advance(args.horizon or math.inf))
+        t0 = time.perf_counter()
+        run = from_records(records, num_runways=args.runways)
+    else:
+        parser.error("give a recording or --workload")
+    load_s = time.perf_counter() - t0
+
+    counts = [int(n) for n in args.what_if.split(',') if n]
+    report = Report(run, args.bin, counts, args.policy)
+    print("\n".join(report.summary_lines()))
+    print(f"\nload {load_s * 1000:.0f} ms, analysis {report.analysis_s * 1000:.0f} ms"
+          + (f", what-if {report.what_if_s:.2f}s" if counts else ""))
+    if args.png:
+        report.to_png(args.png)
+        print(f"wrote {args.png}")
+    if args.html:
+        report.to_html(args.html)
+        print(f"wrote {args.html}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
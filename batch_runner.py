@@ -0,0 +1,159 @@
+import argparse, contextlib, csv, itertools, math, os, random, sys, time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from runway_engine import RunwayEngine
+from workload import SERVICE_TIMES
+
+Task = namedtuple('Task', 'run runways planes priorities service seed')
+
+MAX_RUNWAYS_COLUMNS = 16
+PRIORITY_KINDS = ('sequential', 'reverse', 'random', 'classes', 'fcfs')
+
+
+def make_priorities(kind, planes, rng):
+    if kind == 'sequential':
+        return list(range(1, planes + 1))
+    if kind == 'reverse':
+        return list(range(planes, 0, -1))
+    if kind == 'random':
+        prios = list(range(1, planes + 1))
+        rng.shuffle(prios)
+        return prios
+    if kind == 'classes':
+        return [rng.randint(1, 3) for _ in range(planes)]
+    if kind == 'fcfs':
+        return [1] * planes
+    raise ValueError(f"unknown priority assignment {kind!r}")
+
+
+def run_one(task):
+    rng = random.Random(task.seed)
+    priorities = make_priorities(task.priorities, task.planes, rng)
+    engine = RunwayEngine(task.runways, priorities, seed=rng.getrandbits(64),
+                          progress_interval=None, service_time=SERVICE_TIMES[task.service])
+    t0 = time.process_time()
+    queued_at = {}
+    waits = []
+    busy = [0.0] * task.runways
+    started = {}
+    makespan = 0.0
+    for ev in engine.run():
+        if ev.state == 'WAITING':
+            queued_at[ev.pid] = ev.time
+        elif ev.state == 'RUNNING':
+            waits.append(ev.time - queued_at.pop(ev.pid))
+            started[ev.pid] = ev.time
+        elif ev.state == 'COMPLETED':
+            busy[ev.runway - 1] += ev.time - started.pop(ev.pid)
+            makespan = ev.time
+    cpu = time.process_time() - t0
+
+    waits = np.asarray(waits)
+    util = [b / makespan if makespan else 0.0 for b in busy]
+    util += [math.nan] * (MAX_RUNWAYS_COLUMNS - len(util))
+    p95, p99 = np.percentile(waits, (95, 99)) if len(waits) else (math.nan, math.nan)
+    return (task.run, task.runways, task.planes, task.priorities, task.service, task.seed,
+            makespan, float(waits.mean()) if len(waits) else math.nan, float(p95), float(p99),
+            cpu, *util[:MAX_RUNWAYS_COLUMNS])
+
+
+RESULT_FIELDS = (('run', 'i8'), ('runways', 'i4'), ('planes', 'i4'), ('priorities', 'U12'),
+                 ('service', 'U12'), ('seed', 'i8'), ('makespan', 'f8'), ('wait_mean', 'f8'),
+                 ('wait_p95', 'f8'), ('wait_p99', 'f8'), ('cpu_s', 'f8')) + \
+                tuple((f'util_r{i + 1}', 'f8') for i in range(MAX_RUNWAYS_COLUMNS))
+RESULT_DTYPE = np.dtype(list(RESULT_FIELDS))
+
+
+def build_tasks(runways, planes, priorities, services, reps, base_seed):
+    grid = itertools.product(runways, planes, priorities, services, range(reps))
+    for run, (r, n, prio, service, rep) in enumerate(grid):
+        yield Task(run, r, n, prio, service, base_seed * 1_000_003 + run)
+
+
+def aggregate(results):
+    keys = ('runways', 'planes', 'priorities', 'service')
+    groups = np.unique(results[list(keys)])
+    table = []
+    for g in groups:
+        sel = results[(results['runways'] == g['runways']) & (results['planes'] == g['planes']) &
+                      (results['priorities'] == g['priorities']) & (results['service'] == g['service'])]
+        util = np.nanmean(np.stack([sel[f'util_r{i + 1}'] for i in range(g['runways'])]), axis=1)
+        table.append((g, len(sel), sel['makespan'].mean(), sel['wait_mean'].mean(),
+                      sel['wait_p95'].mean(), sel['wait_p99'].mean(), util))
+    return table
+
+
+def print_tables(table, out=sys.stdout):
+    out.write(f"{'runways':>7} {'planes':>7} {'priorities':>10} {'service':>11} {'runs':>5} "
+              f"{'makespan':>9} {'wait':>7} {'p95':>7} {'p99':>7}\n")
+    for g, n, makespan, wait, p95, p99, _ in table:
+        out.write(f"{g['runways']:>7} {g['planes']:>7} {g['priorities']:>10} {g['service']:>11} "
+                  f"{n:>5} {makespan:>9.1f} {wait:>7.2f} {p95:>7.2f} {p99:>7.2f}\n")
+    out.write("\nper-runway utilisation\n")
+    for g, _, _, _, _, _, util in table:
+        cells = " ".join(f"R{i + 1}={u:.2f}" for i, u in enumerate(util))
+        out.write(f"{g['runways']:>3}rw {g['planes']:>6}pl {g['priorities']:>10} "
+                  f"{g['service']:>11}  {cells}\n")
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo runway capacity batch runner")
+    parser.add_argument('--runways', type=_int_list, default=[2, 3, 4])
+    parser.add_argument('--planes', type=_int_list, default=[10, 100])
+    parser.add_argument('--priorities', default="sequential,random",
+                        help=f"comma list of: {', '.join(PRIORITY_KINDS)}")
+    parser.add_argument('--service', default="backend",
+                        help=f"comma list of: {', '.join(SERVICE_TIMES)}")
+    parser.add_argument('--reps', type=int, default=100, help="runs per grid point")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default="batch_results.csv",
+                        help="per-run results; .csv is streamed, .npy is written at the end")
+    args = parser.parse_args(argv)
+
+    if max(args.runways) > MAX_RUNWAYS_COLUMNS:
+        parser.error(f"at most {MAX_RUNWAYS_COLUMNS} runways per airport")
+    # Bad names would otherwise only surface as a KeyError inside every worker.
+    priorities, services = args.priorities.split(','), args.service.split(',')
+    for option, names, known in (('--priorities', priorities, PRIORITY_KINDS),
+                                 ('--service', services, SERVICE_TIMES)):
+        unknown = [n for n in names if n not in known]
+        if unknown:
+            parser.error(f"{option}: unknown {', '.join(unknown)} (choose from {', '.join(known)})")
+    tasks = list(build_tasks(args.runways, args.planes, priorities, services,
+                             args.reps, args.seed))
+    chunksize = max(1, len(tasks) // (args.workers * 8))
+    t0 = time.perf_counter()
+    rows = []
+    to_csv = not args.output.endswith('.npy')
+    with open(args.output, 'w', newline='') if to_csv else contextlib.nullcontext() as fh:
+        writer = csv.writer(fh) if to_csv else None
+        if writer:
+            writer.writerow(RESULT_DTYPE.names)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for row in pool.map(run_one, tasks, chunksize=chunksize):
+                rows.append(row)
+                if writer:
+                    writer.writerow(row)
+    wall = time.perf_counter() - t0
+
+    results = np.array(rows, dtype=RESULT_DTYPE)
+    if not to_csv:
+        np.save(args.output, results)
+    print_tables(aggregate(results))
+    cpu = results['cpu_s'].sum()
+    print(f"\n{len(results)} runs in {wall:.2f}s on {args.workers} workers "
+          f"(engine CPU {cpu:.2f}s, parallel efficiency {cpu / (wall * args.workers):.0%}) "
+          f"-> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
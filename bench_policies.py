@@ -0,0 +1,116 @@
+import argparse, random, sys, time
+
+import numpy as np
+
+from policies import POLICIES, make_policy
+from runway_engine import RunwayEngine
+from workload import SERVICE_TIMES, Arrival
+
+
+class TimedPolicy:
+    # Wraps a policy and accumulates the CPU time spent inside push/pop.
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.decisions = 0
+        self.cpu = 0.0
+
+    def __len__(self):
+        return len(self.policy)
+
+    def __bool__(self):
+        return bool(self.policy)
+
+    def push(self, pid, priority, service, now):
+        t0 = time.perf_counter()
+        self.policy.push(pid, priority, service, now)
+        self.cpu += time.perf_counter() - t0
+
+    def pop(self, now, runway):
+        t0 = time.perf_counter()
+        pid = self.policy.pop(now, runway)
+        self.cpu += time.perf_counter() - t0
+        self.decisions += 1
+        return pid
+
+    def peek(self):
+        return self.policy.peek()
+
+    def clear(self):
+        self.policy.clear()
+
+
+def make_trace(planes, runways, load, levels, service, seed):
+    # Poisson arrivals at `load` times the runways' capacity, random priority classes and
+    # service times drawn up front so every policy sees exactly the same planes.
+    rng = random.Random(seed)
+    draw = SERVICE_TIMES[service]
+    services = [draw(rng) for _ in range(planes)]
+    rate = load * runways / (sum(services) / planes)
+    trace, t = [], 0.0
+    for pid, d in enumerate(services, 1):
+        t += rng.expovariate(rate)
+        trace.append(Arrival(t, pid, rng.randint(1, levels), d))
+    return trace
+
+
+def run_policy(policy, trace, runways, starve):
+    timed = TimedPolicy(policy)
+    engine = RunwayEngine(runways, [], progress_interval=None, policy=timed, arrivals=trace)
+    arrived = {a.pid: a.time for a in trace}
+    waits = np.empty(len(trace))
+    n = 0
+    makespan = 0.0
+    for ev in engine.run():
+        if ev.state == 'RUNNING':
+            waits[n] = ev.time - arrived[ev.pid]
+            n += 1
+        elif ev.state == 'COMPLETED':
+            makespan = ev.time
+    waits = waits[:n]
+    return {
+        'throughput': n / makespan * 60 if makespan else 0.0,
+        'wait_mean': float(waits.mean()),
+        'wait_p99': float(np.percentile(waits, 99)),
+        'makespan': makespan,
+        'starved': int((waits > starve).sum()),
+        'ns_per_decision': timed.cpu / timed.decisions * 1e9 if timed.decisions else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare waiting-queue policies on seeded traces")
+    parser.add_argument('--policies', default=",".join(POLICIES))
+    parser.add_argument('--runways', type=int, default=3)
+    parser.add_argument('--planes', type=int, default=20000)
+    parser.add_argument('--load', type=float, default=0.95,
+                        help="offered load as a fraction of total runway capacity")
+    parser.add_argument('--levels', type=int, default=5, help="priority classes 1..levels")
+    parser.add_argument('--service', default="backend", choices=list(SERVICE_TIMES))
+    parser.add_argument('--aging-rate', type=float, default=0.5)
+    parser.add_argument('--starve', type=float, default=60.0,
+                        help="a wait longer than this many seconds counts as starvation")
+    parser.add_argument('--seeds', type=int, default=3, help="traces per policy")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    names = args.policies.split(',')
+    traces = [make_trace(args.planes, args.runways, args.load, args.levels, args.service,
+                         args.seed * 1_000_003 + i) for i in range(args.seeds)]
+    print(f"{args.seeds} traces x {args.planes} planes, {args.runways} runways, "
+          f"load {args.load:.2f}, {args.levels} priority classes, {args.service} service")
+    print(f"{'policy':<10}{'planes/min':>11}{'wait':>9}{'p99':>9}{'makespan':>10}"
+          f"{'starved':>9}{'ns/decision':>13}")
+    for name in names:
+        kwargs = {'aging_rate': args.aging_rate} if name == 'aging' else {}
+        rows = [run_policy(make_policy(name, **kwargs), trace, args.runways, args.starve)
+                for trace in traces]
+        mean = {k: sum(r[k] for r in rows) / len(rows) for k in rows[0]}
+        print(f"{name:<10}{mean['throughput']:>11.2f}{mean['wait_mean']:>9.2f}"
+              f"{mean['wait_p99']:>9.2f}{mean['makespan']:>10.1f}{mean['starved']:>9.1f}"
+              f"{mean['ns_per_decision']:>13.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
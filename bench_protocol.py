@@ -0,0 +1,86 @@
+import argparse, sys, time
+
+import protocol
+import runway_engine
+from event_store import STATES
+from ingest import IngestPipeline
+
+# Timed decode is what the GUI does: feed() what one socket read returns (--ticks-per-read
+# backend sends, 1 when the GUI keeps up), drain() every --drain-every reads (one frame), and
+# turn each drained event into the (pid, state, runway, value) fields process_event takes --
+# process_msg's split/int/float for CSV. Binary pays a fixed numpy cost per feed(), so it
+# only wins once a read carries enough events. Measured here, CSV decodes 1.3-3x faster at
+# one tick per read (8 to 1024 runways); binary overtakes it at roughly 100-150 events per
+# read (8-16 ticks at 8 runways, 2-4 at 128) and is 2.5x faster at ~700. Sizes are within
+# ~10% either way (19.1-19.6 vs 18.1-22.1 bytes/event); binary encodes 1.5-3x faster.
+
+
+def csv_fields(batch):
+    out = []
+    for line in batch.lines:
+        parts = line.split(',')
+        out.append((int(parts[0]), parts[1].upper(), int(parts[2]), float(parts[3])))
+    return out
+
+
+def binary_fields(batch):
+    return [(pid, STATES[state], runway, value) for pid, state, runway, value in batch.events]
+
+
+def run_format(name, batches, encode, expect_binary, fields, repeat, drain_every,
+               ticks_per_read):
+    sends = [encode(batch) for batch in batches]
+    sends = [b"".join(sends[i:i + ticks_per_read]) for i in range(0, len(sends), ticks_per_read)]
+    if expect_binary:
+        sends[0] = protocol.BINARY_ACK + sends[0]
+    size = sum(len(s) for s in sends)
+    events = sum(len(batch) for batch in batches)
+
+    best = float('inf')
+    for _ in range(repeat):
+        pipeline = IngestPipeline()
+        pipeline.expect_binary = expect_binary
+        t0 = time.perf_counter()
+        for i, data in enumerate(sends, 1):
+            pipeline.feed(data)
+            if i % drain_every == 0:
+                fields(pipeline.drain())
+        fields(pipeline.drain())
+        best = min(best, time.perf_counter() - t0)
+        assert pipeline.total_received == events, (name, pipeline.total_received, events)
+
+    t0 = time.perf_counter()
+    for batch in batches:
+        encode(batch)
+    encode_s = time.perf_counter() - t0
+    print(f"{name:<8}{events:>10}{size / events:>12.1f}"
+          f"{events / encode_s:>16,.0f}{events / best:>16,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV vs binary IPC framing benchmark")
+    parser.add_argument('--runways', type=int, default=8)
+    parser.add_argument('--planes', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--drain-every', type=int, default=1,
+                        help="reads fed between GUI drains")
+    parser.add_argument('--ticks-per-read', type=int, default=1,
+                        help="backend sends that arrive in one socket read")
+    args = parser.parse_args(argv)
+
+    engine = runway_engine.RunwayEngine(args.runways, [1 + i % 10 for i in range(args.planes)],
+                                        seed=args.seed)
+    batches = list(runway_engine.batched(engine.run()))
+    per_read = sum(len(batch) for batch in batches) / len(batches) * args.ticks_per_read
+    print(f"{len(batches)} ticks, {per_read:.0f} events per read")
+    print(f"{'format':<8}{'events':>10}{'bytes/event':>12}{'encode ev/s':>16}{'decode ev/s':>16}")
+    for name, encode, binary, fields in (("csv", protocol.encode_csv, False, csv_fields),
+                                         ("binary", protocol.encode_frame, True, binary_fields)):
+        run_format(name, batches, encode, binary, fields, args.repeat, args.drain_every,
+                   args.ticks_per_read)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import argparse, random, sys, time
+
+from scheduler import WaitingQueue
+
+
+class ArrayQueue:
+    # Mirrors g_priority_queue in runway_manager_windows.c: insertion-sort shift on
+    # insert_into_priority_queue, shift-everything-forward on get_highest_priority_plane.
+
+    def __init__(self):
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def push(self, pid, priority, now=0.0):
+        items = self._items
+        items.append(None)
+        i = len(items) - 1
+        while i > 0 and items[i - 1][1] > priority:
+            items[i] = items[i - 1]
+            i -= 1
+        items[i] = (pid, priority)
+
+    def pop(self):
+        items = self._items
+        p = items[0]
+        for i in range(len(items) - 1):
+            items[i] = items[i + 1]
+        items.pop()
+        return p
+
+
+def run_once(queue, priorities):
+    t0 = time.perf_counter()
+    for pid, prio in enumerate(priorities, 1):
+        queue.push(pid, prio, pid)
+    t1 = time.perf_counter()
+    order = [queue.pop()[0] for _ in range(len(priorities))]
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1, order
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Waiting-queue benchmark: heap vs array shift")
+    parser.add_argument('--sizes', default="100,1000,10000,100000,300000")
+    parser.add_argument('--array-limit', type=int, default=10000,
+                        help="largest size to run the O(n) array queue on")
+    parser.add_argument('--levels', type=int, default=10, help="distinct priority values")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'queue':<8}{'n':>9}{'push ns/op':>14}{'pop ns/op':>14}")
+    for n in map(int, args.sizes.split(',')):
+        priorities = [rng.randint(1, args.levels) for _ in range(n)]
+        heap_push, heap_pop, heap_order = run_once(WaitingQueue(), priorities)
+        print(f"{'heap':<8}{n:>9}{heap_push / n * 1e9:>14.0f}{heap_pop / n * 1e9:>14.0f}")
+        if n <= args.array_limit:
+            arr_push, arr_pop, arr_order = run_once(ArrayQueue(), priorities)
+            if arr_order != heap_order:
+                print("  !! dequeue order differs from array queue", file=sys.stderr)
+                return 1
+            print(f"{'array':<8}{n:>9}{arr_push / n * 1e9:>14.0f}{arr_pop / n * 1e9:>14.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import argparse, json, os, statistics, subprocess, sys, time
+
+# Cold-start cost of the GUI, each sample in a fresh interpreter. The import rows need no
+# display; "eager" is what the module used to import before the window could appear.
+# --window also starts the app (attached to an unused port, so no backend) and times
+# process start -> window mapped -> timeline built, the path a user actually sees. The
+# timeline must not exist yet when the window maps, or it is still on the startup path.
+
+IMPORTS = {
+    'gui': "import runway_gui_pro",
+    'gui+chart': "import runway_gui_pro, gantt, matplotlib.figure, "
+                 "matplotlib.backends.backend_tkagg",
+    'eager': "import runway_gui_pro, gantt, matplotlib.pyplot, "
+             "matplotlib.backends.backend_tkagg",
+}
+
+WINDOW = """
+import json, sys, time
+import runway_gui_pro as gui
+app = gui.AirportApp(gui.parse_args(['--attach', '--port', '1'] + sys.argv[1:]))
+marks = {'init': time.monotonic()}
+
+def mapped(event):
+    if event.widget is app and 'window' not in marks:
+        marks['window'] = time.monotonic()
+        marks['prebuilt'] = app.gantt is not None
+
+def poll():
+    if 'window' in marks and (app.gantt is not None or not app.options.chart):
+        marks['chart'] = time.monotonic()
+        print(json.dumps(marks))
+        app.on_close()
+        return
+    app.after(5, poll)
+
+app.bind('<Map>', mapped, add='+')
+app.after(5, poll)
+app.mainloop()
+"""
+
+
+def run_import(code):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - t0
+
+
+def run_window(extra):
+    t0 = time.monotonic()
+    out = subprocess.run([sys.executable, "-c", WINDOW] + extra, check=True,
+                         capture_output=True, text=True).stdout
+    marks = json.loads(out.strip().splitlines()[-1])
+    if marks.pop('prebuilt'):
+        raise RuntimeError("the timeline was built before the window was mapped")
+    return {k: v - t0 for k, v in marks.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GUI cold-start benchmark")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--window', action='store_true',
+                        help="also time the real window (needs a display)")
+    args = parser.parse_args(argv)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    run_import("pass")  # warm the OS file cache so the first row is not penalised
+    base = statistics.median(run_import("pass") for _ in range(args.repeat))
+    print(f"interpreter start {base * 1000:.0f} ms (subtracted below)\n")
+    print(f"{'imports':<12}{'median ms':>10}{'min ms':>10}")
+    for name, code in IMPORTS.items():
+        samples = [run_import(code) - base for _ in range(args.repeat)]
+        print(f"{name:<12}{statistics.median(samples) * 1000:>10.0f}{min(samples) * 1000:>10.0f}")
+
+    if args.window:
+        print(f"\n{'window':<12}{'init ms':>10}{'mapped ms':>10}{'chart ms':>10}")
+        for name, extra in (('lazy chart', []), ('--no-chart', ['--no-chart'])):
+            runs = [run_window(extra) for _ in range(args.repeat)]
+            print(f"{name:<12}" + "".join(f"{statistics.median(r[k] for r in runs) * 1000:>10.0f}"
+                                          for k in ('init', 'window', 'chart')))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
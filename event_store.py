@@ -0,0 +1,225 @@
+from collections import deque
+
+import numpy as np
+
+STATES = ("NONE", "QUEUED", "WAITING", "RUNNING", "PROGRESS", "COMPLETED")
+STATE_CODE = {name: code for code, name in enumerate(STATES)}
+NONE, QUEUED, WAITING, RUNNING, PROGRESS, COMPLETED = range(len(STATES))
+
+SPRITE_NONE, SPRITE_WAITING, SPRITE_RUNWAY = 0, 1, 2
+
+
+def _grow(arr, size):
+    out = np.zeros(max(size, 2 * len(arr)), dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+class SegmentStore:
+    # Completed runway occupancy intervals, appended in completion order. With `limit` set
+    # only the most recent segments are kept: when the arrays are full the oldest half is
+    # dropped. Busy time, landings and makespan are running totals, so they still cover
+    # the whole run.
+
+    COLUMNS = (('runway', np.int16), ('plane', np.int32), ('start', np.float64), ('end', np.float64))
+
+    def __init__(self, capacity=256, limit=None):
+        self.limit = limit
+        if limit:
+            capacity = min(capacity, limit)
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.count = 0
+        self.dropped = 0
+        self.makespan = 0.0
+        self.busy = np.zeros(8)
+        self.landed = np.zeros(8, dtype=np.int64)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+        self.makespan = 0.0
+        self.busy[:] = 0.0
+        self.landed[:] = 0
+
+    def append(self, runway, plane, start, end):
+        i = self.count
+        if i == len(self.runway):
+            if self.limit and i >= self.limit:
+                drop = i - i // 2
+                for name, _ in self.COLUMNS:
+                    col = getattr(self, name)
+                    col[:i - drop] = col[drop:i]
+                self.dropped += drop
+                i -= drop
+            else:
+                size = min(2 * i, self.limit) if self.limit else 2 * i
+                for name, _ in self.COLUMNS:
+                    setattr(self, name, _grow(getattr(self, name), size)[:size])
+        if runway >= len(self.busy):
+            self.busy = _grow(self.busy, runway + 1)
+            self.landed = _grow(self.landed, runway + 1)
+        self.busy[runway] += end - start
+        self.landed[runway] += 1
+        self.runway[i] = runway
+        self.plane[i] = plane
+        self.start[i] = start
+        self.end[i] = end
+        self.count = i + 1
+        if end > self.makespan:
+            self.makespan = end
+        return i
+
+    def view(self, name):
+        return getattr(self, name)[:self.count]
+
+    def busy_time(self, num_runways):
+        busy = np.zeros(num_runways)
+        known = self.busy[1:num_runways + 1]
+        busy[:len(known)] = known
+        return busy
+
+    def utilisation(self, num_runways, horizon=None):
+        horizon = horizon or self.makespan
+        if not horizon:
+            return np.zeros(num_runways)
+        return self.busy_time(num_runways) / horizon
+
+
+class PlaneStore:
+    # One row per plane in parallel NumPy columns, ~50 bytes per plane; rows maps a pid to
+    # its row. count is the number of rows ever used, and rows not holding a plane have
+    # state NONE. With keep_completed set, retire() releases the oldest landed planes beyond
+    # that many and their rows are reused by new planes, so an open-ended stream runs in
+    # constant memory. generation changes whenever a row gains or loses its plane.
+    # wait_percentiles() covers the planes still held; utilisation() the whole run.
+
+    COLUMNS = (
+        ('pid', np.int32), ('priority', np.int32), ('runway', np.int16),
+        ('state', np.int8), ('sprite', np.int8), ('duration', np.float32),
+        ('progress', np.float32), ('seg_start', np.float64), ('seg_end', np.float64),
+        ('wait_start', np.float64), ('wait_time', np.float64),
+    )
+
+    def __init__(self, capacity=64, keep_completed=None, keep_segments=None):
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.count = 0
+        self.rows = {}
+        self.keep_completed = keep_completed
+        self.generation = 0
+        self._free = []
+        self._landed = deque()
+        self.segments = SegmentStore(limit=keep_segments)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, pid):
+        return pid in self.rows
+
+    def clear(self):
+        for name, _ in self.COLUMNS:
+            getattr(self, name)[:self.count] = 0
+        self.count = 0
+        self.rows.clear()
+        self._free.clear()
+        self._landed.clear()
+        self.generation += 1
+        self.segments.clear()
+
+    def _reserve(self, size):
+        if size > len(self.pid):
+            for name, _ in self.COLUMNS:
+                setattr(self, name, _grow(getattr(self, name), size))
+
+    def add(self, pid, priority):
+        row = self.rows.get(pid)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = self.count
+                self._reserve(row + 1)
+                self.count = row + 1
+            self.rows[pid] = row
+            self.generation += 1
+        self.pid[row] = pid
+        self.priority[row] = priority
+        self.state[row] = QUEUED
+        self.wait_start[row] = np.nan
+        self.wait_time[row] = np.nan
+        self.seg_start[row] = np.nan
+        self.seg_end[row] = np.nan
+        return row
+
+    def release(self, pid):
+        row = self.rows.pop(pid)
+        for name, _ in self.COLUMNS:
+            getattr(self, name)[row] = 0
+        self._free.append(row)
+        self.generation += 1
+        return row
+
+    def retire(self):
+        # release landed planes beyond keep_completed, oldest first; returns their rows
+        freed = []
+        if self.keep_completed is None:
+            return freed
+        landed, rows = self._landed, self.rows
+        while len(landed) > self.keep_completed:
+            pid = landed.popleft()
+            row = rows.get(pid)
+            if row is not None and self.state[row] == COMPLETED:
+                freed.append(self.release(pid))
+        return freed
+
+    def view(self, name):
+        return getattr(self, name)[:self.count]
+
+    def record(self, pid, state, runway, value, now):
+        # Apply one backend event; returns the new segment index on COMPLETED, else -1.
+        row = self.rows[pid]
+        code = STATE_CODE[state]
+        self.state[row] = code
+        self.runway[row] = runway
+        if code == RUNNING:
+            self.duration[row] = value
+            self.progress[row] = 0.0
+            self.seg_start[row] = now
+            if not np.isnan(self.wait_start[row]):
+                self.wait_time[row] = now - self.wait_start[row]
+        elif code == WAITING:
+            self.progress[row] = value
+            self.wait_start[row] = now
+        elif code == PROGRESS:
+            self.progress[row] = value
+        elif code == COMPLETED:
+            self.progress[row] = 1.0
+            if self.keep_completed is not None:
+                self._landed.append(pid)
+            start = self.seg_start[row]
+            self.seg_end[row] = now
+            if not np.isnan(start):
+                self.seg_start[row] = np.nan
+                return self.segments.append(runway, pid, start, now)
+        return -1
+
+    def rows_in(self, *states):
+        return np.flatnonzero(np.isin(self.state[:self.count], states))
+
+    def makespan(self):
+        return self.segments.makespan
+
+    def utilisation(self, num_runways, horizon=None):
+        return self.segments.utilisation(num_runways, horizon)
+
+    def wait_percentiles(self, q=(50, 95, 99)):
+        waits = self.wait_time[:self.count]
+        waits = waits[~np.isnan(waits)]
+        if not len(waits):
+            return np.full(len(q), np.nan)
+        return np.percentile(waits, q)
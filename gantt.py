@@ -0,0 +1,214 @@
+import time
+
+import matplotlib
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.ticker import MaxNLocator
+
+
+class SegmentCollection(PolyCollection):
+    # Bars for one runway, kept in growable arrays. Appending is O(1); the collection's
+    # paths and colours are only rebuilt when matplotlib actually does a full draw. With
+    # `limit` set, a full collection drops its oldest half and append() returns True.
+
+    def __init__(self, capacity=64, limit=None, **kwargs):
+        super().__init__([], **kwargs)
+        self.limit = limit
+        self.verts = np.empty((capacity, 4, 2))
+        self.colors = np.empty((capacity, 4))
+        self.planes = np.empty(capacity, dtype=np.int32)
+        self.count = 0
+        self._stale_segments = False
+
+    def append(self, verts, color, plane):
+        i = self.count
+        trimmed = False
+        if self.limit and i >= self.limit:
+            drop = i - i // 2
+            for arr in (self.verts, self.colors, self.planes):
+                arr[:i - drop] = arr[drop:i]
+            i -= drop
+            trimmed = True
+        elif i == len(self.planes):
+            self.verts = np.concatenate([self.verts, np.empty_like(self.verts)])
+            self.colors = np.concatenate([self.colors, np.empty_like(self.colors)])
+            self.planes = np.concatenate([self.planes, np.empty_like(self.planes)])
+        self.verts[i] = verts
+        self.colors[i] = color
+        self.planes[i] = plane
+        self.count = i + 1
+        self._stale_segments = True
+        return trimmed
+
+    def draw(self, renderer):
+        if self._stale_segments:
+            self.set_verts(self.verts[:self.count])
+            self.set_facecolor(self.colors[:self.count])
+            self._stale_segments = False
+        super().draw(renderer)
+
+
+class GanttTimeline:
+    # Incremental runway timeline. New segments are blitted on top of a cached background
+    # of everything already drawn, so a frame costs the same with 10 or 50,000 bars. A full
+    # redraw only happens when the x-axis has to widen (geometrically, so rarely) or the
+    # canvas is resized. Flushes are coalesced to at most one per frame budget, and labels
+    # are culled when a bar is too narrow on screen to read. With max_bars set, each runway
+    # keeps only its most recent share of them and the x-axis starts at the oldest bar kept.
+
+    def __init__(self, ax, canvas, num_runways, num_planes, schedule=None,
+                 frame_ms=40, min_label_px=22, max_labels=150, initial_span=30.0,
+                 max_bars=None):
+        self.ax = ax
+        self.canvas = canvas
+        self.num_runways = num_runways
+        self.num_planes = max(num_planes, 1)
+        self.schedule = schedule
+        self.frame_s = frame_ms / 1000.0
+        self.min_label_px = min_label_px
+        self.max_labels = max_labels
+        self.initial_span = initial_span
+        self.max_bars = max_bars
+        self.cmap = matplotlib.colormaps['hsv']
+        self.runways = []
+        self.labels = []
+        self.pending = []
+        self.full_redraws = 0
+        self._xmin = 0.0
+        self._xmax = initial_span
+        self._background = None
+        self._full_pending = True
+        self._flush_pending = False
+        self._last_flush = 0.0
+        self._pending_bars = None
+        self._pending_label = None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def setup(self):
+        ax = self.ax
+        ax.clear()
+        ax.set_facecolor('#1a202c')
+        ax.set_yticks([10 * (i + 1) for i in range(self.num_runways)])
+        ax.set_yticklabels([f"R{i + 1}" for i in range(self.num_runways)])
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=15, integer=True, steps=[1, 2, 5, 10]))
+        ax.set_xlabel("Time (seconds)")
+        ax.grid(axis='x', linestyle='--', alpha=0.5)
+        ax.set_xlim(self._xmin, self._xmax)
+        ax.set_ylim(5, 10 * (self.num_runways + 1) - 5)
+        limit = max(self.max_bars // self.num_runways, 2) if self.max_bars else None
+        self.runways = []
+        for _ in range(self.num_runways):
+            coll = SegmentCollection(limit=limit, edgecolors='black', linewidths=0.5)
+            ax.add_collection(coll)
+            self.runways.append(coll)
+        self._pending_bars = PolyCollection([], edgecolors='black', linewidths=0.5, animated=True)
+        ax.add_collection(self._pending_bars)
+        self._pending_label = ax.text(0, 0, "", ha='center', va='center', color='black',
+                                      fontsize=8, fontweight='bold', animated=True)
+        self.labels = []
+        self.pending = []
+        ax.figure.tight_layout(pad=0.5)
+        self._background = None
+        self._full_pending = True
+        self.canvas.draw()
+
+    def reset(self, num_runways=None, num_planes=None):
+        if num_runways is not None:
+            self.num_runways = num_runways
+        if num_planes is not None:
+            self.num_planes = max(num_planes, 1)
+        self._xmin = 0.0
+        self._xmax = self.initial_span
+        self.setup()
+
+    @property
+    def segment_count(self):
+        return sum(coll.count for coll in self.runways)
+
+    def add_segment(self, runway, plane, start, end):
+        y0, y1 = 10 * runway - 4, 10 * runway + 4
+        verts = ((start, y0), (start, y1), (end, y1), (end, y0))
+        # colours cycle every num_planes so open-ended streams stay on the colormap
+        color = self.cmap((plane % self.num_planes) / self.num_planes)
+        coll = self.runways[runway - 1]
+        if coll.append(verts, color, plane):
+            self._xmin = max(self._xmin, float(coll.verts[0, 0, 0]))
+            self.ax.set_xlim(self._xmin, self._xmax)
+            self._full_pending = True
+        self.pending.append((verts, color, plane))
+        if end > self._xmax:
+            self._xmax = max(end * 1.1 + 5, self._xmax * 1.5)
+            self.ax.set_xlim(self._xmin, self._xmax)
+            self._full_pending = True
+        self.request_flush()
+
+    def request_flush(self):
+        if self._flush_pending:
+            return
+        if self.schedule is None:
+            self.flush()
+            return
+        wait = self._last_flush + self.frame_s - time.monotonic()
+        self._flush_pending = True
+        self.schedule(max(0, int(wait * 1000)), self.flush)
+
+    def flush(self):
+        self._flush_pending = False
+        self._last_flush = time.monotonic()
+        if self._full_pending or self._background is None:
+            self._full_pending = False
+            self.pending = []
+            self._update_labels()
+            self._background = None
+            self.canvas.draw_idle()
+            return
+        if not self.pending:
+            return
+        verts, colors, planes = zip(*self.pending)
+        self.pending = []
+        canvas, ax = self.canvas, self.ax
+        canvas.restore_region(self._background)
+        self._pending_bars.set_verts(verts)
+        self._pending_bars.set_facecolor(colors)
+        ax.draw_artist(self._pending_bars)
+        px_per_s = ax.bbox.width / (self._xmax - self._xmin)
+        label = self._pending_label
+        for v, p in zip(verts, planes):
+            if (v[2][0] - v[0][0]) * px_per_s >= self.min_label_px:
+                label.set_position(((v[0][0] + v[2][0]) / 2, v[1][1] - 4))
+                label.set_text(f"P{p}")
+                ax.draw_artist(label)
+        canvas.blit(ax.bbox)
+        self._background = canvas.copy_from_bbox(ax.bbox)
+
+    def _on_draw(self, event):
+        self.full_redraws += 1
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def _update_labels(self):
+        px_per_s = self.ax.bbox.width / (self._xmax - self._xmin)
+        mids, ys, planes, ends = [], [], [], []
+        for r, coll in enumerate(self.runways):
+            lo = max(0, coll.count - self.max_labels)
+            v = coll.verts[lo:coll.count]
+            keep = (v[:, 2, 0] - v[:, 0, 0]) * px_per_s >= self.min_label_px
+            mids.append((v[keep, 0, 0] + v[keep, 2, 0]) / 2)
+            ends.append(v[keep, 2, 0])
+            ys.append(np.full(int(keep.sum()), 10 * (r + 1)))
+            planes.append(coll.planes[lo:coll.count][keep])
+        if mids:
+            mids, ys = np.concatenate(mids), np.concatenate(ys)
+            planes, ends = np.concatenate(planes), np.concatenate(ends)
+            if len(mids) > self.max_labels:
+                recent = np.argsort(ends)[-self.max_labels:]
+                mids, ys, planes = mids[recent], ys[recent], planes[recent]
+
+        while len(self.labels) < len(mids):
+            self.labels.append(self.ax.text(0, 0, "", ha='center', va='center', color='black',
+                                            fontsize=8, fontweight='bold', clip_on=True))
+        for label, x, y, p in zip(self.labels, mids, ys, planes):
+            label.set_position((x, y))
+            label.set_text(f"P{p}")
+            label.set_visible(True)
+        for label in self.labels[len(mids):]:
+            label.set_visible(False)
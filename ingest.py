@@ -0,0 +1,168 @@
+import threading, time
+from collections import namedtuple
+
+import numpy as np
+
+import protocol
+from event_store import STATES, STATE_CODE, PROGRESS
+
+Batch = namedtuple('Batch', 'lines events received coalesced lag')
+
+
+class IngestPipeline:
+    # Feeder side (the transport pump thread, or a replay): feed() splits every complete line
+    # in one pass and folds PROGRESS lines so only the latest per plane survives until the
+    # next frame.
+    # GUI-thread side: drain() swaps the pending batch out under the lock once per frame.
+    # State transitions are never dropped; a transition also supersedes that plane's
+    # pending PROGRESS so ordering within a plane is preserved.
+    #
+    # With expect_binary set (the client asked for the binary protocol) the stream is
+    # switched to frame decoding if it starts with protocol.BINARY_ACK. Binary batches
+    # carry (pid, state_code, runway, value) tuples in `events` instead of CSV `lines`.
+
+    def __init__(self):
+        self._partial = bytearray()
+        self._lock = threading.Lock()
+        self._transitions = []
+        self._progress = {}
+        self._events = []
+        self._event_progress = {}
+        self._received = 0
+        self._coalesced = 0
+        self._oldest = None
+        self.expect_binary = False
+        self.binary = False
+        self.recorder = None
+        self.total_received = 0
+        self.total_coalesced = 0
+        # events received per state code, before coalescing; written by the feeder thread
+        self.state_counts = [0] * len(STATES)
+
+    def restart(self):
+        # a new connection: drop any half-received line or frame and renegotiate
+        self._partial.clear()
+        self.binary = False
+
+    def backlog(self):
+        # transitions waiting for the GUI; PROGRESS is already bounded by the plane count
+        return len(self._transitions) + len(self._events)
+
+    def feed(self, data):
+        partial = self._partial
+        partial += data
+        if self.expect_binary and not self.binary:
+            ack = protocol.BINARY_ACK
+            head = bytes(partial[:len(ack)])
+            if head == ack:
+                del partial[:len(ack)]
+                self.binary = True
+            elif not ack.startswith(head):
+                self.expect_binary = False
+            else:
+                return 0
+        if self.binary:
+            return self._feed_frames()
+
+        end = partial.rfind(b"\n")
+        if end < 0:
+            return 0
+        text = partial[:end].decode("utf-8", errors="ignore")
+        del partial[:end + 1]
+        now = time.monotonic()
+
+        lines = [line for line in (raw.strip() for raw in text.split("\n")) if line]
+        if self.recorder is not None:
+            self.recorder.write_lines(lines)
+        count = len(lines)
+        counts = self.state_counts
+        n_progress = 0
+        with self._lock:
+            transitions, progress = self._transitions, self._progress
+            for line in lines:
+                key, _, rest = line.partition(",")
+                if rest.startswith("PROGRESS,"):
+                    n_progress += 1
+                    if key in progress:
+                        self._coalesced += 1
+                    progress[key] = line
+                else:
+                    code = STATE_CODE.get(rest.partition(",")[0])
+                    if code is not None:
+                        counts[code] += 1
+                    if progress.pop(key, None) is not None:
+                        self._coalesced += 1
+                    transitions.append(line)
+            self._mark(count, now)
+        counts[PROGRESS] += n_progress
+        return count
+
+    def _feed_frames(self):
+        records, consumed = protocol.decode_frames(self._partial)
+        del self._partial[:consumed]
+        if self.recorder is not None:
+            self.recorder.write_records(records)
+        return self.feed_records(records)
+
+    def feed_records(self, records):
+        count = len(records)
+        if not count:
+            return 0
+        now = time.monotonic()
+        states = records['state']
+        for code, n in enumerate(np.bincount(states, minlength=len(STATES)).tolist()):
+            self.state_counts[code] += n
+
+        is_progress = states == PROGRESS
+        trans = records[~is_progress]
+        pos = np.flatnonzero(is_progress)
+        pids = records['pid'][pos]
+        # last PROGRESS per plane in this chunk, unless a later transition supersedes it
+        upids, rev_first = np.unique(pids[::-1], return_index=True)
+        last_pos = pos[len(pos) - 1 - rev_first]
+        keep = np.ones(len(upids), dtype=bool)
+        if len(trans):
+            tpos = np.flatnonzero(~is_progress)
+            tu, rev_t = np.unique(records['pid'][tpos][::-1], return_index=True)
+            tlast = tpos[len(tpos) - 1 - rev_t]
+            j = np.minimum(np.searchsorted(tu, upids), len(tu) - 1)
+            keep = ~((tu[j] == upids) & (tlast[j] > last_pos))
+        kept = records[last_pos[keep]]
+
+        with self._lock:
+            progress = self._event_progress
+            if len(trans):
+                for pid in np.unique(trans['pid']).tolist():
+                    if progress.pop(pid, None) is not None:
+                        self._coalesced += 1
+                self._events.extend(trans[['pid', 'state', 'runway', 'value']].tolist())
+            self._coalesced += len(pos) - len(kept)
+            for rec in kept[['pid', 'state', 'runway', 'value']].tolist():
+                if rec[0] in progress:
+                    self._coalesced += 1
+                progress[rec[0]] = rec
+            self._mark(count, now)
+        return count
+
+    def _mark(self, count, now):
+        self._received += count
+        self.total_received += count
+        if count and self._oldest is None:
+            self._oldest = now
+
+    def drain(self):
+        with self._lock:
+            lines, events = self._transitions, self._events
+            if self._progress:
+                lines.extend(self._progress.values())
+                self._progress = {}
+            if self._event_progress:
+                events.extend(self._event_progress.values())
+                self._event_progress = {}
+            self._transitions, self._events = [], []
+            received, coalesced, oldest = self._received, self._coalesced, self._oldest
+            self._received = self._coalesced = 0
+            self._oldest = None
+        lag = time.monotonic() - oldest if oldest is not None else 0.0
+        self.total_coalesced += coalesced
+        return Batch(lines, events, received, coalesced, lag)
@@ -0,0 +1,296 @@
+import cProfile, http.server, io, json, os, pstats, sys, threading, time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Low-overhead latency instrumentation.
+#
+# Histogram is HDR-style: values are counted in integer microseconds in log-linear buckets
+# (exact below 2**sub_bits us, then 2**(sub_bits-1) buckets per power of two, i.e. < 0.8%
+# relative error with the default 8 bits), so recording is a couple of integer ops and a
+# list increment and memory is fixed however many values are recorded. Each histogram is
+# written from one thread; snapshots may be read from any.
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Histogram:
+    def __init__(self, highest=60.0, sub_bits=8):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half = self.sub_count >> 1
+        top = int(highest * 1e6)
+        self.highest_us = top
+        self.counts = [0] * (self._index(top) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, us):
+        if us < self.sub_count:
+            return us
+        shift = us.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + (us >> shift) - self.half
+
+    def _lower(self, index):
+        if index < self.sub_count:
+            return index
+        octave, offset = divmod(index - self.sub_count, self.half)
+        return (offset + self.half) << (octave + 1)
+
+    def record(self, seconds):
+        us = int(seconds * 1e6)
+        self.counts[self._index(us if us < self.highest_us else self.highest_us)] += 1
+        self.total += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        if not self.total:
+            return 0.0
+        target = q / 100.0 * self.total
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if n and running >= target:
+                return self._lower(i) / 1e6
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def snapshot(self):
+        snap = {'count': self.total, 'sum': self.sum, 'mean': self.mean(), 'max': self.max}
+        for q in PERCENTILES:
+            snap[f'p{q:g}'] = self.percentile(q)
+        return snap
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Instruments:
+    # Named histograms (seconds), counters and gauges. With enabled=False every call is a
+    # no-op, so call sites never need their own guard. `events` holds backend event counts
+    # per state name; producers that already touch every event (the ingest pipeline) keep
+    # their own tallies and copy them in periodically rather than paying per event here.
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = Counter()
+        self.events = defaultdict(int)
+        self.gauges = {}
+        self.started = time.time()
+
+    def histogram(self, name):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Histogram()
+        return h
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+
+    @contextmanager
+    def timer(self, name):
+        if not self.enabled:
+            yield
+            return
+        h = self.histogram(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            h.record(time.perf_counter() - t0)
+
+    def wrap(self, name, fn):
+        h = self.histogram(name)
+        perf = time.perf_counter
+
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            t0 = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                h.record(perf() - t0)
+        return timed
+
+    def snapshot(self):
+        return {
+            'uptime_s': time.time() - self.started,
+            'histograms': {name: h.snapshot() for name, h in list(self.histograms.items())},
+            'counters': dict(self.counters),
+            'events': dict(self.events),
+            'gauges': dict(self.gauges),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=1)
+
+    def to_prometheus(self, prefix="runway"):
+        lines = []
+        for name, h in list(self.histograms.items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q in PERCENTILES:
+                lines.append(f'{metric}{{quantile="{q / 100:g}"}} {h.percentile(q):.6f}')
+            lines.append(f"{metric}_sum {h.sum:.6f}")
+            lines.append(f"{metric}_count {h.total}")
+        if self.events:
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for state, n in sorted(self.events.items()):
+                lines.append(f'{prefix}_events_total{{state="{state}"}} {n}')
+        for key, n in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{key}_total counter")
+            lines.append(f"{prefix}_{key}_total {n}")
+        for key, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self, names=None):
+        lines = []
+        for name in names or sorted(self.histograms):
+            h = self.histograms.get(name)
+            if h is None or not h.total:
+                continue
+            lines.append(f"{name:<12} p50 {h.percentile(50) * 1000:7.2f}  "
+                         f"p99 {h.percentile(99) * 1000:7.2f}  max {h.max * 1000:7.2f} ms")
+        return lines
+
+
+class MetricsServer:
+    # GET /metrics -> Prometheus text, anything else -> JSON; localhost only.
+
+    def __init__(self, instruments, port, host='127.0.0.1'):
+        metrics = instruments
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics'):
+                    body, ctype = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    body, ctype = metrics.to_json(), 'application/json'
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SamplingProfiler:
+    # Samples one thread's stack every `interval` seconds from a helper thread: near-zero
+    # cost to the sampled thread, unlike cProfile which hooks every call.
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.leaf = Counter()
+        self.inclusive = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            seen = set()
+            key = None
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                if not seen:
+                    self.leaf[key] += 1
+                if key not in seen:
+                    seen.add(key)
+                    self.inclusive[key] += 1
+                frame = frame.f_back
+
+    def report(self, top=15):
+        out = [f"{self.samples} samples every {self.interval * 1000:.0f} ms",
+               f"{'self%':>6} {'total%':>7}  function"]
+        n = max(self.samples, 1)
+        for key, count in self.inclusive.most_common(top):
+            out.append(f"{self.leaf[key] * 100 / n:6.1f} {count * 100 / n:7.1f}  {key}")
+        return "\n".join(out)
+
+
+class Profiler:
+    # Runtime toggle for either profiler. cProfile profiles the calling thread only, so
+    # toggle it from the thread of interest (the Tk thread). stop() returns a text report;
+    # cProfile stats are also dumped to `path` for snakeviz / pstats.
+
+    def __init__(self, mode='sample', path="runway_profile.prof"):
+        if mode not in ('sample', 'cprofile'):
+            raise ValueError(f"profiler mode must be 'sample' or 'cprofile', not {mode!r}")
+        self.mode = mode
+        self.path = path
+        self.active = None
+
+    def toggle(self):
+        if self.active is None:
+            self.start()
+            return None
+        return self.stop()
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self.active = cProfile.Profile()
+            self.active.enable()
+        else:
+            self.active = SamplingProfiler(threading.get_ident())
+            self.active.start()
+
+    def stop(self, top=15):
+        prof, self.active = self.active, None
+        if prof is None:
+            return ""
+        if isinstance(prof, SamplingProfiler):
+            prof.stop()
+            return prof.report(top)
+        prof.disable()
+        prof.dump_stats(self.path)
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats('cumulative').print_stats(top)
+        return f"saved {self.path}\n" + out.getvalue()
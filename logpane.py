@@ -0,0 +1,112 @@
+import logging, logging.handlers, queue, threading
+from collections import deque
+
+TRACE = 5
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+logging.addLevelName(TRACE, "TRACE")
+
+LEVELS = {"TRACE": TRACE, "DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+
+class LogBuffer:
+    # Thread-safe ring of log lines. Any thread may log; the GUI reads the tail with since().
+    # Optionally mirrors every line to a rotating file through a QueueListener thread so
+    # disk I/O never happens on the caller's thread.
+
+    def __init__(self, capacity=2000, level=DEBUG):
+        self.level = level
+        self._lines = deque(maxlen=capacity)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._file_logger = None
+        self._listener = None
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, msg):
+        if level < self.level:
+            return
+        with self._lock:
+            self._lines.append(msg)
+            self._seq += 1
+        if self._file_logger is not None:
+            self._file_logger.log(level, msg)
+
+    def trace(self, msg):
+        self.log(TRACE, msg)
+
+    def debug(self, msg):
+        self.log(DEBUG, msg)
+
+    def info(self, msg):
+        self.log(INFO, msg)
+
+    def warning(self, msg):
+        self.log(WARNING, msg)
+
+    def error(self, msg):
+        self.log(ERROR, msg)
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def since(self, seq):
+        # lines appended after `seq`, limited to what the ring still holds
+        with self._lock:
+            new = self._seq - seq
+            if new <= 0:
+                return self._seq, []
+            lines = list(self._lines)[-new:] if new < len(self._lines) else list(self._lines)
+            return self._seq, lines
+
+    def attach_file(self, path, max_bytes=5_000_000, backups=3):
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                       backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        q = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(q, handler)
+        self._listener.start()
+        logger = logging.getLogger(f"runway.{id(self)}")
+        logger.setLevel(TRACE)
+        logger.propagate = False
+        logger.addHandler(logging.handlers.QueueHandler(q))
+        self._file_logger = logger
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._file_logger = None
+
+
+class LogPane:
+    # Writes new LogBuffer lines into a tk.Text at most once per frame, trimming the widget
+    # to max_lines so its size (and the cost of see("end")) stays bounded.
+
+    def __init__(self, text, buffer, max_lines=500):
+        self.text = text
+        self.buffer = buffer
+        self.max_lines = max_lines
+        self._seq = buffer.seq
+        self._lines = 0
+
+    def clear(self):
+        self.text.delete("1.0", "end")
+        self._lines = 0
+        self._seq = self.buffer.seq
+
+    def flush(self):
+        seq, lines = self.buffer.since(self._seq)
+        if not lines:
+            return
+        self._seq = seq
+        lines = lines[-self.max_lines:]
+        self.text.insert("end", "\n".join(lines) + "\n")
+        self._lines += len(lines)
+        excess = self._lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._lines -= excess
+        self.text.see("end")
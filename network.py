@@ -0,0 +1,271 @@
+import argparse, bisect, itertools, math, multiprocessing, random, socket, sys, threading, time
+from collections import namedtuple
+
+import protocol
+import workload
+from runway_engine import SERVER_HOST, SERVER_PORT, SLICE, RunwayEngine, batched, paced
+
+# Sharded multi-airport simulation. Every airport runs its own RunwayEngine in a worker
+# process. A flight that completes (takes off) at one airport may be routed to another,
+# where it arrives flight_time seconds later. The coordinator advances all shards in
+# lockstep windows no longer than the shortest flight time (the lookahead): a handoff
+# produced in [T, T + window) cannot arrive before T + window, so every shard can simulate
+# its window independently and handoffs are delivered between windows.
+#
+# Each shard can also serve its event stream on a local port in the same CSV/binary
+# protocol as the backend, so the GUI can attach to any airport (--attach --port N). When
+# the run is paced, a serving shard publishes each tick at its own wall time rather than a
+# whole window at once, since an attached GUI timestamps events as they arrive.
+
+Route = namedtuple('Route', 'dest share flight_time')
+Airport = namedtuple('Airport', 'name runways workload seed routes port')
+Handoff = namedtuple('Handoff', 'time priority needs origin')
+ShardStats = namedtuple('ShardStats', 'events completed sent received cpu')
+
+
+class ShardServer:
+    # Accepts any number of subscribers on a local port. A subscriber sends a CONFIG line
+    # first (only its BIN option is honoured); after that it gets every event from then on.
+    # A subscriber that cannot keep up is dropped rather than stalling the shard.
+
+    def __init__(self, port, host=SERVER_HOST, send_timeout=1.0):
+        self.send_timeout = send_timeout
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((host, port))
+        self._listener.listen(4)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        conn.settimeout(30.0)
+        buf = b""
+        try:
+            while b"\n" not in buf:
+                data = conn.recv(1024)
+                if not data:
+                    conn.close()
+                    return
+                buf += data
+            line = buf.split(b"\n", 1)[0].decode('utf-8')
+            encode = protocol.encode_csv
+            parts = [p.strip() for p in line.strip().split(',')]
+            if protocol.BINARY_OPTION in parts[3:]:
+                conn.sendall(protocol.BINARY_ACK)
+                encode = protocol.encode_frame
+        except OSError:
+            conn.close()
+            return
+        conn.settimeout(self.send_timeout)
+        with self._lock:
+            self._subscribers.append((conn, encode))
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for conn, encode in subscribers:
+            try:
+                for batch in batched(events):
+                    conn.sendall(encode(batch))
+            except OSError:
+                conn.close()
+                with self._lock:
+                    self._subscribers.remove((conn, encode))
+
+    def close(self):
+        self._listener.close()
+        with self._lock:
+            for conn, _ in self._subscribers:
+                conn.close()
+            self._subscribers.clear()
+
+
+def _shard_main(index, airport, conn, progress_interval, time_scale):
+    rng = random.Random(airport.seed)
+    pids = itertools.count(1)
+    planes = {}
+
+    def local_arrivals():
+        # renumber into this airport's pid space, shared with incoming flights
+        for arrival in workload.from_spec(airport.workload, rng.getrandbits(64)):
+            arrival = arrival._replace(pid=next(pids))
+            planes[arrival.pid] = (arrival.priority, arrival.needs)
+            yield arrival
+
+    routes = airport.routes
+    cum_share = list(itertools.accumulate(r.share for r in routes))
+    engine = RunwayEngine(airport.runways, [], seed=rng.getrandbits(64),
+                          progress_interval=progress_interval, arrivals=local_arrivals())
+    engine.reset()
+    server = ShardServer(airport.port) if airport.port else None
+    events = completed = sent = received = 0
+    cpu0 = time.process_time()
+    start = None
+    conn.send(None)  # ready
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        until, inbound, epoch = msg
+        if start is None and epoch is not None:
+            # wall-clock time of sim time 0, as this process's monotonic clock
+            start = time.monotonic() - (time.time() - epoch)
+        for h in inbound:
+            pid = next(pids)
+            planes[pid] = (h.priority, h.needs)
+            engine.inject(workload.Arrival(h.time, pid, h.priority, None, h.needs))
+        received += len(inbound)
+        outbound = []
+        publish = [] if server is not None and server.has_subscribers else None
+        for ev in engine.advance(until):
+            events += 1
+            if publish is not None:
+                publish.append(ev)
+            if ev.state == 'COMPLETED':
+                completed += 1
+                priority, needs = planes.pop(ev.pid)
+                u = rng.random()
+                if cum_share and u < cum_share[-1]:
+                    route = routes[bisect.bisect_right(cum_share, u)]
+                    outbound.append((route.dest, Handoff(ev.time + route.flight_time,
+                                                         priority, needs, index)))
+        sent += len(outbound)
+        if publish:
+            for batch in paced(batched(publish), time_scale if start is not None else None,
+                               key=lambda b: b[-1].time, start=start):
+                server.publish(batch)
+        conn.send((outbound, ShardStats(events, completed, sent, received,
+                                        time.process_time() - cpu0)))
+    if server is not None:
+        server.close()
+    conn.close()
+
+
+def lookahead(airports):
+    times = [r.flight_time for a in airports for r in a.routes]
+    return min(times) if times else math.inf
+
+
+def run_network(airports, horizon, progress_interval=SLICE, time_scale=None, max_window=60.0,
+                on_window=None):
+    window = min(lookahead(airports), max_window)
+    if window <= 0:
+        raise ValueError("every route needs a positive flight time")
+    conns, procs = [], []
+    for index, airport in enumerate(airports):
+        parent, child = multiprocessing.Pipe()
+        proc = multiprocessing.Process(target=_shard_main, daemon=True,
+                                       args=(index, airport, child, progress_interval,
+                                             time_scale))
+        proc.start()
+        child.close()
+        conns.append(parent)
+        procs.append(proc)
+    for c in conns:
+        c.recv()
+
+    inbox = [[] for _ in airports]
+    stats = [None] * len(airports)
+    t, wall0 = 0.0, time.monotonic()
+    epoch = time.time() if time_scale else None
+    try:
+        while t < horizon:
+            until = min(t + window, horizon)
+            for c, inbound in zip(conns, inbox):
+                c.send((until, inbound, epoch))
+            inbox = [[] for _ in airports]
+            for i, c in enumerate(conns):
+                outbound, stats[i] = c.recv()
+                for dest, handoff in outbound:
+                    inbox[dest].append(handoff)
+            t = until
+            if on_window is not None:
+                on_window(t, stats)
+            if time_scale:
+                delay = wall0 + t / time_scale - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        for c in conns:
+            try:
+                c.send(None)
+            except OSError:
+                pass
+        for p in procs:
+            p.join(timeout=5)
+    return stats, time.monotonic() - wall0
+
+
+def mesh(count, runways, workload_spec, share, flight_time, seed=0, base_port=None):
+    # every airport sends `share` of its departures evenly to all the others
+    airports = []
+    for i in range(count):
+        others = [j for j in range(count) if j != i]
+        routes = tuple(Route(j, share / len(others), flight_time) for j in others)
+        port = base_port + i if base_port else None
+        airports.append(Airport(f"A{i + 1}", runways, workload_spec, seed * 1_000_003 + i,
+                                routes, port))
+    return airports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded multi-airport runway simulation")
+    parser.add_argument('--airports', type=int, default=4)
+    parser.add_argument('--runways', type=int, default=3)
+    parser.add_argument('--workload', default="poisson:rate=0.5",
+                        help="local arrivals per airport (see workload.from_spec)")
+    parser.add_argument('--share', type=float, default=0.5,
+                        help="fraction of departures that fly to another airport")
+    parser.add_argument('--flight-time', type=float, default=30.0,
+                        help="seconds between airports; also the lookahead window")
+    parser.add_argument('--horizon', type=float, default=3600.0, help="simulated seconds")
+    parser.add_argument('--no-progress', action='store_true',
+                        help="skip PROGRESS events (transitions only)")
+    parser.add_argument('--serve', action='store_true',
+                        help=f"serve airport k's events on port {SERVER_PORT}+k for the GUI")
+    parser.add_argument('--base-port', type=int, default=SERVER_PORT)
+    parser.add_argument('--time-scale', type=float, default=None,
+                        help="sim seconds per wall second (default: real time when serving, "
+                             "otherwise as fast as possible)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.airports < 2:
+        parser.error("a network needs at least two airports")
+    airports = mesh(args.airports, args.runways, args.workload, args.share, args.flight_time,
+                    args.seed, args.base_port if args.serve else None)
+    if args.serve:
+        for a in airports:
+            print(f"{a.name}: {a.runways} runways on port {a.port}")
+    time_scale = args.time_scale or (1.0 if args.serve else None)
+    progress = None if args.no_progress else SLICE
+    stats, wall = run_network(airports, args.horizon, progress, time_scale)
+
+    print(f"{'airport':<8}{'events':>11}{'completed':>11}{'sent':>8}{'received':>10}{'cpu s':>8}")
+    for a, s in zip(airports, stats):
+        print(f"{a.name:<8}{s.events:>11}{s.completed:>11}{s.sent:>8}{s.received:>10}"
+              f"{s.cpu:>8.2f}")
+    total = sum(s.events for s in stats)
+    cpu = sum(s.cpu for s in stats)
+    print(f"\n{total} events over {args.horizon:.0f} sim s in {wall:.2f}s wall "
+          f"({total / wall:,.0f} events/s, shard CPU {cpu:.2f}s, "
+          f"{cpu / wall:.1f} cores busy)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
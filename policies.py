@@ -0,0 +1,170 @@
+import heapq, itertools
+from collections import deque
+
+from scheduler import WaitingQueue
+
+# Admission policies for planes that find every runway busy. The engine calls
+#   push(pid, priority, service, now)  when a plane has to wait,
+#   pop(now, runway)                   when runway (0-based) frees up, returning the pid to start,
+# and len() to see whether anyone is waiting. `service` is the plane's runway time, which
+# plane_thread_func knows before it ever asks for a runway.
+#
+# peek() returns the ordering key of the plane pop() would return next. When runways have
+# capabilities the engine keeps one policy instance per compatibility class and, as a runway
+# frees up, serves the compatible class whose head has the smallest key.
+
+
+class Policy:
+    name = None
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def push(self, pid, priority, service, now):
+        raise NotImplementedError
+
+    def pop(self, now, runway):
+        raise NotImplementedError
+
+    def peek(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class FirstComeFirstServed(Policy):
+    name = 'fcfs'
+
+    def __init__(self):
+        self._queue = deque()
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def push(self, pid, priority, service, now):
+        self._queue.append((now, next(self._seq), pid))
+
+    def pop(self, now, runway):
+        return self._queue.popleft()[2]
+
+    def peek(self):
+        return self._queue[0][:2]
+
+    def clear(self):
+        self._queue.clear()
+
+
+class StrictPriority(Policy):
+    # What runway_manager.exe does: lowest priority value first, FIFO among equals.
+    name = 'priority'
+
+    def __init__(self, aging_rate=0.0):
+        self._queue = WaitingQueue(aging_rate)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def push(self, pid, priority, service, now):
+        self._queue.push(pid, priority, now)
+
+    def pop(self, now, runway):
+        return self._queue.pop()[0]
+
+    def peek(self):
+        return self._queue.head_key()
+
+    def clear(self):
+        self._queue.clear()
+
+
+class PriorityWithAging(StrictPriority):
+    # Strict priority where a waiting plane gains aging_rate levels per second.
+    name = 'aging'
+
+    def __init__(self, aging_rate=0.5):
+        super().__init__(aging_rate)
+
+
+class ShortestJobFirst(Policy):
+    # Shortest runway time first; priority then arrival break ties.
+    name = 'sjf'
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, pid, priority, service, now):
+        heapq.heappush(self._heap, (service, priority, now, next(self._seq), pid))
+
+    def pop(self, now, runway):
+        return heapq.heappop(self._heap)[4]
+
+    def peek(self):
+        return self._heap[0][:4]
+
+    def clear(self):
+        self._heap.clear()
+
+
+class WeightedFair(Policy):
+    # Start-time fair queueing over priority classes, with the runways as the shared
+    # capacity. Class p gets weight weights[p] (default 1/p), so over any busy period
+    # its share of runway time is proportional to that weight. Each plane is stamped
+    # with a virtual start S = max(V, last finish of its class) and finish S + service/w;
+    # the smallest S is served next and V advances to it. With runway capabilities each
+    # compatibility class has its own instance, so fairness holds within a class only.
+    name = 'wfq'
+
+    def __init__(self, weights=None):
+        self.weights = weights or {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._finish = {}
+        self._vtime = 0.0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def weight(self, priority):
+        return self.weights.get(priority) or 1.0 / max(priority, 1)
+
+    def push(self, pid, priority, service, now):
+        start = max(self._vtime, self._finish.get(priority, 0.0))
+        self._finish[priority] = start + service / self.weight(priority)
+        heapq.heappush(self._heap, (start, now, next(self._seq), pid))
+
+    def pop(self, now, runway):
+        start, _, _, pid = heapq.heappop(self._heap)
+        self._vtime = start
+        if not self._heap:
+            # idle: forget old classes so they do not carry credit into the next busy period
+            self._finish.clear()
+        return pid
+
+    def peek(self):
+        return self._heap[0][:3]
+
+    def clear(self):
+        self._heap.clear()
+        self._finish.clear()
+        self._vtime = 0.0
+
+
+POLICIES = {cls.name: cls for cls in (FirstComeFirstServed, StrictPriority, ShortestJobFirst,
+                                      PriorityWithAging, WeightedFair)}
+
+
+def make_policy(name, **kwargs):
+    try:
+        cls = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"unknown policy {name!r}, expected one of {', '.join(POLICIES)}")
+    return cls(**kwargs)
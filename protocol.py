@@ -0,0 +1,90 @@
+import struct
+
+import numpy as np
+
+from event_store import STATES, STATE_CODE
+
+# Wire formats between a backend and the GUI.
+#
+# CSV (default, what runway_manager.exe speaks): one "pid,STATE,runway,value\n" line per event.
+#
+# Binary (opt-in): the client appends ",BIN" after the priorities in its CONFIG line. Old
+# backends only read NUM_PLANES priorities and ignore it. A backend that understands the
+# option answers with BINARY_ACK and from then on sends length-prefixed frames, one per
+# tick: a little-endian uint32 record count followed by that many packed RECORD_DTYPE records.
+#
+# Binary is not a free win: frames are about the size of CSV lines (~19 bytes/event), and
+# decoding costs a fixed numpy overhead per socket read, so CSV decodes faster while the GUI
+# keeps up and reads one tick at a time. Binary only pays off once reads carry more than
+# ~100-150 events (a GUI that has fallen behind, or very many runways); it always encodes
+# faster. bench_protocol.py measures the crossover.
+
+BINARY_OPTION = "BIN"
+BINARY_ACK = b"PROTO,BIN\n"
+
+RECORD_DTYPE = np.dtype([('pid', '<u4'), ('state', 'u1'), ('runway', '<u2'),
+                         ('value', '<f4'), ('time', '<f8')])
+FRAME_HEADER = struct.Struct('<I')
+
+_FORMATS = {
+    'QUEUED': '{0},QUEUED,0,{2:g}',
+    'WAITING': '{0},WAITING,0,0.0',
+    'RUNNING': '{0},RUNNING,{1},{2:.2f}',
+    'PROGRESS': '{0},PROGRESS,{1},{2:.2f}',
+    'COMPLETED': '{0},COMPLETED,{1},1.0',
+}
+
+
+def format_event(ev):
+    return _FORMATS[ev.state].format(ev.pid, ev.runway, ev.value)
+
+
+def config_options(msg, num_planes):
+    parts = [p.strip() for p in msg.strip().split(',')]
+    return set(parts[3 + num_planes:])
+
+
+def encode_csv(events):
+    return "".join(format_event(ev) + "\n" for ev in events).encode('utf-8')
+
+
+def encode_frame(events):
+    records = np.array([(ev.pid, STATE_CODE[ev.state], ev.runway, ev.value, ev.time)
+                        for ev in events], dtype=RECORD_DTYPE)
+    return FRAME_HEADER.pack(len(records)) + records.tobytes()
+
+
+def decode_frames(buf):
+    # Decode every complete frame at the front of buf. Only the 4-byte headers are walked
+    # in Python; all records are then pulled out with a single frombuffer + gather.
+    # Returns (records, consumed_bytes); the caller drops the consumed prefix.
+    itemsize = RECORD_DTYPE.itemsize
+    header = FRAME_HEADER.size
+    unpack_from = FRAME_HEADER.unpack_from
+    starts, counts = [], []
+    offset, size = 0, len(buf)
+    while size - offset >= header:
+        (count,) = unpack_from(buf, offset)
+        end = offset + header + count * itemsize
+        if end > size:
+            break
+        starts.append(offset + header)
+        counts.append(count)
+        offset = end
+    total = sum(counts)
+    if not total:
+        return np.empty(0, dtype=RECORD_DTYPE), offset
+    if len(starts) == 1:
+        return np.frombuffer(buf, RECORD_DTYPE, total, starts[0]).copy(), offset
+    counts = np.array(counts)
+    first = np.cumsum(counts) - counts
+    rec_offsets = np.repeat(np.array(starts) - first * itemsize, counts) + np.arange(total) * itemsize
+    raw = np.frombuffer(buf, np.uint8, offset)
+    records = raw[rec_offsets[:, None] + np.arange(itemsize)].view(RECORD_DTYPE).ravel()
+    del raw
+    return records, offset
+
+
+def record_to_line(rec):
+    pid, state, runway, value = rec[:4]
+    return f"{pid},{STATES[state]},{runway},{value:.2f}"
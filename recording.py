@@ -0,0 +1,318 @@
+import bisect, mmap, os, struct, threading, time
+
+import numpy as np
+
+from event_store import STATE_CODE, NONE, QUEUED, WAITING, RUNNING, PROGRESS, COMPLETED
+from protocol import RECORD_DTYPE
+
+# Session recording format.
+#
+# <name>      : MAGIC, FILE_HEADER (record size, config length), the CONFIG line, then
+#               an append-only run of protocol.RECORD_DTYPE records whose `time` is
+#               seconds since the recording started (monotonic, so non-decreasing).
+# <name>.idx  : INDEX_MAGIC, then one entry every `snapshot_every` records: SNAP_HEADER
+#               (record index, time, plane count) followed by that many SNAP_DTYPE rows
+#               giving every plane's state just before that record. An index with another
+#               magic (an older layout) is ignored and seeks replay from the start.
+
+MAGIC = b"RWYREC01"
+INDEX_MAGIC = b"RWYIDX02"
+FILE_HEADER = struct.Struct('<HI')
+SNAP_HEADER = struct.Struct('<QdI')
+SNAP_DTYPE = np.dtype([('pid', '<u4'), ('state', 'u1'), ('runway', '<u2'),
+                       ('value', '<f4'), ('duration', '<f4'), ('priority', '<i4'),
+                       ('queued', '<f8'), ('started', '<f8'), ('ended', '<f8')])
+COLUMNS = SNAP_DTYPE.names[1:]
+TIMES = ('queued', 'started', 'ended')
+
+
+def _column(name, size):
+    return np.full(size, np.nan if name in TIMES else 0, dtype=SNAP_DTYPE[name])
+
+
+class RunwayState:
+    # Latest state of every plane, updated a chunk of records at a time (last write wins).
+    # Besides the last event it keeps what a seek needs to rebuild the plane exactly: the
+    # priority from its QUEUED event and the times it started waiting, took a runway and
+    # completed (NaN until they happen).
+
+    def __init__(self, capacity=64):
+        for name in COLUMNS:
+            setattr(self, name, _column(name, capacity))
+
+    def _reserve(self, size):
+        if size <= len(self.state):
+            return
+        size = max(size, 2 * len(self.state))
+        for name in COLUMNS:
+            old = getattr(self, name)
+            new = _column(name, size)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _apply_last(self, records, code, column, field):
+        sel = records[records['state'] == code]
+        if len(sel):
+            rec = sel[_last_per_pid(sel['pid'])]
+            getattr(self, column)[rec['pid']] = rec[field]
+
+    def apply(self, records):
+        if not len(records):
+            return
+        pids = records['pid']
+        self._reserve(int(pids.max()) + 1)
+        last = _last_per_pid(pids)
+        rec = records[last]
+        self.state[rec['pid']] = rec['state']
+        self.runway[rec['pid']] = rec['runway']
+        self.value[rec['pid']] = rec['value']
+        self._apply_last(records, RUNNING, 'duration', 'value')
+        self._apply_last(records, RUNNING, 'started', 'time')
+        self._apply_last(records, QUEUED, 'priority', 'value')
+        self._apply_last(records, WAITING, 'queued', 'time')
+        self._apply_last(records, COMPLETED, 'ended', 'time')
+
+    def progress(self):
+        return np.select([self.state == PROGRESS, self.state == COMPLETED],
+                         [self.value, 1.0], 0.0)
+
+    def snapshot(self):
+        pids = np.flatnonzero(self.state != NONE)
+        snap = np.empty(len(pids), dtype=SNAP_DTYPE)
+        snap['pid'] = pids
+        for name in COLUMNS:
+            snap[name] = getattr(self, name)[pids]
+        return snap
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        st = cls()
+        if len(snap):
+            st._reserve(int(snap['pid'].max()) + 1)
+            for name in COLUMNS:
+                getattr(st, name)[snap['pid']] = snap[name]
+        return st
+
+
+def _last_per_pid(pids):
+    _, rev_first = np.unique(pids[::-1], return_index=True)
+    return len(pids) - 1 - rev_first
+
+
+def lines_to_records(lines, now):
+    records = np.empty(len(lines), dtype=RECORD_DTYPE)
+    n = 0
+    for line in lines:
+        parts = line.split(',')
+        code = STATE_CODE.get(parts[1].upper()) if len(parts) >= 4 else None
+        if code is None:
+            continue
+        try:
+            records[n] = (int(parts[0]), code, int(parts[2]), float(parts[3]), now)
+        except ValueError:
+            continue
+        n += 1
+    return records[:n]
+
+
+class SessionRecorder:
+    def __init__(self, path, config="", snapshot_every=50_000, buffer_records=8192):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.buffer_records = buffer_records
+        self.count = 0
+        self.state = RunwayState()
+        self._pending = []
+        self._pending_count = 0
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        config = config.strip().encode('utf-8')
+        self._fh = open(path, 'wb')
+        self._fh.write(MAGIC + FILE_HEADER.pack(RECORD_DTYPE.itemsize, len(config)) + config)
+        self._idx = open(path + ".idx", 'wb')
+        self._idx.write(INDEX_MAGIC)
+        self._write_snapshot(0.0)
+
+    def elapsed(self):
+        return time.monotonic() - self._t0
+
+    def write_lines(self, lines):
+        self.write_records(lines_to_records(lines, self.elapsed()), restamp=False)
+
+    def write_records(self, records, restamp=True):
+        if not len(records):
+            return
+        if restamp:
+            records = records.copy()
+            records['time'] = self.elapsed()
+        with self._lock:
+            if self._fh is None:
+                return
+            # split at the snapshot boundary so each snapshot lines up with a record index
+            while len(records):
+                take = min(len(records), self.snapshot_every - self._since_snapshot)
+                head, records = records[:take], records[take:]
+                self._pending.append(head)
+                self._pending_count += len(head)
+                self.state.apply(head)
+                self.count += len(head)
+                self._since_snapshot += len(head)
+                if self._since_snapshot >= self.snapshot_every:
+                    self._flush()
+                    self._write_snapshot(float(head['time'][-1]))
+            if self._pending_count >= self.buffer_records:
+                self._flush()
+
+    def _flush(self):
+        for chunk in self._pending:
+            self._fh.write(chunk.tobytes())
+        self._pending = []
+        self._pending_count = 0
+
+    def _write_snapshot(self, t):
+        snap = self.state.snapshot()
+        self._idx.write(SNAP_HEADER.pack(self.count, t, len(snap)) + snap.tobytes())
+        self._since_snapshot = 0
+
+    def close(self):
+        with self._lock:
+            if self._fh is None:
+                return
+            self._flush()
+            self._fh.close()
+            self._idx.close()
+            self._fh = self._idx = None
+
+
+class SessionReader:
+    # Memory-maps a recording; events are numpy views into the map, never loaded up front.
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a runway session recording")
+        itemsize, config_len = FILE_HEADER.unpack_from(self._map, len(MAGIC))
+        if itemsize != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path}: record size {itemsize}, expected {RECORD_DTYPE.itemsize}")
+        start = len(MAGIC) + FILE_HEADER.size
+        self.config = self._map[start:start + config_len].decode('utf-8')
+        start += config_len
+        count = (len(self._map) - start) // itemsize
+        self.records = np.frombuffer(self._map, RECORD_DTYPE, count, start)
+        self.snapshots = self._load_index(path + ".idx")
+        self._snap_times = [s[1] for s in self.snapshots]
+
+    def _load_index(self, path):
+        snapshots = []
+        if not os.path.exists(path):
+            return [(0, 0.0, np.empty(0, dtype=SNAP_DTYPE))]
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        if data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            return [(0, 0.0, np.empty(0, dtype=SNAP_DTYPE))]
+        offset = len(INDEX_MAGIC)
+        while offset + SNAP_HEADER.size <= len(data):
+            index, t, n = SNAP_HEADER.unpack_from(data, offset)
+            offset += SNAP_HEADER.size
+            snap = np.frombuffer(data, SNAP_DTYPE, n, offset).copy()
+            offset += n * SNAP_DTYPE.itemsize
+            if index <= len(self.records):
+                snapshots.append((index, t, snap))
+        return snapshots or [(0, 0.0, np.empty(0, dtype=SNAP_DTYPE))]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return float(self.records['time'][-1]) if len(self.records) else 0.0
+
+    def index_at(self, t):
+        return int(np.searchsorted(self.records['time'], t, side='right'))
+
+    def iter_chunks(self, start=0, chunk=65536):
+        for i in range(start, len(self.records), chunk):
+            yield self.records[i:i + chunk]
+
+    def state_at(self, t):
+        # nearest snapshot at or before t, then replay only the records after it
+        k = max(0, bisect.bisect_right(self._snap_times, t) - 1)
+        index, _, snap = self.snapshots[k]
+        state = RunwayState.from_snapshot(snap)
+        end = self.index_at(t)
+        for i in range(index, end, 65536):
+            state.apply(self.records[i:min(i + 65536, end)])
+        return state, end
+
+    def close(self):
+        self.records = None
+        self._map.close()
+        self._file.close()
+
+
+class ReplaySource:
+    # Feeds a recording into an IngestPipeline in place of the live socket. speed is a
+    # multiple of real time (1.0, 10.0, ...) or None for as fast as the GUI drains.
+
+    def __init__(self, reader, pipeline, speed=1.0, frame_s=0.04):
+        self.reader = reader
+        self.pipeline = pipeline
+        self.speed = speed
+        self.frame_s = frame_s
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._index = 0
+        self._position = 0.0
+        self._anchor = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def position(self):
+        with self._lock:
+            if self._anchor is None or not self.speed:
+                return self._position
+            wall0, t0 = self._anchor
+            return min(t0 + (time.monotonic() - wall0) * self.speed, self.reader.duration)
+
+    def seek(self, t):
+        # the pipeline is drained under the lock, so nothing fed from the old position can
+        # land after the seek or be lost between it and the GUI's reset
+        state, index = self.reader.state_at(t)
+        with self._lock:
+            self._index = index
+            self._position = t
+            self._anchor = (time.monotonic(), t)
+            self.pipeline.drain()
+        return state
+
+    def _run(self):
+        records = self.reader.records
+        times = records['time']
+        with self._lock:
+            self._anchor = (time.monotonic(), self._position)
+        while not self.stop_event.is_set():
+            with self._lock:
+                start = self._index
+                if start >= len(records):
+                    # stay alive at the end so a seek can resume playback
+                    end = start
+                elif self.speed:
+                    wall0, t0 = self._anchor
+                    now = t0 + (time.monotonic() - wall0) * self.speed
+                    end = int(np.searchsorted(times, now, side='right'))
+                else:
+                    end = min(start + 4096, len(records))
+                    self._position = float(times[end - 1])
+                self._index = max(end, start)
+                if end > start:
+                    self.pipeline.feed_records(records[start:end])
+            time.sleep(self.frame_s)
+
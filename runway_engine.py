@@ -0,0 +1,335 @@
+import argparse, copy, heapq, itertools, math, random, socket, sys, threading, time
+from collections import namedtuple
+from operator import attrgetter
+
+import protocol
+from protocol import format_event
+from policies import POLICIES, StrictPriority, make_policy
+import workload
+from runway_pool import RunwayPool
+from workload import Arrival, backend_service_time
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 54321
+SLICE = 0.05        # PROGRESS interval, matches Sleep(50) in plane_thread_func
+START_GAP = 0.1     # matches Sleep(100) between ResumeThread calls in main
+MAX_BATCH = 4096
+
+Event = namedtuple('Event', 'time pid state runway value')
+
+_ARRIVE, _TICK, _DONE, _CLOSE, _OPEN, _INJECT = range(6)
+
+
+def parse_config(msg):
+    parts = [p.strip() for p in msg.strip().split(',')]
+    if len(parts) < 3 or parts[0] != "CONFIG":
+        raise ValueError(f"not a CONFIG message: {msg.strip()!r}")
+    num_runways, num_planes = int(parts[1]), int(parts[2])
+    priorities = [int(p) for p in parts[3:3 + num_planes]]
+    if num_runways <= 0 or len(priorities) != num_planes:
+        raise ValueError(f"bad CONFIG message: {msg.strip()!r}")
+    return num_runways, priorities
+
+
+class RunwayEngine:
+    # Discrete-event model of runway_manager.exe. By default planes are released in
+    # priority order one per start_gap with a backend service time, as main() does;
+    # `arrivals` replaces that with any time-ordered iterable of Arrival tuples
+    # (service None means draw one), e.g. an open-ended workload.stream(). Streamed planes
+    # are not in the CONFIG line, so each one is announced with a QUEUED event whose value
+    # is its priority. Waiting planes are ordered by `policy` (see policies.py), strict
+    # priority with aging_rate by default.
+    #
+    # Runways come from a RunwayPool, which may give them capabilities that an arrival's
+    # `needs` must match. A freed runway is handed directly to the best compatible waiting
+    # plane. `closures` lists (start, end, runway) windows, runway 1-based, during which a
+    # runway takes no new planes. An arrival whose `needs` no runway has is dropped without
+    # any events and its pid is kept in `rejected`.
+    #
+    # run() simulates from scratch to the end. reset() + advance(until) steps the same model
+    # in time windows, and inject() adds arrivals between windows (see network.py).
+
+    def __init__(self, num_runways, priorities, seed=None,
+                 progress_interval=SLICE, start_gap=START_GAP, aging_rate=0.0,
+                 service_time=backend_service_time, policy=None, arrivals=None,
+                 pool=None, closures=()):
+        self.num_runways = num_runways
+        self.priorities = list(priorities)
+        self.rng = random.Random(seed)
+        self.service_time = service_time
+        self.progress_interval = progress_interval
+        self.start_gap = start_gap
+        self.aging_rate = aging_rate
+        self.policy = policy if policy is not None else StrictPriority(aging_rate)
+        self.arrivals = arrivals
+        self.pool = pool if pool is not None else RunwayPool(num_runways)
+        if self.pool.num_runways != num_runways:
+            raise ValueError(f"pool has {self.pool.num_runways} runways, expected {num_runways}")
+        self.closures = list(closures)
+
+    def default_arrivals(self):
+        order = sorted(range(len(self.priorities)), key=lambda i: self.priorities[i])
+        for j, idx in enumerate(order):
+            yield Arrival(j * self.start_gap, idx + 1, self.priorities[idx], None)
+
+    def reset(self):
+        self.pool.reset()
+        self.policy.clear()
+        self.now = 0.0
+        self._heap = []
+        self._seq = itertools.count()
+        # one queue per `needs` class; unconstrained planes all share self.policy
+        self._waiting = {0: self.policy}
+        self._announce = self.arrivals is not None
+        self._duration = {}
+        self._slot = {}
+        self._started = {}
+        self.rejected = []
+        # arrivals are pulled one at a time so the trace is never held in memory
+        self._arrivals = iter(self.default_arrivals() if self.arrivals is None else self.arrivals)
+        for t0, t1, runway in self.closures:
+            heapq.heappush(self._heap, (t0, next(self._seq), _CLOSE, 0, runway - 1))
+            heapq.heappush(self._heap, (t1, next(self._seq), _OPEN, 0, runway - 1))
+        self._next_arrival()
+
+    def _next_arrival(self):
+        arrival = next(self._arrivals, None)
+        if arrival is not None:
+            heapq.heappush(self._heap, (arrival.time, next(self._seq), _ARRIVE, arrival.pid, arrival))
+
+    def inject(self, arrival):
+        # an arrival from outside self.arrivals, e.g. a flight handed over by another airport
+        if arrival.time < self.now:
+            raise ValueError(f"arrival at {arrival.time} is before the engine clock {self.now}")
+        self._announce = True
+        heapq.heappush(self._heap, (arrival.time, next(self._seq), _INJECT, arrival.pid, arrival))
+
+    def next_time(self):
+        return self._heap[0][0] if self._heap else math.inf
+
+    def run(self):
+        self.reset()
+        yield from self.advance()
+
+    def advance(self, until=math.inf):
+        # process every event before `until`; later events stay queued for the next call
+        heap, seq, pool, waiting = self._heap, self._seq, self.pool, self._waiting
+        duration, slot, started = self._duration, self._slot, self._started
+        interval = self.progress_interval
+
+        def start(now, pid, rw):
+            slot[pid] = rw
+            started[pid] = now
+            d = duration[pid]
+            if interval:
+                heapq.heappush(heap, (now + interval, next(seq), _TICK, pid, 1))
+            else:
+                heapq.heappush(heap, (now + d, next(seq), _DONE, pid, 0))
+            return Event(now, pid, 'RUNNING', rw + 1, d)
+
+        def hand_off(now, rw):
+            queues = [q for needs, q in waiting.items()
+                      if q and (not needs or pool.compatible(rw, needs))]
+            if not queues:
+                return None
+            q = queues[0] if len(queues) == 1 else min(queues, key=lambda q: q.peek())
+            pool.take(rw)
+            return start(now, q.pop(now, rw), rw)
+
+        while heap and heap[0][0] < until:
+            now, _, kind, pid, k = heapq.heappop(heap)
+            self.now = now
+            if kind == _ARRIVE or kind == _INJECT:
+                if kind == _ARRIVE:
+                    self._next_arrival()
+                if k.needs and not pool.compatible_mask(k.needs):
+                    self.rejected.append(pid)
+                    continue
+                d = k.service if k.service is not None else self.service_time(self.rng)
+                duration[pid] = d
+                if self._announce:
+                    yield Event(now, pid, 'QUEUED', 0, float(k.priority))
+                yield Event(now, pid, 'WAITING', 0, 0.0)
+                rw = pool.acquire(k.needs)
+                if rw != -1:
+                    yield start(now, pid, rw)
+                    continue
+                queue = waiting.get(k.needs)
+                if queue is None:
+                    queue = waiting[k.needs] = copy.deepcopy(self.policy)
+                    queue.clear()
+                queue.push(pid, k.priority, d, now)
+            elif kind == _TICK:
+                d = duration[pid]
+                elapsed = k * interval
+                yield Event(now, pid, 'PROGRESS', slot[pid] + 1, min(elapsed / d, 1.0))
+                if elapsed < d - 1e-9:
+                    heapq.heappush(heap, (started[pid] + (k + 1) * interval,
+                                          next(seq), _TICK, pid, k + 1))
+                else:
+                    heapq.heappush(heap, (now, next(seq), _DONE, pid, 0))
+            elif kind == _DONE:
+                rw = slot.pop(pid)
+                del duration[pid], started[pid]
+                yield Event(now, pid, 'COMPLETED', rw + 1, 1.0)
+                if pool.release(rw):
+                    ev = hand_off(now, rw)
+                    if ev is not None:
+                        yield ev
+            elif kind == _CLOSE:
+                pool.close(k)
+            elif pool.reopen(k):
+                ev = hand_off(now, k)
+                if ev is not None:
+                    yield ev
+
+
+def paced(events, time_scale=1.0, stop_event=None, key=attrgetter('time'), start=None):
+    # time_scale=None runs as fast as the CPU allows, otherwise sim seconds per wall second;
+    # start is the monotonic time of sim time 0 (default: now)
+    if not time_scale:
+        yield from events
+        return
+    t0 = time.monotonic() if start is None else start
+    for ev in events:
+        if stop_event is not None and stop_event.is_set():
+            return
+        delay = t0 + key(ev) / time_scale - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield ev
+
+
+def batched(events, window=SLICE, limit=MAX_BATCH):
+    # group events into ticks: everything within `window` sim seconds of the first one
+    batch = []
+    for ev in events:
+        if batch and (ev.time - batch[0].time >= window or len(batch) >= limit):
+            yield batch
+            batch = []
+        batch.append(ev)
+    if batch:
+        yield batch
+
+
+def serve(host=SERVER_HOST, port=SERVER_PORT, time_scale=1.0, seed=None, stop_event=None,
+          workload_spec=None):
+    # one client at a time; after a run (or a dropped client) the next connection is served.
+    # Each client gets its own arrivals built from workload_spec (see workload.from_spec), so
+    # a reconnect starts the stream over instead of resuming a shared, half-used iterator.
+    stop_event = stop_event or threading.Event()
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(1)
+    listener.settimeout(0.5)
+    try:
+        while not stop_event.is_set():
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                try:
+                    _serve_client(conn, time_scale, seed, stop_event, workload_spec)
+                except Exception as e:
+                    # whatever goes wrong in one session, the next client is still served
+                    print(f"client session failed: {e!r}", file=sys.stderr)
+    finally:
+        listener.close()
+
+
+def _serve_client(conn, time_scale, seed, stop_event, workload_spec):
+    conn.settimeout(0.5)
+    buf = b""
+    while b"\n" not in buf:
+        if stop_event.is_set():
+            return
+        try:
+            data = conn.recv(1024)
+        except socket.timeout:
+            continue
+        except OSError:
+            return
+        if not data:
+            return
+        buf += data
+    try:
+        line = buf.split(b"\n", 1)[0].decode('utf-8')
+        num_runways, priorities = parse_config(line)
+    except (ValueError, UnicodeDecodeError) as e:
+        # a bad client only loses its own connection; serve() keeps accepting
+        print(f"rejected client: {e}", file=sys.stderr)
+        return
+    encode = protocol.encode_csv
+    if protocol.BINARY_OPTION in protocol.config_options(line, len(priorities)):
+        conn.sendall(protocol.BINARY_ACK)
+        encode = protocol.encode_frame
+    arrivals = workload.from_spec(workload_spec, seed) if workload_spec else None
+    engine = RunwayEngine(num_runways, priorities, seed=seed, arrivals=arrivals)
+    # one send per tick instead of one per event
+    for batch in paced(batched(engine.run()), time_scale, stop_event,
+                       key=lambda b: b[-1].time):
+        try:
+            conn.sendall(encode(batch))
+        except OSError:
+            return
+
+
+def start_server_thread(host=SERVER_HOST, port=SERVER_PORT, time_scale=1.0, seed=None,
+                        workload_spec=None):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=serve,
+                              args=(host, port, time_scale, seed, stop_event, workload_spec),
+                              daemon=True)
+    thread.start()
+    return thread, stop_event
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pure-Python runway scheduling engine")
+    parser.add_argument('--serve', action='store_true',
+                        help="act as a drop-in backend on the GUI port")
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--config', default="CONFIG,3,10,1,2,3,4,5,6,7,8,9,10",
+                        help="CONFIG line for headless runs")
+    parser.add_argument('--time-scale', type=float, default=None,
+                        help="sim seconds per wall second (default: as fast as possible)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--aging-rate', type=float, default=None,
+                        help="priority levels gained per second of waiting "
+                             "(priority and aging policies only)")
+    parser.add_argument('--policy', choices=list(POLICIES), default=None,
+                        help="waiting-queue policy (default: strict priority)")
+    parser.add_argument('--workload', default=None,
+                        help="open arrival stream instead of the CONFIG planes, e.g. "
+                             "poisson:rate=0.9,service=lognormal (see workload.from_spec)")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(port=args.port, time_scale=args.time_scale or 1.0, seed=args.seed,
+              workload_spec=args.workload)
+        return 0
+
+    arrivals = workload.from_spec(args.workload, args.seed) if args.workload else None
+
+    num_runways, priorities = parse_config(args.config)
+    if args.aging_rate is not None and args.policy not in (None, 'priority', 'aging'):
+        parser.error(f"--aging-rate does not apply to --policy {args.policy}")
+    policy = None
+    if args.policy:
+        policy = make_policy(args.policy, **({'aging_rate': args.aging_rate}
+                                            if args.aging_rate is not None else {}))
+    engine = RunwayEngine(num_runways, priorities, seed=args.seed,
+                          aging_rate=args.aging_rate or 0.0, policy=policy, arrivals=arrivals)
+    out = sys.stdout
+    for ev in paced(engine.run(), args.time_scale):
+        out.write(format_event(ev) + "\n")
+    if engine.rejected:
+        print(f"{len(engine.rejected)} planes rejected, no runway has what they need",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,46 +2,129 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading, subprocess, socket, time, os, sys
+import argparse, importlib, threading, subprocess, time, os
 
-import matplotlib
-matplotlib.use('TkAgg')
-from matplotlib.ticker import MultipleLocator
-
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 
+import runway_engine
+from ingest import IngestPipeline
+import event_store
+from event_store import PlaneStore
+from sprites import SpritePool
+from status_view import VirtualStatusTable
+import protocol
+from recording import SessionRecorder, SessionReader, ReplaySource
+import logpane
+from logpane import LogBuffer, LogPane
+from transport import BackendConnection, NEW_CONNECTION
+from instrument import Instruments, MetricsServer, Profiler
+
+def _import_all(names):
+    for name in names:
+        importlib.import_module(name)
+
+
 SERVER_HOST = '127.0.0.1'
 SERVER_PORT = 54321
 C_EXECUTABLE = "runway_manager.exe"
-NUM_RUNWAYS = 3
 NUM_PLANES = 10
-
-plane_widgets = {}
-plane_table_entries = {}
-gantt_data = []
+# matplotlib is most of the GUI's import time, so the timeline is built only once the window
+# is up or a segment completes, whichever is first; these are imported on a helper thread
+CHART_MODULES = ('matplotlib.figure', 'matplotlib.backends.backend_tkagg', 'gantt')
+LOG_LINES = 500
+FRAME_MS = 40
+LOD_THRESHOLD = 150
+MAX_BACKLOG = 20000   # undrained transitions before the pump stops reading the backend
+# an open-ended --workload stream would otherwise grow the plane table, the segment list
+# and the timeline forever; older landed planes and bars beyond these are let go
+KEEP_LANDED = 5000
+KEEP_SEGMENTS = 20000
+
+plane_store = PlaneStore(keep_completed=KEEP_LANDED, keep_segments=KEEP_SEGMENTS)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Airport runway scheduler GUI")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="backend port")
+    parser.add_argument('--runways', type=int, default=3)
+    parser.add_argument('--engine', action='store_true',
+                        help=f"use the in-process Python engine even if {C_EXECUTABLE} exists")
+    parser.add_argument('--binary', action='store_true', help="ask for binary framing")
+    parser.add_argument('--attach', action='store_true',
+                        help="connect to a backend that is already running, e.g. one shard "
+                             "of network.py, instead of launching one")
+    parser.add_argument('--workload', default=None,
+                        help="stream arrivals from the in-process engine, e.g. "
+                             "poisson:rate=0.9 (see workload.from_spec)")
+    parser.add_argument('--record', metavar='PATH', help="record the session to PATH")
+    parser.add_argument('--replay', metavar='PATH', help="replay a recorded session")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="multiple of real time; 0 replays as fast as the GUI drains")
+    parser.add_argument('--log-level', type=str.upper, choices=list(logpane.LEVELS),
+                        default='DEBUG')
+    parser.add_argument('--log-file', default=None)
+    parser.add_argument('--no-metrics', dest='metrics', action='store_false',
+                        help="turn latency instrumentation off")
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help="serve metrics as JSON and Prometheus text (/metrics)")
+    parser.add_argument('--profile', choices=('sample', 'cprofile'), default='sample',
+                        help="profiler toggled with F3")
+    parser.add_argument('--no-chart', dest='chart', action='store_false',
+                        help="never load matplotlib; the timeline tab stays empty")
+    options = parser.parse_args(argv)
+    if options.runways < 1:
+        parser.error("--runways must be at least 1")
+    options.streaming = bool(options.workload) or options.attach
+    return options
 
 
 class AirportApp(tb.Window):
-    def __init__(self):
+    def __init__(self, options=None):
+        self.options = options = options if options is not None else parse_args([])
+        self.num_runways = options.runways
         super().__init__(title="Airport Runway Scheduler – User Priority", themename="darkly")
         self.geometry("1150x850")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.c_process = None
-        self.sock = None
+        self.engine_stop = None
+        self.conn = None
         self.stop_event = threading.Event()
         self.sim_start_time = time.time()
         self.priority_vars = {}
-        self.socket_connected = False
+        self.ingest = IngestPipeline()
+        self.ingest_job_id = None
+        self.message_count = 0
+        self.logbuf = LogBuffer(capacity=2000, level=logpane.LEVELS[options.log_level])
+        if options.log_file:
+            self.logbuf.attach_file(options.log_file)
+        self.replay = None
+        self.replay_priorities = None
+        self.metrics = Instruments(enabled=options.metrics)
+        self.metrics_server = (MetricsServer(self.metrics, options.metrics_port)
+                               if options.metrics_port else None)
+        self.profiler = Profiler(options.profile)
+        self.overlay_id = None
+        self.show_overlay = False
 
         self.animation_job_id = None
+        self.frame_ms = 0.0
+        self.frame_count = 0
+        self.runway_sprite = {}
         self.gantt_fig = None
         self.gantt_ax = None
+        self.gantt = None
+        self.chart_loader = None
 
         self.build_ui()
-        self.launch_backend()
-        threading.Thread(target=self.listen_backend, daemon=True).start()
+        if options.replay:
+            self.open_replay(options.replay)
+        else:
+            if not options.attach:
+                self.launch_backend()
+            self.conn = BackendConnection(SERVER_HOST, options.port, log=self.logbuf.info).start()
+            threading.Thread(target=self.pump_ingest, args=(self.conn.subscribe(),),
+                             daemon=True).start()
+        self.drain_ingest()
 
     def build_ui(self):
         header = ttk.Frame(self, padding=10)
@@ -52,10 +135,14 @@ class AirportApp(tb.Window):
         priority_frame = ttk.Frame(self, padding=5)
         priority_frame.pack(fill='x', padx=10, pady=(5, 5))
         ttk.Label(priority_frame,
-                  text="Set Plane Priorities (1=Highest, 1 to 10):",
+                  text="Set Plane Priorities (1=Highest, ties run first-come):",
                   font=("Segoe UI", 10, "bold")).pack(side='left', padx=(0, 10))
 
-        for i in range(1, NUM_PLANES + 1):
+        options = self.options
+        if options.streaming:
+            source = f"workload {options.workload}" if options.workload else f"port {options.port}"
+            ttk.Label(priority_frame, text=f"Streaming from {source}").pack(side='left')
+        for i in range(1, 0 if options.streaming else NUM_PLANES + 1):
             var = tk.StringVar(value=str(i))
             self.priority_vars[i] = var
             p_group = ttk.Frame(priority_frame)
@@ -67,8 +154,16 @@ class AirportApp(tb.Window):
                                     command=self.start_simulation, bootstyle="success")
         self.start_btn.pack(side='left', padx=(20, 0))
 
+        self.ingest_label = ttk.Label(header, text="", font=("Segoe UI", 9))
+        self.ingest_label.pack(side='right', padx=10)
+        self.frame_label = ttk.Label(header, text="", font=("Segoe UI", 9))
+        self.frame_label.pack(side='right', padx=10)
+        self.conn_label = ttk.Label(header, text="", font=("Segoe UI", 9))
+        self.conn_label.pack(side='right', padx=10)
+
         self.canvas = tk.Canvas(self, bg="#1a202c", height=250)
         self.canvas.pack(fill='x', padx=10, pady=(5, 10))
+        self.sprites = SpritePool(self.canvas, LOD_THRESHOLD)
         self._draw_runways()
 
         bottom_frame = ttk.Frame(self)
@@ -83,12 +178,8 @@ class AirportApp(tb.Window):
         table_notebook.pack(fill='both', expand=True)
         status_tab = ttk.Frame(table_notebook)
         table_notebook.add(status_tab, text="✈️ Plane Status")
-        cols = ("Plane", "Prio", "Runway", "Status", "Elapsed")
-        self.tree = ttk.Treeview(status_tab, columns=cols, show="headings", height=15)
-        for c in cols:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, anchor='center', minwidth=40, width=60)
-        self.tree.pack(fill='both', expand=True)
+        self.table = VirtualStatusTable(status_tab, plane_store, self.num_runways, rows=15)
+        self.table.pack(fill='both', expand=True)
 
         chart_container = ttk.Frame(bottom_frame)
         chart_container.grid(row=0, column=1, sticky="nsew", padx=(5, 0))
@@ -98,58 +189,103 @@ class AirportApp(tb.Window):
         chart_notebook.add(gantt_tab, text="📊 Runway Timeline (Gantt Chart)")
         self.gantt_frame = ttk.Frame(gantt_tab, padding=0)
         self.gantt_frame.pack(fill='both', expand=True)
-        plt.style.use('dark_background')
-        self.gantt_fig, self.gantt_ax = plt.subplots(figsize=(10, 3.0))
-        self.gantt_canvas = FigureCanvasTkAgg(self.gantt_fig, master=self.gantt_frame)
-        self.gantt_canvas_widget = self.gantt_canvas.get_tk_widget()
-        self.gantt_canvas_widget.pack(fill='both', expand=True, pady=(5, 5))
-        self._initialize_gantt()
+        self.chart_placeholder = ttk.Label(
+            self.gantt_frame, anchor='center',
+            text="Loading timeline..." if options.chart else "Timeline disabled (--no-chart)")
+        self.chart_placeholder.pack(fill='both', expand=True)
+        summary_tab = ttk.Frame(chart_notebook, padding=10)
+        chart_notebook.add(summary_tab, text="📋 Runway Summary")
+        self.summary_label = ttk.Label(summary_tab, anchor='nw', justify='left',
+                                       font=("Consolas", 10))
+        self.summary_label.pack(fill='both', expand=True)
+        if options.chart:
+            # children's <Map> events reach this binding too; only the window's own counts,
+            # and after_idle lets it finish drawing before the chart is built
+            self.bind("<Map>", lambda e: e.widget is self and self.after_idle(self.request_chart),
+                      add='+')
+        self.bind("<F2>", lambda e: self.toggle_overlay())
+        self.bind("<F3>", lambda e: self.toggle_profiler())
+
+        if options.replay:
+            replay_bar = ttk.Frame(self, padding=(10, 0))
+            replay_bar.pack(fill='x')
+            ttk.Label(replay_bar, text="Replay position (s):").pack(side='left')
+            self.seek_scale = tk.Scale(replay_bar, from_=0, to=1, orient='horizontal',
+                                       resolution=0.1, showvalue=True, length=600)
+            self.seek_scale.pack(side='left', fill='x', expand=True, padx=5)
+            self.seek_scale.bind("<ButtonRelease-1>",
+                                 lambda e: self.seek_replay(self.seek_scale.get()))
 
         self.log = tk.Text(self, height=4, bg="#111", fg="#00ffcc")
         self.log.pack(fill='x', padx=10, pady=(0, 10))
+        self.log_pane = LogPane(self.log, self.logbuf, LOG_LINES)
 
-    def _initialize_gantt(self):
-        self.gantt_ax.clear()
-        self.gantt_ax.set_facecolor('#1a202c')
-        self.gantt_ax.set_yticks([10 * (i + 1) for i in range(NUM_RUNWAYS)])
-        self.gantt_ax.set_yticklabels([f"R{i + 1}" for i in range(NUM_RUNWAYS)])
-        self.gantt_ax.xaxis.set_major_locator(MultipleLocator(2))
-        self.gantt_ax.set_xlabel("Time (seconds)")
-        self.gantt_ax.grid(axis='x', linestyle='--', alpha=0.5)
-        self.gantt_ax.set_xlim(0, 30)
-        self.gantt_ax.set_ylim(5, 10 * (NUM_RUNWAYS + 1) - 5)
-        self.gantt_fig.tight_layout(pad=0.5)
-        self.gantt_canvas.draw()
-
-    def _update_gantt_chart(self):
-        global gantt_data
-        if not hasattr(self, 'gantt_ax'):
+    def request_chart(self):
+        if not self.options.chart or self.gantt is not None or self.chart_loader is not None:
             return
-        self.gantt_ax.clear()
-        self._initialize_gantt()
-        if not gantt_data:
-            self.gantt_canvas.draw()
+        self.chart_loader = threading.Thread(target=_import_all, args=(CHART_MODULES,),
+                                             daemon=True)
+        self.chart_loader.start()
+        self._poll_chart_loader()
+
+    def _poll_chart_loader(self):
+        if self.chart_loader.is_alive():
+            self.after(FRAME_MS, self._poll_chart_loader)
             return
-        max_time = max(item['end'] for item in gantt_data)
-        self.gantt_ax.set_xlim(0, max_time * 1.1 + 5)
-        colors = plt.colormaps.get_cmap('hsv')
-        for item in gantt_data:
-            runway_idx = item['runway'] - 1
-            y_pos = 10 * (runway_idx + 1)
-            self.gantt_ax.broken_barh([(item['start'], item['duration'])],
-                                      (y_pos - 4, 8),
-                                      facecolors=colors(item['plane'] / NUM_PLANES),
-                                      edgecolor='black')
-            self.gantt_ax.text(item['start'] + item['duration'] / 2, y_pos,
-                               f"P{item['plane']}", ha='center', va='center',
-                               color='black', fontsize=8, fontweight='bold')
-        self.gantt_fig.canvas.draw_idle()
+        try:
+            self.build_chart()
+        except ImportError as e:
+            self.chart_placeholder.configure(text=f"Timeline unavailable: {e}")
+            self.logbuf.error(f"[ERROR] Cannot build timeline: {e}")
+
+    def build_chart(self):
+        import matplotlib.style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from gantt import GanttTimeline
+
+        t0 = time.perf_counter()
+        matplotlib.style.use('dark_background')
+        self.gantt_fig = Figure(figsize=(10, 3.0))
+        self.gantt_ax = self.gantt_fig.add_subplot()
+        self.gantt_canvas = FigureCanvasTkAgg(self.gantt_fig, master=self.gantt_frame)
+        self.gantt_canvas_widget = self.gantt_canvas.get_tk_widget()
+        self.chart_placeholder.pack_forget()
+        self.gantt_canvas_widget.pack(fill='both', expand=True, pady=(5, 5))
+        gantt = GanttTimeline(self.gantt_ax, self.gantt_canvas, self.num_runways, NUM_PLANES,
+                              schedule=self.after, frame_ms=FRAME_MS, max_bars=KEEP_SEGMENTS)
+        gantt.setup()
+        gantt.flush = self.metrics.wrap('chart_blit', gantt.flush)
+        self.gantt_canvas.draw = self.metrics.wrap('chart_draw', self.gantt_canvas.draw)
+        # catch up on segments that completed before the chart existed
+        segments = plane_store.segments
+        for runway, pid, start, end in zip(segments.view('runway').tolist(),
+                                           segments.view('plane').tolist(),
+                                           segments.view('start').tolist(),
+                                           segments.view('end').tolist()):
+            gantt.add_segment(runway, pid, start, end)
+        self.gantt = gantt
+        self.metrics.record('chart_build', time.perf_counter() - t0)
+        self.logbuf.debug(f"[DEBUG] Timeline built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def update_summary(self):
+        n = plane_store.count
+        state, runway = plane_store.state[:n], plane_store.runway[:n]
+        active = (state == event_store.RUNNING) | (state == event_store.PROGRESS)
+        size = max(self.num_runways, int(runway.max(initial=0))) + 1
+        landed = plane_store.segments.landed
+        busy = np.bincount(runway[active], minlength=size)
+        lines = [f"Runway {r}: {int(landed[r]) if r < len(landed) else 0:>5} landed"
+                 f"{' | busy' if busy[r] else ''}" for r in range(1, self.num_runways + 1)]
+        waiting = int(np.count_nonzero(state == event_store.WAITING))
+        lines.append(f"\nWaiting {waiting} | landed {int(landed[1:].sum())}")
+        self.summary_label.config(text="\n".join(lines))
 
     def _draw_runways(self):
         h = 250
-        spacing = (h - 30) / NUM_RUNWAYS
+        spacing = (h - 30) / self.num_runways
         self.runway_coords = []
-        for i in range(NUM_RUNWAYS):
+        for i in range(self.num_runways):
             y1 = 20 + i * spacing
             y2 = y1 + 40
             self.canvas.create_rectangle(80, y1, 1000, y2, fill="#2a384f", outline="#4299e1", width=2)
@@ -159,139 +295,220 @@ class AirportApp(tb.Window):
                                     fill="#90cdf4", font=("Segoe UI", 10, "bold"))
             self.runway_coords.append((80, y1, 1000, y2))
             self.canvas.create_line(980, y1, 980, y2, fill="#f56565", width=2)
+        self.runway_start_x = np.array([c[0] + 60 for c in self.runway_coords], dtype=float)
+        self.runway_travel = np.array([c[2] - 10 for c in self.runway_coords]) - self.runway_start_x
 
     def send_command(self, msg):
-        if not self.socket_connected or not self.sock:
-            self.log.insert("end", "[ERROR] Socket not connected. Cannot send command.\n")
-            self.log.see("end")
+        if not self.conn or not self.conn.connected:
+            self.logbuf.error("[ERROR] Socket not connected. Cannot send command.")
             return False
-        try:
-            self.sock.sendall(msg.encode('utf-8'))
-            self.log.insert("end", f"[IPC] Sent: {msg.strip()}\n")
-            self.log.see("end")
-            return True
-        except Exception as e:
-            self.log.insert("end", f"[ERROR] Failed to send command: {e}\n")
-            self.log.see("end")
+        if not self.conn.send(msg.encode('utf-8')):
+            self.logbuf.error("[ERROR] Send queue full, command dropped.")
             return False
+        self.logbuf.info(f"[IPC] Queued: {msg.strip()}")
+        return True
+
+    def now(self):
+        if self.replay:
+            return self.replay.position()
+        return time.time() - self.sim_start_time
+
+    def _reset_run(self):
+        plane_store.clear()
+        self.table.reset()
+        self.table.set_runways(self.num_runways)
+        self.sim_start_time = time.time()
+        if self.gantt is not None:
+            self.gantt.reset(self.num_runways)
+        self.log_pane.clear()
+        self.canvas.delete("all")
+        self.sprites.reset()
+        self.runway_sprite.clear()
+        self._draw_runways()
+        self.overlay_id = None
+
+    def _load_planes(self, priorities):
+        for pid, prio in enumerate(priorities, 1):
+            plane_store.add(pid, prio)
+        self.sprites.prewarm(min(len(priorities), LOD_THRESHOLD))
+        if self.animation_job_id is None:
+            self.animate_planes()
 
     def start_simulation(self):
-        if not self.socket_connected:
+        if self.replay:
+            self.seek_replay(0.0)
+            return
+        if not self.conn or not self.conn.connected:
             messagebox.showerror("Connection Error",
                                  "Backend not connected yet. Please wait a moment and try again.")
             return
 
-        self.tree.delete(*self.tree.get_children())
-        global plane_widgets, plane_table_entries, gantt_data
-        plane_widgets.clear()
-        plane_table_entries.clear()
-        gantt_data.clear()
-        self.sim_start_time = time.time()
-        self._update_gantt_chart()
-        self.log.delete(1.0, tk.END)
-        self.canvas.delete("all")
-        self._draw_runways()
+        self._reset_run()
 
         priorities = []
         try:
-            for i in range(1, NUM_PLANES + 1):
+            for i in self.priority_vars:
                 p = int(self.priority_vars[i].get())
                 if p <= 0: raise ValueError
                 priorities.append(p)
-            if len(set(priorities)) != NUM_PLANES:
-                raise ValueError
         except ValueError:
             messagebox.showerror("Input Error",
-                                 "All plane priorities must be unique positive integers (1-10).")
+                                 "All plane priorities must be positive integers (1 = highest).")
             return
 
-        for i in range(NUM_PLANES):
-            pid = i + 1
-            prio = priorities[i]
-            item = self.tree.insert('', 'end', values=(pid, prio, 0, "QUEUED", "0s"))
-            plane_table_entries[pid] = item
-
-        if self.animation_job_id is None:
-            self.animate_planes()
-
-        config_msg = f"CONFIG,{NUM_RUNWAYS},{NUM_PLANES},{','.join(map(str, priorities))}\r\n"
-        self.log.insert("end", f"[DEBUG] Sending config: {config_msg.strip()}\n")
-        self.log.see("end")
+        self._load_planes(priorities)
+
+        options = f",{protocol.BINARY_OPTION}" if self.options.binary else ""
+        self.ingest.expect_binary = self.options.binary
+        # a streaming source announces planes as they arrive (QUEUED)
+        plane_list = "".join(f",{p}" for p in priorities)
+        config_msg = f"CONFIG,{self.num_runways},{len(priorities)}{plane_list}{options}\r\n"
+        self.logbuf.debug(f"[DEBUG] Sending config: {config_msg.strip()}")
+        if self.options.record:
+            if self.ingest.recorder:
+                self.ingest.recorder.close()
+            self.ingest.recorder = SessionRecorder(self.options.record, config_msg)
         
         if not self.send_command(config_msg):
-            self.log.insert("end", "[ERROR] Failed to send config!\n")
-            self.log.see("end")
+            self.logbuf.error("[ERROR] Failed to send config!")
             return
         
-        self.log.insert("end", "[DEBUG] Config sent successfully\n")
-        self.log.see("end")
+        self.logbuf.debug("[DEBUG] Config sent successfully")
+
+    def open_replay(self, path):
+        reader = SessionReader(path)
+        # the recording's CONFIG, not --runways, decides how many runways its events use
+        self.num_runways, self.replay_priorities = runway_engine.parse_config(reader.config)
+        speed = self.options.replay_speed or None
+        self.replay = ReplaySource(reader, self.ingest, speed, FRAME_MS / 1000.0)
+        self.seek_scale.configure(to=max(reader.duration, 0.1))
+        self._reset_run()
+        self._load_planes(self.replay_priorities)
+        self.logbuf.info(f"[INFO] Replaying {path}: {len(reader)} events, "
+                          f"{reader.duration:.1f}s at {speed or 'max'}x")
+        self.replay.start()
+
+    def seek_replay(self, t):
+        # seek() also discards whatever the replay fed before it, under the replay lock
+        state = self.replay.seek(t)
+        self._reset_run()
+        self._load_planes(self.replay_priorities)
+        progress = state.progress()
+        segments = plane_store.segments
+        for pid in np.flatnonzero(state.state).tolist():
+            name = event_store.STATES[state.state[pid]]
+            if pid not in plane_store:
+                if self.replay_priorities:
+                    continue
+                plane_store.add(pid, int(state.priority[pid]))
+            # replay the plane's transitions at their recorded times, so waits and
+            # runway segments start where they really did rather than at the seek point
+            runway = int(state.runway[pid])
+            queued, started = float(state.queued[pid]), float(state.started[pid])
+            if not np.isnan(queued):
+                plane_store.record(pid, "WAITING", 0, 0.0, queued)
+            if name == "WAITING":
+                self._draw_waiting(pid)
+            elif name in ("RUNNING", "PROGRESS", "COMPLETED") and not np.isnan(started):
+                plane_store.record(pid, "RUNNING", runway, float(state.duration[pid]), started)
+                if name == "COMPLETED":
+                    self._finish_plane(pid)
+                    seg = plane_store.record(pid, name, runway, 1.0, float(state.ended[pid]))
+                    if seg >= 0 and self.gantt is not None:
+                        self.gantt.add_segment(runway, pid, segments.start[seg],
+                                               segments.end[seg])
+                else:
+                    plane_store.record(pid, "PROGRESS", runway, float(progress[pid]), t)
+                    self._draw_plane(pid, runway)
+            self.table.mark_dirty(plane_store.rows[pid])
+            for freed in plane_store.retire():
+                self.sprites.release(freed)
 
     def launch_backend(self):
-        if not os.path.exists(C_EXECUTABLE):
-            messagebox.showerror("Error", f"{C_EXECUTABLE} not found.")
-            self.destroy()
+        options = self.options
+        if options.engine or options.workload or not os.path.exists(C_EXECUTABLE):
+            _, self.engine_stop = runway_engine.start_server_thread(
+                SERVER_HOST, options.port, workload_spec=options.workload)
+            self.logbuf.info("[INFO] Python engine backend started in-process. "
+                              "Waiting for user 'Start'...")
             return
         try:
             self.c_process = subprocess.Popen([C_EXECUTABLE],
                                               stdout=subprocess.DEVNULL,
                                               stderr=subprocess.DEVNULL)
-            self.log.insert("end", f"[INFO] C backend launched (PID {self.c_process.pid}). "
-                                    f"Waiting for user 'Start'...\n")
-            self.log.see("end")
+            self.logbuf.info(f"[INFO] C backend launched (PID {self.c_process.pid}). "
+                              f"Waiting for user 'Start'...")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to launch backend: {e}")
             self.destroy()
 
-    def listen_backend(self):
-        time.sleep(0.5)
-        
-        for attempt in range(100):
-            try:
-                self.sock = socket.create_connection((SERVER_HOST, SERVER_PORT), timeout=1.0)
-                self.socket_connected = True
-                self.log.insert("end", f"[IPC] Connected to backend on attempt {attempt + 1}.\n")
-                self.log.see("end")
-                break
-            except Exception as e:
-                time.sleep(0.1)
-        
-        if not self.sock:
-            self.log.insert("end", "[ERROR] Could not connect to backend after 100 attempts.\n")
-            self.log.see("end")
-            return
-        else:
-            self.log.insert("end", "[IPC] Socket ready – backend should now receive commands.\n")
-            self.log.see("end")
-
-        buf = ""
-        message_count = 0
+    def pump_ingest(self, sub):
+        # transport subscription -> IngestPipeline, off the Tk thread. While the GUI is
+        # MAX_BACKLOG transitions behind, stop pulling: the subscription fills and the
+        # transport stops reading the socket until the GUI catches up.
         while not self.stop_event.is_set():
-            try:
-                data = self.sock.recv(1024)
-                if not data:
-                    self.log.insert("end", "[IPC] Backend closed connection.\n")
-                    self.log.see("end")
-                    break
-                
-                buf += data.decode("utf-8", errors="ignore")
-                
-                while "\n" in buf:
-                    line, buf = buf.split("\n", 1)
-                    if line.strip():
-                        message_count += 1
-                        self.log.insert("end", f"[RECV #{message_count}] {line.strip()}\n")
-                        self.log.see("end")
-                        self.after(0, self.process_msg, line.strip())
-            except socket.timeout:
+            if self.ingest.backlog() > MAX_BACKLOG:
+                time.sleep(FRAME_MS / 1000.0)
                 continue
-            except Exception as e:
-                if not self.stop_event.is_set():
-                    self.log.insert("end", f"[ERROR] Socket recv error: {e}\n")
-                    self.log.see("end")
-                break
-        
-        self.log.insert("end", f"[IPC] Connection closed. Total messages received: {message_count}\n")
-        self.log.see("end")
+            data = sub.get(timeout=0.2)
+            if data is NEW_CONNECTION:
+                self.ingest.restart()
+            elif data:
+                with self.metrics.timer('parse'):
+                    self.ingest.feed(data)
+
+    def drain_ingest(self):
+        # rescheduled whatever happens, so nothing in one frame can stop ingest for good
+        try:
+            self._drain_frame()
+        finally:
+            self.ingest_job_id = self.after(FRAME_MS, self.drain_ingest)
+
+    def _drain_frame(self):
+        t0 = time.perf_counter()
+        batch = self.ingest.drain()
+        if batch.lines or batch.events:
+            self.metrics.record('ingest_lag', batch.lag)
+            self.metrics.count('received', batch.received)
+            self.metrics.count('coalesced', batch.coalesced)
+            first = self.message_count + 1
+            self.message_count += len(batch.lines) + len(batch.events)
+            if self.logbuf.enabled(logpane.TRACE):
+                lines = batch.lines or [protocol.record_to_line(ev) for ev in batch.events]
+                for i, line in enumerate(lines):
+                    self.logbuf.trace(f"[RECV #{first + i}] {line}")
+            # a bad event only loses itself, as when each message had its own after() call
+            for line in batch.lines:
+                try:
+                    self.process_msg(line)
+                except Exception as e:
+                    self.logbuf.error(f"[ERROR] Dropped message {line!r}: {e!r}")
+            for pid, state, runway, value in batch.events:
+                try:
+                    self.process_event(pid, event_store.STATES[state], runway, value)
+                except Exception as e:
+                    self.logbuf.error(f"[ERROR] Dropped event {pid},{state},{runway},"
+                                      f"{value}: {e!r}")
+            self.ingest_label.config(
+                text=f"Ingest lag {batch.lag * 1000:.0f} ms | "
+                     f"recv {self.ingest.total_received} | "
+                     f"coalesced {self.ingest.total_coalesced}")
+            self.metrics.record('drain', time.perf_counter() - t0)
+        with self.metrics.timer('table'):
+            self.table.refresh()
+        self.log_pane.flush()
+        if self.frame_count % 25 == 0:
+            self.update_overlay()
+            self.update_summary()
+        if self.conn and self.frame_count % 25 == 0:
+            h = self.conn.health()
+            rtt = f"{h['rtt_ms']:.1f} ms" if h['rtt_ms'] is not None else "-"
+            self.conn_label.config(
+                text=f"{'Connected' if h['connected'] else 'Reconnecting'} | RTT {rtt} | "
+                     f"sendq {h['send_queue']} | recvq {h['recv_queue_bytes'] // 1024} KB | "
+                     f"reconnects {h['reconnects']}")
+        if self.replay and self.frame_count % 5 == 0:
+            self.seek_scale.set(self.replay.position())
 
     def process_msg(self, msg):
         parts = msg.split(',')
@@ -306,167 +523,176 @@ class AirportApp(tb.Window):
             runway = int(parts[2])
             data_value = float(parts[3])
         except (ValueError, IndexError):
-            self.log.insert("end", f"[WARNING] Malformed message: {msg}\n")
-            self.log.see("end")
+            self.logbuf.warning(f"[WARNING] Malformed message: {msg}")
             return
+        self.process_event(pid, state, runway, data_value)
 
-        current_time = time.time() - self.sim_start_time
+    def process_event(self, pid, state, runway, data_value):
+        current_time = self.now()
 
-        item_id = plane_table_entries.get(pid)
-        if not item_id:
+        if state == "QUEUED":
+            # a streamed plane arriving: the value field carries its priority
+            if pid not in plane_store:
+                self.table.mark_dirty(plane_store.add(pid, int(data_value)))
             return
-        
-        try:
-            prio = int(self.tree.set(item_id, "Prio"))
-        except:
-            prio = 0
+        if pid not in plane_store or state not in event_store.STATE_CODE:
+            return
+        row = plane_store.rows[pid]
+        prio = int(plane_store.priority[row])
 
-        self.log.insert("end", f"[{time.strftime('%H:%M:%S')}] Plane {pid} -> {state} "
-                                f"(Runway {runway}) [Prio: {prio}]\n")
-        self.log.see("end")
+        level = logpane.TRACE if state == "PROGRESS" else logpane.DEBUG
+        if self.logbuf.enabled(level):
+            self.logbuf.log(level, f"[{time.strftime('%H:%M:%S')}] Plane {pid} -> {state} "
+                                   f"(Runway {runway}) [Prio: {prio}]")
 
-        if pid not in plane_widgets:
-            plane_widgets[pid] = {'duration': 0.0, 'progress': 0.0, 'state': state,
-                                  'runway': runway, 'plane_id_label': None, 'segment_start': None}
-        cfg = plane_widgets[pid]
-        cfg['state'] = state
-        cfg['runway'] = runway
+        was_sprite = plane_store.sprite[row]
+        seg = plane_store.record(pid, state, runway, data_value, current_time)
 
         if state == "RUNNING":
-            cfg['duration'] = data_value
-            cfg['progress'] = 0.0
-            cfg['segment_start'] = current_time
             self._clear_plane_widgets(pid)
             self._draw_plane(pid, runway)
-            self.tree.set(item_id, "Runway", runway)
-            self.tree.set(item_id, "Status", "RUNNING")
 
         elif state == "WAITING":
-            cfg['progress'] = data_value
-            if cfg.get('rect_type') != 'waiting':
+            if was_sprite != event_store.SPRITE_WAITING:
                 self._clear_plane_widgets(pid)
                 self._draw_waiting(pid)
-            self.tree.set(item_id, "Runway", 0)
-            self.tree.set(item_id, "Status", "WAITING")
-
-        elif state == "PROGRESS":
-            cfg['progress'] = data_value
-            self.tree.set(item_id, "Status", "PROGRESS")
 
         elif state == "COMPLETED":
-            cfg['progress'] = 1.0
             self._finish_plane(pid)
-            final_duration = cfg.get('duration', 0.0)
-            segment_start = cfg.pop('segment_start', None)
-            if segment_start is not None:
-                global gantt_data
-                gantt_data.append({'runway': runway, 'plane': pid,
-                                   'start': segment_start, 'end': current_time,
-                                   'duration': current_time - segment_start})
-                self._update_gantt_chart()
-            self.tree.set(item_id, "Runway", 0)
-            self.tree.set(item_id, "Status", "COMPLETED")
-            self.tree.set(item_id, "Elapsed", f"{int(final_duration)}s")
-
-        duration = cfg.get('duration', 0.0)
-        elapsed_s = int(cfg.get('progress', 0.0) * duration)
-        self.tree.set(item_id, "Elapsed", f"{elapsed_s}s")
-
-    def _draw_plane_shape(self, x, y, size, color, tags_list):
-        f_x1, f_y1 = x - size * 1.5, y - size * 0.2
-        f_x2, f_y2 = x + size * 2.5, y + size * 0.2
-        self.canvas.create_rectangle(f_x1, f_y1, f_x2, f_y2, fill=color, outline=color, tags=tags_list)
-        self.canvas.create_polygon(x + size * 0.5, y - size * 1.5,
-                                   x - size * 0.5, y - size * 0.2,
-                                   x - size * 0.5, y + size * 0.2,
-                                   x + size * 0.5, y + size * 1.5,
-                                   fill="#aeb0b3", outline="#000", tags=tags_list)
-        tail_x = f_x2 - size * 0.2
-        self.canvas.create_polygon(tail_x, f_y1,
-                                   tail_x + size * 0.5, f_y1 - size * 0.8,
-                                   tail_x + size * 0.5, f_y2,
-                                   fill="#aeb0b3", outline="#000", tags=tags_list)
-        self.canvas.create_oval(x - size * 2.5, y - size * 0.2,
-                                x - size * 1.5, y + size * 0.2,
-                                fill=color, outline="#000", tags=tags_list)
-        return x, y
+            if seg >= 0:
+                if self.gantt is None:
+                    self.request_chart()
+                else:
+                    segments = plane_store.segments
+                    self.gantt.add_segment(runway, pid, segments.start[seg], segments.end[seg])
+            for freed in plane_store.retire():
+                self.sprites.release(freed)
+
+        self.table.mark_dirty(row)
 
     def _draw_plane(self, pid, runway):
-        self._clear_plane_widgets(pid)
+        previous = self.runway_sprite.get(runway)
+        if previous is not None and previous != pid and previous in plane_store:
+            self.sprites.release(plane_store.rows[previous])
+        self.runway_sprite[runway] = pid
         coords = self.runway_coords[runway - 1]
         x_center_init = coords[0] + 60
         y_center = (coords[1] + coords[3]) // 2
-        tags = (f"p{pid}", f"p{pid} shape")
-        self._draw_plane_shape(x_center_init, y_center, 10, "#4a90e2", tags)
-        prio = int(self.tree.set(plane_table_entries[pid], "Prio"))
-        txt = self.canvas.create_text(x_center_init - 35, y_center, text=f"P{pid} ({prio})",
-                                      font=("Segoe UI", 8, "bold"), fill="#000",
-                                      tags=(f"p{pid}", f"p{pid} text"))
-        plane_widgets[pid]['txt_id'] = txt
-        plane_widgets[pid]['rect_type'] = 'runway'
+        row = plane_store.rows[pid]
+        prio = plane_store.priority[row]
+        self.sprites.place(row, x_center_init, y_center, 10, "#4a90e2", f"P{pid} ({prio})",
+                           -35, 0, ("Segoe UI", 8, "bold"))
+        plane_store.sprite[row] = event_store.SPRITE_RUNWAY
 
     def _draw_waiting(self, pid):
-        self._clear_plane_widgets(pid)
-        x_base = 20 + ((pid - 1) // NUM_PLANES) * 30
-        y_base = 20 + ((pid - 1) % NUM_RUNWAYS) * 80 + 30
-        tags = (f"p{pid}", f"p{pid} shape")
-        self._draw_plane_shape(x_base, y_base, 5, "#f6e05e", tags)
-        prio = int(self.tree.set(plane_table_entries[pid], "Prio"))
-        txt = self.canvas.create_text(x_base, y_base - 10, text=f"P{pid} ({prio})",
-                                      font=("Segoe UI", 7, "bold"), fill="#000",
-                                      tags=(f"p{pid}", f"p{pid} text"))
-        plane_widgets[pid]['txt_id'] = txt
-        plane_widgets[pid]['rect_type'] = 'waiting'
+        row = plane_store.rows[pid]
+        x_base = self._wait_x(row)
+        y_base = 20 + ((pid - 1) % self.num_runways) * 80 + 30
+        prio = plane_store.priority[row]
+        self.sprites.place(row, x_base, y_base, 5, "#f6e05e", f"P{pid} ({prio})",
+                           0, -10, ("Segoe UI", 7, "bold"))
+        plane_store.sprite[row] = event_store.SPRITE_WAITING
+
+    def _wait_x(self, rows):
+        # two columns of waiting planes left of the runways, however many rows are in use
+        return 20 + (rows // NUM_PLANES) % 2 * 30
 
     def _clear_plane_widgets(self, pid):
-        self.canvas.delete(f"p{pid}")
-        cfg = plane_widgets.get(pid, {})
-        if 'txt_id' in cfg:
-            del cfg['txt_id']
+        row = plane_store.rows[pid]
+        self.sprites.release(row)
+        plane_store.sprite[row] = event_store.SPRITE_NONE
 
     def _finish_plane(self, pid):
-        self.canvas.itemconfig(f"p{pid} shape", fill="#a0a0a0", outline="#505050")
-        self.canvas.itemconfig(f"p{pid} text", fill="#000")
+        self.sprites.finish(plane_store.rows[pid])
 
     def animate_planes(self):
-        for pid, cfg in list(plane_widgets.items()):
-            progress = cfg.get('progress', 0.0)
-            state = cfg.get('state')
-            runway = cfg.get('runway')
-            if state in ("RUNNING", "PROGRESS") and runway > 0:
-                coords = self.runway_coords[runway - 1]
-                runway_start_x = coords[0] + 60
-                runway_end_x = coords[2] - 10
-                travel_distance = runway_end_x - runway_start_x
-                x_target = runway_start_x + travel_distance * progress
-                text_coords = self.canvas.coords(f"p{pid} text")
-                if text_coords:
-                    current_x = text_coords[0]
-                    move_amount = x_target - current_x
-                    self.canvas.move(f"p{pid}", move_amount, 0)
-            elif state == "WAITING":
-                jiggle_offset = int((progress * 20) % 5) - 2
-                text_coords = self.canvas.coords(f"p{pid} text")
-                if text_coords:
-                    current_x = text_coords[0]
-                    x_base = 20 + ((pid - 1) // NUM_PLANES) * 30
-                    target_x = x_base + jiggle_offset
-                    move_amount = target_x - current_x
-                    self.canvas.move(f"p{pid}", move_amount, 0)
-        self.animation_job_id = self.after(40, self.animate_planes)
+        t0 = time.perf_counter()
+        n = plane_store.count
+        state = plane_store.state[:n]
+        runway = plane_store.runway[:n]
+        on_runway = np.flatnonzero(((state == event_store.RUNNING) |
+                                    (state == event_store.PROGRESS)) & (runway > 0))
+        waiting = np.flatnonzero(state == event_store.WAITING)
+        self.sprites.update_lod(len(on_runway) + len(waiting))
+        if len(on_runway):
+            r = runway[on_runway] - 1
+            targets = self.runway_start_x[r] + self.runway_travel[r] * plane_store.progress[on_runway]
+            self.sprites.move_to(on_runway, targets)
+        if len(waiting):
+            jiggle = (plane_store.progress[waiting] * 20 % 5).astype(np.intp) - 2
+            self.sprites.move_to(waiting, self._wait_x(waiting) + jiggle)
+
+        frame_s = time.perf_counter() - t0
+        self.metrics.record('frame', frame_s)
+        frame_ms = frame_s * 1000
+        self.frame_ms = 0.9 * self.frame_ms + 0.1 * frame_ms
+        self.frame_count += 1
+        if self.frame_count % 25 == 0:
+            self.frame_label.config(text=f"Anim tick {self.frame_ms:.2f} ms | "
+                                         f"{len(on_runway) + len(waiting)} active"
+                                         f"{' (LOD)' if self.sprites.lod else ''}")
+        self.animation_job_id = self.after(FRAME_MS, self.animate_planes)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.update_overlay()
+
+    def update_overlay(self):
+        m = self.metrics
+        if not m.enabled:
+            return
+        m.gauge('after_queue', len(self.tk.splitlist(self.tk.call('after', 'info'))))
+        m.gauge('ingest_backlog', self.ingest.backlog())
+        for code, n in enumerate(self.ingest.state_counts):
+            if n:
+                m.events[event_store.STATES[code]] = n
+        if not self.show_overlay:
+            if self.overlay_id is not None:
+                self.canvas.itemconfigure(self.overlay_id, state='hidden')
+            return
+        lines = m.summary_lines(('ingest_lag', 'parse', 'drain', 'table', 'frame',
+                                 'chart_blit', 'chart_draw'))
+        lines.append("events " + " ".join(f"{s[:4]}={n}" for s, n in sorted(m.events.items())))
+        lines.append(f"after queue {m.gauges['after_queue']} | "
+                     f"backlog {m.gauges['ingest_backlog']}")
+        text = "\n".join(lines)
+        if self.overlay_id is None:
+            self.overlay_id = self.canvas.create_text(
+                self.canvas.winfo_width() - 6, 6, anchor='ne', fill="#e2e8f0",
+                font=("Consolas", 8), text=text)
+        else:
+            self.canvas.itemconfigure(self.overlay_id, text=text, state='normal')
+        self.canvas.tag_raise(self.overlay_id)
+
+    def toggle_profiler(self):
+        report = self.profiler.toggle()
+        if report is None:
+            self.logbuf.info(f"[PROFILE] {self.profiler.mode} profiler started (F3 to stop)")
+            return
+        for line in report.splitlines():
+            self.logbuf.info(f"[PROFILE] {line}")
 
     def on_close(self):
         self.stop_event.set()
-        if self.animation_job_id:
-            try:
-                self.after_cancel(self.animation_job_id)
-            except:
-                pass
-        if self.sock:
-            try:
-                self.sock.close()
-            except:
-                pass
+        if self.profiler.active is not None:
+            self.profiler.stop()
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.engine_stop:
+            self.engine_stop.set()
+        if self.replay:
+            self.replay.stop()
+        if self.ingest.recorder:
+            self.ingest.recorder.close()
+        self.logbuf.close()
+        for job_id in (self.animation_job_id, self.ingest_job_id):
+            if job_id:
+                try:
+                    self.after_cancel(job_id)
+                except:
+                    pass
+        if self.conn:
+            self.conn.stop()
         if self.c_process and self.c_process.poll() is None:
             self.c_process.terminate()
             try:
@@ -477,5 +703,5 @@ class AirportApp(tb.Window):
 
 
 if __name__ == "__main__":
-    app = AirportApp()
+    app = AirportApp(parse_args())
     app.mainloop()
\ No newline at end of file
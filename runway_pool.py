@@ -0,0 +1,87 @@
+# Runway allocation for the engine, replacing the C backend's semaphore + linear scan of
+# runway_status + Sleep(50) retry. Free and open runways are bits in two integers, so
+# acquire is "lowest set bit of free & open & compatible" and release is one bit flip,
+# independent of the runway count. Runways are 0-based here, 1-based on the wire.
+#
+# Capabilities are bit flags per runway (e.g. LONG for heavies, ILS for low visibility);
+# a plane needs a set of flags and may only use runways that have all of them. needs=0
+# matches every runway.
+#
+# Closures nest: a runway closed twice (overlapping windows) stays closed until both
+# have been reopened.
+
+LONG = 1
+ILS = 2
+
+
+def _lowest(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+class RunwayPool:
+    def __init__(self, num_runways, capabilities=None):
+        self.num_runways = num_runways
+        self.capabilities = list(capabilities) if capabilities else [0] * num_runways
+        if len(self.capabilities) != num_runways:
+            raise ValueError(f"{len(self.capabilities)} capability entries for "
+                             f"{num_runways} runways")
+        self._all = (1 << num_runways) - 1
+        self._compat = {}
+        self.reset()
+
+    def reset(self):
+        self._free = self._all
+        self._open = self._all
+        self._closures = [0] * self.num_runways
+
+    def compatible_mask(self, needs):
+        mask = self._compat.get(needs)
+        if mask is None:
+            mask = 0
+            for rw, caps in enumerate(self.capabilities):
+                if caps & needs == needs:
+                    mask |= 1 << rw
+            self._compat[needs] = mask
+        return mask
+
+    def compatible(self, runway, needs):
+        return self.capabilities[runway] & needs == needs
+
+    def is_free(self, runway):
+        return bool((self._free & self._open) >> runway & 1)
+
+    def free_count(self):
+        return bin(self._free & self._open).count('1')
+
+    def acquire(self, needs=0):
+        # lowest-numbered free, open runway the plane can use, or -1
+        mask = self._free & self._open & (self.compatible_mask(needs) if needs else self._all)
+        if not mask:
+            return -1
+        rw = _lowest(mask)
+        self._free ^= 1 << rw
+        return rw
+
+    def take(self, runway):
+        # hand a specific runway straight to a waiting plane
+        self._free &= ~(1 << runway)
+
+    def release(self, runway):
+        # returns True if the runway can be handed on now (it is open)
+        self._free |= 1 << runway
+        return bool(self._open >> runway & 1)
+
+    def close(self, runway):
+        # a plane already on the runway finishes; nothing new is given it until reopen()
+        self._closures[runway] += 1
+        self._open &= ~(1 << runway)
+
+    def reopen(self, runway):
+        # returns True if this was the last closure and the runway is idle, so it can be
+        # handed to a waiting plane
+        if self._closures[runway] > 1:
+            self._closures[runway] -= 1
+            return False
+        self._closures[runway] = 0
+        self._open |= 1 << runway
+        return bool(self._free >> runway & 1)
@@ -0,0 +1,43 @@
+import heapq, itertools
+
+
+class WaitingQueue:
+    # Binary heap keyed on (priority, arrival seq): 1 = highest, FIFO among equal priorities.
+    # With aging, a plane's effective priority at time t is priority - aging_rate * (t - enqueued).
+    # Every waiting plane ages at the same rate, so ordering by priority + aging_rate * enqueued
+    # gives the same order at any t and the heap never has to be re-keyed.
+
+    def __init__(self, aging_rate=0.0):
+        self.aging_rate = aging_rate
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def push(self, pid, priority, now=0.0):
+        key = priority + self.aging_rate * now if self.aging_rate else priority
+        heapq.heappush(self._heap, (key, next(self._seq), now, pid, priority))
+
+    def pop(self):
+        _, _, _, pid, priority = heapq.heappop(self._heap)
+        return pid, priority
+
+    def peek(self):
+        _, _, _, pid, priority = self._heap[0]
+        return pid, priority
+
+    def head_key(self):
+        # (key, enqueued, seq) of the next plane: comparable across queues with the same
+        # aging_rate, since enqueued orders planes that tie on key between queues
+        key, seq, now = self._heap[0][:3]
+        return key, now, seq
+
+    def effective_priority(self, priority, enqueued, now):
+        return priority - self.aging_rate * (now - enqueued)
+
+    def clear(self):
+        self._heap.clear()
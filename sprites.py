@@ -0,0 +1,139 @@
+import numpy as np
+
+FULL, LOD = 0, 1
+WING_COLOR = "#aeb0b3"
+DONE_FILL, DONE_OUTLINE = "#a0a0a0", "#505050"
+
+
+def plane_shape_coords(x, y, size):
+    # fuselage, wing, tail, nose -- the same geometry _draw_plane_shape used to create
+    f_x1, f_y1 = x - size * 1.5, y - size * 0.2
+    f_x2, f_y2 = x + size * 2.5, y + size * 0.2
+    tail_x = f_x2 - size * 0.2
+    return (
+        (f_x1, f_y1, f_x2, f_y2),
+        (x + size * 0.5, y - size * 1.5, x - size * 0.5, y - size * 0.2,
+         x - size * 0.5, y + size * 0.2, x + size * 0.5, y + size * 1.5),
+        (tail_x, f_y1, tail_x + size * 0.5, f_y1 - size * 0.8, tail_x + size * 0.5, f_y2),
+        (x - size * 2.5, y - size * 0.2, x - size * 1.5, y + size * 0.2),
+    )
+
+
+class SpritePool:
+    # Canvas items for planes are created once and recycled: a state change re-positions
+    # and re-colours an existing sprite instead of deleting and recreating five items.
+    # Above lod_threshold active planes, new sprites are a single rectangle.
+    # Sprites are keyed by the plane's PlaneStore row, which is reused once the plane is
+    # released, so the pool and anchor array stay as small as the store.
+    # anchor[row] is the sprite's current x + label_dx in either kind, so the animation
+    # targets mean the same thing for both and a tick only moves sprites whose target moved.
+
+    def __init__(self, canvas, lod_threshold=150):
+        self.canvas = canvas
+        self.lod_threshold = lod_threshold
+        self.lod = False
+        self.anchor = np.full(64, np.nan)
+        self._free = ([], [])
+        self._slots = {}
+        self._next_tag = 0
+        self.created = 0
+
+    def reset(self):
+        # call after canvas.delete("all"): every pooled item is gone
+        self._free = ([], [])
+        self._slots.clear()
+        self.anchor[:] = np.nan
+
+    def prewarm(self, count, kind=FULL):
+        for _ in range(count - len(self._free[kind])):
+            self._free[kind].append(self._create(kind))
+
+    def _create(self, kind):
+        c = self.canvas
+        tag = f"sp{self._next_tag}"
+        self._next_tag += 1
+        self.created += 1
+        if kind == LOD:
+            items = (c.create_rectangle(0, 0, 0, 0, width=0, state='hidden', tags=(tag,)),)
+        else:
+            items = (
+                c.create_rectangle(0, 0, 0, 0, state='hidden', tags=(tag,)),
+                c.create_polygon(0, 0, 0, 0, 0, 0, fill=WING_COLOR, outline="#000",
+                                 state='hidden', tags=(tag,)),
+                c.create_polygon(0, 0, 0, 0, 0, 0, fill=WING_COLOR, outline="#000",
+                                 state='hidden', tags=(tag,)),
+                c.create_oval(0, 0, 0, 0, outline="#000", state='hidden', tags=(tag,)),
+                c.create_text(0, 0, fill="#000", state='hidden', tags=(tag,)),
+            )
+        return tag, items
+
+    def place(self, row, x, y, size, color, label, label_dx, label_dy, font):
+        self.release(row)
+        kind = LOD if self.lod else FULL
+        free = self._free[kind]
+        tag, items = free.pop() if free else self._create(kind)
+        c = self.canvas
+        if kind == LOD:
+            c.coords(items[0], x - size * 1.5, y - size * 0.4, x + size * 1.5, y + size * 0.4)
+            c.itemconfigure(items[0], fill=color, state='normal')
+        else:
+            fuselage, wing, tail, nose = plane_shape_coords(x, y, size)
+            c.coords(items[0], *fuselage)
+            c.itemconfigure(items[0], fill=color, outline=color, state='normal')
+            c.coords(items[1], *wing)
+            c.itemconfigure(items[1], fill=WING_COLOR, outline="#000", state='normal')
+            c.coords(items[2], *tail)
+            c.itemconfigure(items[2], fill=WING_COLOR, outline="#000", state='normal')
+            c.coords(items[3], *nose)
+            c.itemconfigure(items[3], fill=color, outline="#000", state='normal')
+            c.coords(items[4], x + label_dx, y + label_dy)
+            c.itemconfigure(items[4], text=label, font=font, state='normal')
+        self._slots[row] = (kind, tag, items)
+        if row >= len(self.anchor):
+            grown = np.full(max(row + 1, 2 * len(self.anchor)), np.nan)
+            grown[:len(self.anchor)] = self.anchor
+            self.anchor = grown
+        self.anchor[row] = x + label_dx
+
+    def release(self, row):
+        slot = self._slots.pop(row, None)
+        if slot is None:
+            return
+        kind, tag, items = slot
+        for item in items:
+            self.canvas.itemconfigure(item, state='hidden')
+        self._free[kind].append((tag, items))
+        self.anchor[row] = np.nan
+
+    def finish(self, row):
+        slot = self._slots.get(row)
+        if slot is None:
+            return
+        kind, _, items = slot
+        shapes = items if kind == LOD else items[:4]
+        for item in shapes:
+            self.canvas.itemconfigure(item, fill=DONE_FILL)
+            if kind == FULL:
+                self.canvas.itemconfigure(item, outline=DONE_OUTLINE)
+
+    def has(self, row):
+        return row in self._slots
+
+    def update_lod(self, active_count):
+        self.lod = active_count > self.lod_threshold
+
+    def move_to(self, rows, targets, min_step=0.5):
+        # rows/targets are parallel arrays; only sprites that moved at least min_step pixels
+        # are touched, with one canvas.move per sprite (all its items share one tag)
+        if not len(rows):
+            return 0
+        current = self.anchor[rows]
+        delta = targets - current
+        moved = np.flatnonzero(np.abs(delta) >= min_step)
+        move, slots = self.canvas.move, self._slots
+        for i in moved:
+            slot = slots.get(int(rows[i]))
+            if slot is not None:
+                move(slot[1], float(delta[i]), 0)
+        self.anchor[rows[moved]] = targets[moved]
+        return len(moved)
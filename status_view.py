@@ -0,0 +1,189 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+import event_store
+
+COLUMNS = ("Plane", "Prio", "Runway", "Status", "Elapsed")
+ALL = "All"
+
+
+class VirtualStatusTable(ttk.Frame):
+    # Plane status table backed by a PlaneStore. Only `rows` Treeview items ever exist;
+    # scrolling, sorting and filtering change which store rows they show. Events call
+    # mark_dirty(row) and refresh() rewrites, once per frame, just the visible rows that
+    # changed (or all of them if the view itself changed, or planes were added).
+
+    def __init__(self, master, store, num_runways, rows=15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.store = store
+        self.rows = rows
+        self.top = 0
+        self.order = np.empty(0, dtype=np.intp)
+        self.sort_column = None
+        self.sort_reverse = False
+        self._dirty = set()
+        self._view_stale = True
+        self._order_generation = -1
+        self._shown = [None] * rows
+
+        bar = ttk.Frame(self)
+        bar.pack(fill='x', pady=(2, 2))
+        ttk.Label(bar, text="Status:").pack(side='left', padx=(2, 2))
+        self.status_filter = tk.StringVar(value=ALL)
+        status_box = ttk.Combobox(bar, textvariable=self.status_filter, width=11, state='readonly',
+                                  values=(ALL,) + event_store.STATES[1:])
+        status_box.pack(side='left')
+        ttk.Label(bar, text="Runway:").pack(side='left', padx=(8, 2))
+        self.runway_filter = tk.StringVar(value=ALL)
+        self.runway_box = ttk.Combobox(bar, textvariable=self.runway_filter, width=5,
+                                       state='readonly')
+        self.runway_box.pack(side='left')
+        self.count_label = ttk.Label(bar, text="")
+        self.count_label.pack(side='right', padx=4)
+        self.set_runways(num_runways)
+        for box in (status_box, self.runway_box):
+            box.bind("<<ComboboxSelected>>", lambda e: self.invalidate())
+
+        body = ttk.Frame(self)
+        body.pack(fill='both', expand=True)
+        self.tree = ttk.Treeview(body, columns=COLUMNS, show="headings", height=rows,
+                                 selectmode='none')
+        for c in COLUMNS:
+            self.tree.heading(c, text=c, command=lambda c=c: self.sort_by(c))
+            self.tree.column(c, anchor='center', minwidth=40, width=60)
+        for i in range(rows):
+            self.tree.insert('', 'end', iid=f"v{i}", values=("",) * len(COLUMNS))
+        self.scroll = ttk.Scrollbar(body, orient='vertical', command=self._on_scrollbar)
+        self.scroll.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+        for widget in (self.tree, self.scroll):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+            widget.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+    def set_runways(self, num_runways):
+        values = (ALL,) + tuple(str(r) for r in range(1, num_runways + 1))
+        self.runway_box.configure(values=values)
+        if self.runway_filter.get() not in values:
+            self.runway_filter.set(ALL)
+            self.invalidate()
+
+    def reset(self):
+        self.top = 0
+        self._dirty.clear()
+        self.invalidate()
+
+    def invalidate(self):
+        self._view_stale = True
+
+    def mark_dirty(self, row):
+        self._dirty.add(row)
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self.invalidate()
+        self.refresh()
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.order) - self.rows))
+        if top != self.top:
+            self.top = top
+            self._render(range(self.rows))
+            self._update_scrollbar()
+
+    def _on_wheel(self, event):
+        self.scroll_to(self.top - event.delta // 40)
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(float(args[0]) * len(self.order))
+        elif action == 'scroll':
+            step = self.rows if args[1] == 'pages' else 1
+            self.scroll_to(self.top + int(args[0]) * step)
+
+    def _update_scrollbar(self):
+        n = len(self.order)
+        if n <= self.rows:
+            self.scroll.set(0.0, 1.0)
+        else:
+            self.scroll.set(self.top / n, (self.top + self.rows) / n)
+
+    def _sort_key(self, n):
+        s = self.store
+        if self.sort_column in (None, "Plane"):
+            # rows are reused, so row order is not arrival order
+            return s.pid[:n]
+        if self.sort_column == "Prio":
+            return s.priority[:n]
+        if self.sort_column == "Runway":
+            return self._display_runway(np.arange(n))
+        if self.sort_column == "Status":
+            return s.state[:n]
+        if self.sort_column == "Elapsed":
+            return s.progress[:n] * s.duration[:n]
+        return None
+
+    def _display_runway(self, rows):
+        s = self.store
+        state = s.state[rows]
+        active = (state == event_store.RUNNING) | (state == event_store.PROGRESS)
+        return np.where(active, s.runway[rows], 0)
+
+    def _rebuild_order(self):
+        s = self.store
+        n = s.count
+        mask = s.state[:n] != event_store.NONE
+        status = self.status_filter.get()
+        if status != ALL:
+            mask &= s.state[:n] == event_store.STATE_CODE[status]
+        runway = self.runway_filter.get()
+        if runway != ALL:
+            mask &= self._display_runway(np.arange(n)) == int(runway)
+        rows = np.flatnonzero(mask)
+        key = self._sort_key(n)
+        if key is not None:
+            rows = rows[np.argsort(key[rows], kind='stable')]
+        if self.sort_reverse:
+            rows = rows[::-1]
+        self.order = rows
+        self._order_generation = s.generation
+        self.top = max(0, min(self.top, len(rows) - self.rows))
+        self.count_label.config(text=f"{len(rows)} / {len(s)} planes")
+
+    def refresh(self):
+        dynamic_view = (self.sort_column not in (None, "Plane", "Prio")
+                        or self.status_filter.get() != ALL or self.runway_filter.get() != ALL)
+        moved = self.store.generation != self._order_generation
+        if self._view_stale or moved or (self._dirty and dynamic_view):
+            self._view_stale = False
+            self._dirty.clear()
+            self._rebuild_order()
+            self._render(range(self.rows))
+            self._update_scrollbar()
+            return
+        if not self._dirty:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        self._render(i for i, row in enumerate(self._shown) if row in dirty)
+
+    def _render(self, slots):
+        s, order, item = self.store, self.order, self.tree.item
+        for i in slots:
+            pos = self.top + i
+            if pos >= len(order):
+                if self._shown[i] is not None:
+                    item(f"v{i}", values=("",) * len(COLUMNS))
+                    self._shown[i] = None
+                continue
+            row = int(order[pos])
+            runway = int(self._display_runway(row))
+            item(f"v{i}", values=(int(s.pid[row]), int(s.priority[row]), runway,
+                                  event_store.STATES[s.state[row]],
+                                  f"{int(s.progress[row] * s.duration[row])}s"))
+            self._shown[i] = row
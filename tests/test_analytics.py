@@ -0,0 +1,105 @@
+import random
+
+import numpy as np
+import pytest
+
+import analytics
+import workload
+from runway_engine import RunwayEngine
+
+
+def intervals(seed, n=200, horizon=100.0, integer=False):
+    rng = random.Random(seed)
+    starts, ends = [], []
+    for _ in range(n):
+        s = rng.uniform(0, horizon)
+        e = s + rng.expovariate(1 / 5)
+        if integer:
+            s, e = float(int(s)), float(int(s) + rng.randint(0, 6))
+        starts.append(s)
+        ends.append(e)
+    return np.array(starts), np.array(ends)
+
+
+def brute_mean(starts, ends, edges):
+    return np.array([sum(max(0.0, min(e, hi) - max(s, lo)) for s, e in zip(starts, ends))
+                     / (hi - lo) for lo, hi in zip(edges[:-1], edges[1:])])
+
+
+def brute_max(starts, ends, edges):
+    # the level only rises at a start, so the peak is at the bin's edge or some start in it
+    out = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        points = [lo] + [s for s in starts if lo <= s < hi]
+        out.append(max(sum(1 for s, e in zip(starts, ends) if s <= p < e) for p in points))
+    return np.array(out)
+
+
+@pytest.mark.parametrize('seed,integer', [(1, False), (2, True), (3, True)])
+def test_binned_mean_and_max_match_brute_force(seed, integer):
+    starts, ends = intervals(seed, integer=integer)
+    edges = np.array([-5.0, 0.0, 0.5, 3.0, 10.0, 10.25, 40.0, 77.7, 99.0, 130.0, 131.0])
+    t, level = analytics.occupancy(starts, ends)
+    assert np.all(np.diff(t) > 0)
+    assert np.allclose(analytics.binned_mean(t, level, edges), brute_mean(starts, ends, edges))
+    assert np.array_equal(analytics.binned_max(t, level, edges), brute_max(starts, ends, edges))
+
+
+def test_empty_step_function():
+    t, level = analytics.occupancy(np.empty(0), np.empty(0))
+    edges = np.array([0.0, 1.0, 2.0])
+    assert list(analytics.binned_mean(t, level, edges)) == [0.0, 0.0]
+    assert list(analytics.binned_max(t, level, edges)) == [0, 0]
+
+
+def test_bin_edges_end_at_horizon():
+    run = analytics.RunLog(*[np.empty(0)] * 7, 1, horizon=10.0)
+    assert list(analytics.bin_edges(run, 2.5)) == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert list(analytics.bin_edges(run, 3.0)) == [0.0, 3.0, 6.0, 9.0, 10.0]
+
+
+def engine_run(runways=3, planes=400, seed=4):
+    arrivals = workload.stream(workload.poisson(0.8, random.Random(seed)),
+                               workload.exponential(), seed=seed, limit=planes)
+    engine = RunwayEngine(runways, [], seed=seed, arrivals=arrivals)
+    return list(engine.run())
+
+
+def test_run_log_matches_event_walk():
+    events = engine_run()
+    run = analytics.from_records(analytics.records_from_events(events), num_runways=3)
+    arrival, start, end, runway = {}, {}, {}, {}
+    for ev in events:
+        if ev.state in ('QUEUED', 'WAITING'):
+            arrival.setdefault(ev.pid, ev.time)
+        elif ev.state == 'RUNNING':
+            start[ev.pid], runway[ev.pid] = ev.time, ev.runway
+        elif ev.state == 'COMPLETED':
+            end[ev.pid] = ev.time
+    assert list(run.pid) == sorted(arrival)
+    assert np.allclose(run.wait, [start[p] - arrival[p] for p in run.pid])
+    horizon = max(ev.time for ev in events)
+    busy = [sum(end[p] - start[p] for p in start if runway[p] == r) for r in (1, 2, 3)]
+    assert np.allclose(analytics.utilisation(run), np.array(busy) / horizon)
+
+    edges = analytics.bin_edges(run)
+    timeline = analytics.utilisation_timeline(run, edges)
+    for r in (1, 2, 3):
+        pids = [p for p in start if runway[p] == r]
+        expect = brute_mean([start[p] for p in pids], [end[p] for p in pids], edges)
+        assert np.allclose(timeline[r - 1], expect)
+    # the bins partition the run, so they average back to overall utilisation
+    assert np.allclose(timeline @ np.diff(edges) / horizon, analytics.utilisation(run))
+
+
+def test_report_and_what_if(tmp_path):
+    run = analytics.from_records(analytics.records_from_events(engine_run(planes=120)),
+                                 num_runways=3)
+    report = analytics.Report(run, what_if_runways=(2, 4))
+    assert [row['runways'] for row in report.what_if] == [2, 4]
+    assert all(row['planes'] == 120 for row in report.what_if)
+    assert report.what_if[0]['wait_mean'] >= report.what_if[1]['wait_mean']
+    assert sum(w['count'] for w in report.waits.values()) == report.summary['completed'] == 120
+    path = tmp_path / "report.html"
+    report.to_html(str(path))
+    assert "What-if" in path.read_text(encoding='utf-8')
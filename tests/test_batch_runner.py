@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+import batch_runner
+from batch_runner import PRIORITY_KINDS, Task, build_tasks, make_priorities, run_one
+
+
+@pytest.mark.parametrize('option', [['--service', 'backend,nope'], ['--priorities', 'fifo']])
+def test_unknown_names_rejected_before_any_work(option, capsys):
+    with pytest.raises(SystemExit):
+        batch_runner.main(option + ['--reps', '1', '--workers', '1'])
+    assert 'unknown' in capsys.readouterr().err
+
+
+def test_every_priority_kind_builds():
+    for kind in PRIORITY_KINDS:
+        assert len(make_priorities(kind, 7, random.Random(0))) == 7
+
+
+def test_tasks_and_runs_are_deterministic():
+    tasks = list(build_tasks([2], [20], ['random'], ['backend', 'exponential'], 2, 5))
+    assert [t.run for t in tasks] == [0, 1, 2, 3]
+    assert len({t.seed for t in tasks}) == 4
+    task = Task(0, 2, 20, 'random', 'exponential', 11)
+    a, b = run_one(task), run_one(task)
+    # cpu_s (index 10) is the only field allowed to differ
+    assert a[:10] == b[:10] and a[11:13] == b[11:13]
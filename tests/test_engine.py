@@ -0,0 +1,119 @@
+import socket, time
+from collections import defaultdict
+
+import pytest
+
+from runway_engine import RunwayEngine, parse_config, format_event, start_server_thread
+
+CONFIG = "CONFIG,2,12,5,3,9,1,1,7,2,8,4,6,3,10"
+
+
+def run(config=CONFIG, seed=7, **kwargs):
+    num_runways, priorities = parse_config(config)
+    return list(RunwayEngine(num_runways, priorities, seed=seed, **kwargs).run())
+
+
+def test_parse_config():
+    assert parse_config("CONFIG,3,4,1,2,3,4\n") == (3, [1, 2, 3, 4])
+    assert parse_config(" CONFIG , 1 , 1 , 9 ") == (1, [9])
+
+
+@pytest.mark.parametrize("msg", ["", "HELLO,1,1,1", "CONFIG,2", "CONFIG,0,1,1",
+                                 "CONFIG,2,3,1,2", "CONFIG,x,1,1"])
+def test_parse_config_rejects(msg):
+    with pytest.raises(ValueError):
+        parse_config(msg)
+
+
+def test_same_seed_same_events():
+    assert run(seed=3) == run(seed=3)
+    assert run(seed=3) != run(seed=4)
+
+
+def test_every_plane_lands_once_in_order():
+    events = run()
+    assert [ev.time for ev in events] == sorted(ev.time for ev in events)
+    states = defaultdict(list)
+    for ev in events:
+        if ev.state != 'PROGRESS':
+            states[ev.pid].append(ev.state)
+    assert sorted(states) == list(range(1, 13))
+    assert all(s == ['WAITING', 'RUNNING', 'COMPLETED'] for s in states.values())
+
+
+def test_runways_never_double_booked():
+    on_runway = {}
+    for ev in run():
+        if ev.state == 'RUNNING':
+            assert 1 <= ev.runway <= 2
+            assert ev.runway not in on_runway.values()
+            on_runway[ev.pid] = ev.runway
+        elif ev.state == 'PROGRESS':
+            assert on_runway[ev.pid] == ev.runway and 0.0 < ev.value <= 1.0
+        elif ev.state == 'COMPLETED':
+            assert on_runway.pop(ev.pid) == ev.runway
+    assert not on_runway
+
+
+def test_single_runway_lands_by_priority():
+    num_runways, priorities = parse_config("CONFIG,1,6,4,2,6,1,5,3")
+    order = [ev.pid for ev in RunwayEngine(1, priorities, seed=1).run()
+             if ev.state == 'RUNNING']
+    assert [priorities[pid - 1] for pid in order] == [1, 2, 3, 4, 5, 6]
+
+
+def test_advance_in_windows_matches_run():
+    num_runways, priorities = parse_config(CONFIG)
+    expected = list(RunwayEngine(num_runways, priorities, seed=5).run())
+    engine = RunwayEngine(num_runways, priorities, seed=5)
+    engine.reset()
+    stepped = []
+    until = 0.0
+    while engine.next_time() != float('inf'):
+        until += 0.37
+        stepped.extend(engine.advance(until))
+    assert stepped == expected
+
+
+def test_format_event():
+    lines = [format_event(ev) for ev in run("CONFIG,1,1,1", seed=1)]
+    assert lines[0] == "1,WAITING,0,0.0"
+    assert lines[1].startswith("1,RUNNING,1,")
+    assert lines[-1] == "1,COMPLETED,1,1.0"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _session(port, config):
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as conn:
+        conn.sendall(config.encode() + b"\n")
+        buf = b""
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                return buf.decode().splitlines()
+            buf += data
+
+
+def test_server_survives_malformed_config():
+    port = _free_port()
+    thread, stop = start_server_thread(port=port, time_scale=1000.0, seed=2)
+    try:
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                assert _session(port, "CONFIG,nope") == []
+                break
+            except ConnectionRefusedError:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        lines = _session(port, "CONFIG,2,3,1,2,3")
+        assert sum(",COMPLETED," in line for line in lines) == 3
+        assert thread.is_alive()
+    finally:
+        stop.set()
+        thread.join(5)
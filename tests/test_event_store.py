@@ -0,0 +1,109 @@
+import math
+import random
+
+import numpy as np
+
+from event_store import COMPLETED, NONE, RUNNING, WAITING, PlaneStore, SegmentStore
+
+
+def percentile(values, q):
+    # linear interpolation between closest ranks, as numpy's default
+    s = sorted(values)
+    k = (len(s) - 1) * q / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def simulate(store, num_runways, planes, seed):
+    # feeds random wait/run/land cycles through record(); returns what happened per plane
+    rng = random.Random(seed)
+    free_at = [0.0] * (num_runways + 1)
+    history = []
+    for pid in range(1, planes + 1):
+        store.add(pid, rng.randint(1, 5))
+        t_wait = pid * 0.7
+        store.record(pid, 'WAITING', 0, 0.0, t_wait)
+        runway = rng.randint(1, num_runways)
+        t_run = max(t_wait, free_at[runway]) + rng.random()
+        duration = rng.uniform(1, 6)
+        store.record(pid, 'RUNNING', runway, duration, t_run)
+        store.record(pid, 'PROGRESS', runway, 0.5, t_run + duration / 2)
+        store.record(pid, 'COMPLETED', runway, 1.0, t_run + duration)
+        free_at[runway] = t_run + duration
+        history.append((pid, runway, t_wait, t_run, t_run + duration))
+    return history
+
+
+def test_utilisation_and_waits_match_brute_force():
+    store = PlaneStore(capacity=4)
+    history = simulate(store, 3, 300, seed=1)
+    makespan = max(h[4] for h in history)
+    busy = [sum(end - run for _, r, _, run, end in history if r == k) for k in (1, 2, 3)]
+    assert store.makespan() == makespan
+    assert np.allclose(store.utilisation(3), [b / makespan for b in busy])
+    assert np.allclose(store.utilisation(4)[3], 0.0)
+    waits = [run - wait for _, _, wait, run, _ in history]
+    assert np.allclose(store.wait_percentiles((50, 95, 99)),
+                       [percentile(waits, q) for q in (50, 95, 99)])
+    assert len(store.segments) == 300
+    assert list(store.segments.view('plane')) == [h[0] for h in history]
+
+
+def test_empty_store():
+    store = PlaneStore()
+    assert np.isnan(store.wait_percentiles()).all()
+    assert not store.utilisation(2).any()
+
+
+def land(store, full, pids):
+    # the same landings into a bounded store and an unbounded one
+    for pid in pids:
+        t, runway = float(pid), 1 + pid % 2
+        for s in (store, full):
+            s.add(pid, 1)
+            s.record(pid, 'WAITING', 0, 0.0, t - 0.5)
+            s.record(pid, 'RUNNING', runway, 1.0, t)
+            s.record(pid, 'COMPLETED', runway, 1.0, t + 0.8)
+
+
+def test_retire_reuses_rows_and_keeps_totals():
+    store = PlaneStore(capacity=4, keep_completed=5, keep_segments=16)
+    full = PlaneStore()
+    for start in range(0, 200, 10):
+        land(store, full, range(start + 1, start + 11))
+        freed = store.retire()
+        assert len(freed) == len(set(freed))
+        assert all(store.state[row] == NONE for row in freed)
+    assert len(store) == 5
+    assert store.count <= 15
+    assert sorted(store.rows) == list(range(196, 201))
+    assert all(store.pid[row] == pid for pid, row in store.rows.items())
+    assert len(store.segments) <= 16 and store.segments.dropped == 200 - len(store.segments)
+    assert store.makespan() == full.makespan()
+    assert np.allclose(store.utilisation(2), full.utilisation(2))
+
+
+def test_release_and_generation():
+    store = PlaneStore()
+    g0 = store.generation
+    store.add(7, 2)
+    store.add(7, 3)
+    assert store.generation == g0 + 1 and len(store) == 1
+    store.record(7, 'RUNNING', 2, 4.0, 1.0)
+    assert store.state[store.rows[7]] == RUNNING
+    assert list(store.rows_in(RUNNING, WAITING)) == [store.rows[7]]
+    row = store.release(7)
+    assert 7 not in store and store.generation == g0 + 2
+    assert store.add(8, 1) == row
+    assert store.state[row] != COMPLETED
+
+
+def test_segment_store_limit_keeps_recent_half():
+    seg = SegmentStore(capacity=4, limit=8)
+    for i in range(20):
+        seg.append(1 + i % 2, i, float(i), i + 0.5)
+    assert len(seg) <= 8 and seg.dropped + len(seg) == 20
+    assert list(seg.view('plane')) == list(range(20 - len(seg), 20))
+    assert np.allclose(seg.busy_time(2), [5.0, 5.0])
+    assert list(seg.landed[1:3]) == [10, 10]
@@ -0,0 +1,67 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from gantt import GanttTimeline, SegmentCollection
+
+
+def rect(start, end, runway=1):
+    y0, y1 = 10 * runway - 4, 10 * runway + 4
+    return ((start, y0), (start, y1), (end, y1), (end, y0))
+
+
+def timeline(num_runways=2, **kwargs):
+    fig = Figure(figsize=(6, 3))
+    canvas = FigureCanvasAgg(fig)
+    g = GanttTimeline(fig.add_subplot(), canvas, num_runways, 10, **kwargs)
+    g.setup()
+    return g
+
+
+def test_collection_grows_and_draws_what_was_added():
+    coll = SegmentCollection(capacity=2)
+    spans = [(i, i + 0.5) for i in range(5)]
+    for i, (s, e) in enumerate(spans):
+        assert not coll.append(rect(s, e), (1, 0, 0, 1), i + 1)
+    assert coll.count == 5 and len(coll.planes) >= 5
+    assert np.array_equal(coll.verts[:5], [rect(s, e) for s, e in spans])
+    assert list(coll.planes[:5]) == [1, 2, 3, 4, 5]
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.add_collection(coll)
+    fig.canvas.draw()
+    assert [p.vertices[:4].tolist() for p in coll.get_paths()] == \
+        [np.asarray(rect(s, e), float).tolist() for s, e in spans]
+
+
+def test_collection_limit_drops_oldest_half():
+    coll = SegmentCollection(capacity=4, limit=4)
+    trimmed = [coll.append(rect(i, i + 1), (0, 0, 0, 1), i) for i in range(6)]
+    assert trimmed == [False, False, False, False, True, False]
+    assert coll.count == 4
+    assert list(coll.planes[:4]) == [2, 3, 4, 5]
+    assert coll.verts[0, 0, 0] == 2
+
+
+def test_timeline_routes_segments_and_widens_axis():
+    g = timeline(initial_span=30.0)
+    g.add_segment(1, 1, 0.0, 4.0)
+    g.add_segment(2, 2, 1.0, 3.0)
+    g.add_segment(2, 3, 3.0, 50.0)
+    assert [c.count for c in g.runways] == [1, 2]
+    assert np.array_equal(g.runways[1].verts[1], rect(3.0, 50.0, runway=2))
+    assert g.segment_count == 3
+    assert g.ax.get_xlim()[1] >= 50.0
+
+
+def test_timeline_max_bars_moves_axis_start():
+    g = timeline(num_runways=2, max_bars=8)
+    for i in range(10):
+        g.add_segment(1, i, float(i), i + 1.0)
+    coll = g.runways[0]
+    assert coll.count <= 4
+    assert g.ax.get_xlim()[0] == coll.verts[0, 0, 0] > 0
+    g.reset()
+    assert g.segment_count == 0 and g.ax.get_xlim()[0] == 0.0
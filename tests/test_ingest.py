@@ -0,0 +1,54 @@
+from ingest import IngestPipeline
+from event_store import STATE_CODE
+
+
+def test_partial_lines_wait_for_newline():
+    p = IngestPipeline()
+    assert p.feed(b"1,WAIT") == 0
+    assert p.feed(b"ING,0,0.0\n2,WAITING") == 1
+    assert p.drain().lines == ["1,WAITING,0,0.0"]
+    p.feed(b",0,0.0\n")
+    assert p.drain().lines == ["2,WAITING,0,0.0"]
+
+
+def test_progress_coalesced_to_latest_per_plane():
+    p = IngestPipeline()
+    p.feed(b"1,RUNNING,1,3.00\n1,PROGRESS,1,0.10\n2,RUNNING,2,2.00\n"
+           b"1,PROGRESS,1,0.20\n2,PROGRESS,2,0.50\n")
+    p.feed(b"1,PROGRESS,1,0.30\n")
+    batch = p.drain()
+    assert batch.lines == ["1,RUNNING,1,3.00", "2,RUNNING,2,2.00",
+                           "1,PROGRESS,1,0.30", "2,PROGRESS,2,0.50"]
+    assert (batch.received, batch.coalesced) == (6, 2)
+    assert p.drain().lines == []
+
+
+def test_transition_supersedes_pending_progress():
+    p = IngestPipeline()
+    p.feed(b"1,PROGRESS,1,0.90\n1,COMPLETED,1,1.0\n3,WAITING,0,0.0\n")
+    batch = p.drain()
+    assert batch.lines == ["1,COMPLETED,1,1.0", "3,WAITING,0,0.0"]
+    assert batch.coalesced == 1
+
+
+def test_totals_and_state_counts():
+    p = IngestPipeline()
+    p.feed(b"1,WAITING,0,0.0\n1,RUNNING,1,2.00\n1,PROGRESS,1,0.5\n1,PROGRESS,1,0.9\n"
+           b"1,COMPLETED,1,1.0\n\n  \n")
+    p.drain()
+    p.feed(b"2,WAITING,0,0.0\n")
+    p.drain()
+    assert p.total_received == 6
+    assert p.total_coalesced == 2
+    counts = {s: p.state_counts[c] for s, c in STATE_CODE.items()}
+    assert counts == {'NONE': 0, 'QUEUED': 0, 'WAITING': 2, 'RUNNING': 1,
+                      'PROGRESS': 2, 'COMPLETED': 1}
+
+
+def test_restart_drops_half_line():
+    p = IngestPipeline()
+    p.feed(b"1,WAITING,0,0.0\n7,RUNN")
+    p.restart()
+    p.feed(b"2,WAITING,0,0.0\n")
+    assert p.drain().lines == ["1,WAITING,0,0.0", "2,WAITING,0,0.0"]
+    assert p.backlog() == 0
@@ -0,0 +1,82 @@
+import json
+import math
+import random
+import urllib.request
+
+import pytest
+
+from instrument import PERCENTILES, Histogram, Instruments, MetricsServer
+
+
+def nearest_rank(values, q):
+    s = sorted(values)
+    return s[max(0, math.ceil(q / 100 * len(s)) - 1)]
+
+
+def test_index_and_lower_bound_round_trip():
+    h = Histogram(highest=10.0)
+    for us in [0, 1, 255, 256, 257, 511, 512, 1000, 123457, 9_999_999]:
+        lower = h._lower(h._index(us))
+        assert lower <= us and (us - lower) / max(us, 1) < 1 / h.half
+
+
+@pytest.mark.parametrize('sigma', [0.5, 2.0])
+def test_percentiles_within_relative_error(sigma):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(math.log(0.003), sigma) for _ in range(20000)]
+    values = [min(v, 59.0) for v in values]
+    h = Histogram()
+    for v in values:
+        h.record(v)
+    for q in PERCENTILES + (1, 75):
+        exact = nearest_rank(values, q)
+        got = h.percentile(q)
+        # buckets report their lower bound: never above, at most 1/128 (+1 us) below
+        assert exact * (1 - 1 / h.half) - 1e-6 <= got <= exact
+    assert h.total == len(values) and h.max == max(values)
+    assert h.mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_values_above_highest_are_clamped():
+    h = Histogram(highest=1.0)
+    h.record(5.0)
+    assert h.percentile(100) <= 1.0 and h.max == 5.0
+    h.reset()
+    assert h.total == 0 and h.percentile(50) == 0.0
+
+
+def test_instruments_timer_count_and_disabled():
+    inst = Instruments()
+    with inst.timer('frame'):
+        pass
+    timed = inst.wrap('call', lambda x: x * 2)
+    assert timed(21) == 42
+    inst.count('drops', 3)
+    inst.gauge('queue', 7)
+    snap = inst.snapshot()
+    assert snap['histograms']['frame']['count'] == 1
+    assert snap['histograms']['call']['count'] == 1
+    assert snap['counters'] == {'drops': 3} and snap['gauges'] == {'queue': 7}
+    assert 'runway_drops_total 3' in inst.to_prometheus()
+
+    off = Instruments(enabled=False)
+    with off.timer('frame'):
+        pass
+    off.count('drops')
+    off.record('x', 1.0)
+    assert off.wrap('call', len)([1, 2]) == 2
+    assert not off.counters and not any(h.total for h in off.histograms.values())
+
+
+def test_metrics_server():
+    inst = Instruments()
+    inst.record('frame', 0.004)
+    server = MetricsServer(inst, 0)
+    try:
+        base = f"http://127.0.0.1:{server.port}"
+        text = urllib.request.urlopen(f"{base}/metrics", timeout=5).read().decode()
+        assert 'runway_frame_seconds_count 1' in text
+        snap = json.loads(urllib.request.urlopen(f"{base}/", timeout=5).read())
+        assert snap['histograms']['frame']['count'] == 1
+    finally:
+        server.close()
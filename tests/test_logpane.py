@@ -0,0 +1,80 @@
+from logpane import DEBUG, INFO, TRACE, LogBuffer, LogPane
+
+
+class FakeText:
+    # the slice of tk.Text LogPane uses; content always ends with "\n"
+    def __init__(self):
+        self.content = ""
+        self.seen = 0
+
+    def insert(self, index, text):
+        assert index == "end"
+        self.content += text
+
+    def delete(self, first, last):
+        assert first == "1.0"
+        if last == "end":
+            self.content = ""
+        else:
+            line = int(last.split('.')[0])
+            self.content = "".join(self.content.splitlines(True)[line - 1:])
+
+    def see(self, index):
+        self.seen += 1
+
+    def lines(self):
+        return self.content.splitlines()
+
+
+def test_buffer_levels_and_since():
+    buf = LogBuffer(capacity=3, level=DEBUG)
+    buf.trace("hidden")
+    assert buf.seq == 0 and not buf.enabled(TRACE) and buf.enabled(INFO)
+    for i in range(5):
+        buf.info(f"m{i}")
+    assert buf.since(0) == (5, ["m2", "m3", "m4"])
+    assert buf.since(3) == (5, ["m3", "m4"])
+    assert buf.since(5) == (5, [])
+
+
+def test_pane_trims_to_max_lines():
+    buf = LogBuffer()
+    text = FakeText()
+    pane = LogPane(text, buf, max_lines=4)
+    pane.flush()
+    assert text.content == "" and text.seen == 0
+    for i in range(3):
+        buf.info(f"a{i}")
+    pane.flush()
+    assert text.lines() == ["a0", "a1", "a2"]
+    for i in range(3):
+        buf.info(f"b{i}")
+    pane.flush()
+    assert text.lines() == ["a2", "b0", "b1", "b2"]
+    for i in range(10):
+        buf.info(f"c{i}")
+    pane.flush()
+    assert text.lines() == ["c6", "c7", "c8", "c9"]
+    assert pane._lines == 4 and text.seen == 3
+
+
+def test_pane_clear_skips_old_lines():
+    buf = LogBuffer()
+    text = FakeText()
+    pane = LogPane(text, buf)
+    buf.info("old")
+    pane.flush()
+    buf.info("unseen")
+    pane.clear()
+    buf.info("new")
+    pane.flush()
+    assert text.lines() == ["new"]
+
+
+def test_attach_file_mirrors_lines(tmp_path):
+    buf = LogBuffer()
+    path = tmp_path / "run.log"
+    buf.attach_file(str(path))
+    buf.info("to disk")
+    buf.close()
+    assert "INFO to disk" in path.read_text(encoding='utf-8')
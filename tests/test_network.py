@@ -0,0 +1,52 @@
+import multiprocessing
+import threading
+
+import pytest
+
+import network
+from network import Airport, Handoff, Route, lookahead, mesh, run_network
+
+
+def test_lookahead_is_shortest_flight():
+    a = Airport("A", 2, "poisson:rate=1", 0, (Route(1, 0.5, 40.0), Route(2, 0.2, 15.0)), None)
+    b = Airport("B", 2, "poisson:rate=1", 1, (), None)
+    assert lookahead([a, b]) == 15.0
+    assert lookahead([b]) == float('inf')
+    with pytest.raises(ValueError):
+        run_network(mesh(2, 1, "poisson:rate=1", 0.5, 0.0), 10.0)
+
+
+def test_handoffs_arrive_one_window_later():
+    # with every departure routed to the other airport, what B has received by the end of
+    # window k is exactly what A sent up to window k-1, and vice versa
+    airports = mesh(2, 2, "poisson:rate=0.4", 1.0, 20.0, seed=5)
+    windows = []
+    stats, _ = run_network(airports, 400.0, progress_interval=None,
+                           on_window=lambda t, s: windows.append((t, list(s))))
+    assert [t for t, _ in windows] == [20.0 * k for k in range(1, 21)]
+    for (_, before), (_, after) in zip(windows, windows[1:]):
+        assert after[1].received == before[0].sent
+        assert after[0].received == before[1].sent
+    assert all(s.completed > 0 and s.sent == s.completed for s in stats)
+
+
+def test_shard_handoffs_land_beyond_the_window():
+    route = Route(1, 1.0, 25.0)
+    airport = Airport("A", 1, "poisson:rate=1,limit=40", 3, (route,), None)
+    parent, child = multiprocessing.Pipe()
+    shard = threading.Thread(target=network._shard_main, args=(0, airport, child, None, None))
+    shard.start()
+    try:
+        assert parent.recv() is None
+        parent.send((25.0, [Handoff(26.0, 1, 0, 1)], None))
+        outbound, stats = parent.recv()
+        assert outbound and all(dest == 1 for dest, _ in outbound)
+        assert all(h.time >= 25.0 and h.origin == 0 for _, h in outbound)
+        assert stats.received == 1 and stats.sent == len(outbound)
+        parent.send((200.0, [], None))
+        _, stats = parent.recv()
+        # all 40 local planes plus the one flown in
+        assert stats.completed == 41 and stats.sent == 41
+    finally:
+        parent.send(None)
+        shard.join(timeout=10)
@@ -0,0 +1,81 @@
+from collections import Counter
+
+import pytest
+
+from policies import POLICIES, make_policy
+from runway_engine import RunwayEngine
+
+# (pid, priority, service, now)
+PLANES = [(1, 3, 4.0, 0.0), (2, 1, 9.0, 1.0), (3, 2, 1.0, 2.0), (4, 1, 2.0, 3.0),
+          (5, 3, 0.5, 4.0)]
+
+
+def order(policy, planes=PLANES, now=10.0):
+    for plane in planes:
+        policy.push(*plane)
+    out = []
+    while policy:
+        out.append(policy.pop(now, 0))
+    return out
+
+
+def test_make_policy():
+    assert set(POLICIES) == {'fcfs', 'priority', 'sjf', 'aging', 'wfq'}
+    assert make_policy('aging', aging_rate=2.0)._queue.aging_rate == 2.0
+    with pytest.raises(ValueError):
+        make_policy('lifo')
+
+
+def test_fcfs():
+    assert order(make_policy('fcfs')) == [1, 2, 3, 4, 5]
+
+
+def test_strict_priority():
+    assert order(make_policy('priority')) == [2, 4, 3, 1, 5]
+
+
+def test_shortest_job_first():
+    assert order(make_policy('sjf')) == [5, 3, 4, 1, 2]
+
+
+def test_aging_lets_long_waits_through():
+    assert order(make_policy('aging', aging_rate=3.0)) == [1, 2, 3, 4, 5]
+    assert order(make_policy('aging', aging_rate=0.1)) == [2, 4, 3, 1, 5]
+
+
+def test_weighted_fair_shares_by_weight():
+    wfq = make_policy('wfq')
+    for i in range(40):
+        wfq.push(2 * i + 1, 1, 1.0, 0.0)
+        wfq.push(2 * i + 2, 2, 1.0, 0.0)
+    served = Counter(wfq.pop(0.0, 0) % 2 for _ in range(30))
+    # weight 1 for priority 1 against 1/2 for priority 2: twice the runway time
+    assert abs(served[1] - 2 * served[0]) <= 2
+
+
+def test_peek_is_pop_order():
+    for name in POLICIES:
+        policy = make_policy(name)
+        for plane in PLANES:
+            policy.push(*plane)
+        keys = []
+        while policy:
+            keys.append(policy.peek())
+            policy.pop(10.0, 0)
+        assert keys == sorted(keys), name
+
+
+def test_clear():
+    for name in POLICIES:
+        policy = make_policy(name)
+        policy.push(1, 1, 1.0, 0.0)
+        policy.clear()
+        assert len(policy) == 0 and not policy, name
+
+
+@pytest.mark.parametrize("name", sorted(POLICIES))
+def test_engine_lands_every_plane(name):
+    priorities = [5, 1, 4, 2, 3, 1, 5, 2]
+    events = list(RunwayEngine(2, priorities, seed=3, policy=make_policy(name)).run())
+    landed = [ev.pid for ev in events if ev.state == 'COMPLETED']
+    assert sorted(landed) == list(range(1, len(priorities) + 1))
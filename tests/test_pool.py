@@ -0,0 +1,109 @@
+import pytest
+
+from runway_engine import RunwayEngine
+from runway_pool import RunwayPool, LONG, ILS
+from workload import Arrival
+
+
+def test_acquire_lowest_free_runway():
+    pool = RunwayPool(3)
+    assert [pool.acquire() for _ in range(4)] == [0, 1, 2, -1]
+    assert pool.free_count() == 0
+    assert pool.release(1)
+    assert pool.is_free(1) and not pool.is_free(0)
+    assert pool.acquire() == 1
+
+
+def test_close_and_reopen():
+    pool = RunwayPool(2)
+    pool.close(0)
+    assert not pool.is_free(0) and pool.free_count() == 1
+    assert pool.acquire() == 1
+    assert pool.acquire() == -1
+    assert pool.reopen(0)
+    assert pool.acquire() == 0
+    # closing a busy runway: the release does not hand it on, the reopen does
+    pool.close(1)
+    assert not pool.release(1)
+    assert pool.reopen(1)
+    pool.take(1)
+    assert not pool.reopen(1) and pool.free_count() == 0
+
+
+def test_overlapping_closures_nest():
+    pool = RunwayPool(1)
+    pool.close(0)
+    pool.close(0)
+    assert not pool.reopen(0)
+    assert pool.acquire() == -1
+    assert pool.reopen(0)
+    assert pool.acquire() == 0
+    pool.reset()
+    pool.close(0)
+    assert pool.reopen(0)
+
+
+def test_capabilities():
+    pool = RunwayPool(3, [0, LONG, LONG | ILS])
+    assert pool.compatible_mask(0) == 0b111
+    assert pool.compatible_mask(LONG) == 0b110
+    assert pool.compatible_mask(LONG | ILS) == 0b100
+    assert pool.compatible(2, ILS) and not pool.compatible(1, ILS)
+    assert pool.acquire(ILS) == 2
+    assert pool.acquire(ILS) == -1
+    assert pool.acquire(LONG) == 1
+    assert pool.acquire() == 0
+    pool.reset()
+    assert pool.free_count() == 3
+
+
+def test_capabilities_length_checked():
+    with pytest.raises(ValueError):
+        RunwayPool(2, [0, LONG, ILS])
+    with pytest.raises(ValueError):
+        RunwayEngine(3, [1], pool=RunwayPool(2))
+
+
+def test_many_runways():
+    pool = RunwayPool(200)
+    assert [pool.acquire() for _ in range(200)] == list(range(200))
+    pool.release(150)
+    assert pool.acquire() == 150
+
+
+def running(events):
+    return [ev for ev in events if ev.state == 'RUNNING']
+
+
+def test_engine_respects_needs():
+    arrivals = [Arrival(i * 0.5, i + 1, 1, 2.0, LONG if i % 3 == 0 else 0) for i in range(12)]
+    engine = RunwayEngine(3, [], seed=1, arrivals=arrivals, pool=RunwayPool(3, [0, 0, LONG]))
+    starts = running(engine.run())
+    assert len(starts) == 12
+    for ev in starts:
+        if arrivals[ev.pid - 1].needs:
+            assert ev.runway == 3
+
+
+def test_engine_rejects_only_unservable_plane():
+    arrivals = [Arrival(0.0, 1, 1, 1.0), Arrival(0.0, 2, 1, 1.0, ILS), Arrival(0.5, 3, 1, 1.0)]
+    engine = RunwayEngine(1, [], arrivals=arrivals)
+    events = list(engine.run())
+    assert engine.rejected == [2]
+    assert 2 not in {ev.pid for ev in events}
+    assert [ev.pid for ev in events if ev.state == 'COMPLETED'] == [1, 3]
+
+
+def test_engine_closure_window():
+    engine = RunwayEngine(2, [1] * 10, seed=2, closures=[(0.5, 6.0, 1)])
+    starts = running(engine.run())
+    assert len(starts) == 10
+    assert not [ev for ev in starts if ev.runway == 1 and 0.5 <= ev.time < 6.0]
+    assert any(ev.runway == 1 and ev.time >= 6.0 for ev in starts)
+
+
+def test_engine_overlapping_closures():
+    engine = RunwayEngine(1, [1] * 6, seed=2, closures=[(0.5, 4.0, 1), (2.0, 9.0, 1)])
+    starts = running(engine.run())
+    assert len(starts) == 6
+    assert not [ev for ev in starts if 0.5 <= ev.time < 9.0]
@@ -0,0 +1,112 @@
+import socket, time
+
+import numpy as np
+
+import protocol
+from ingest import IngestPipeline
+from runway_engine import RunwayEngine, batched, parse_config, start_server_thread
+
+CONFIG = "CONFIG,2,6,3,1,2,3,1,2"
+
+
+def events(seed=1):
+    num_runways, priorities = parse_config(CONFIG)
+    return list(RunwayEngine(num_runways, priorities, seed=seed).run())
+
+
+def as_records(evs):
+    return [(ev.pid, protocol.STATE_CODE[ev.state], ev.runway) for ev in evs]
+
+
+def test_frames_round_trip():
+    evs = events()
+    buf = b"".join(protocol.encode_frame(batch) for batch in batched(evs))
+    records, consumed = protocol.decode_frames(buf)
+    assert consumed == len(buf)
+    assert list(zip(records['pid'].tolist(), records['state'].tolist(),
+                    records['runway'].tolist())) == as_records(evs)
+    assert np.allclose(records['time'], [ev.time for ev in evs])
+    assert np.allclose(records['value'], [ev.value for ev in evs], atol=1e-6)
+
+
+def test_partial_frame_left_for_next_read():
+    evs = events()
+    one, two = protocol.encode_frame(evs[:3]), protocol.encode_frame(evs[3:5])
+    buf = one + two[:-1]
+    records, consumed = protocol.decode_frames(buf)
+    assert consumed == len(one) and len(records) == 3
+    records, consumed = protocol.decode_frames(buf[:protocol.FRAME_HEADER.size - 1])
+    assert consumed == 0 and len(records) == 0
+
+
+def test_config_options():
+    assert protocol.config_options(CONFIG + ",BIN", 6) == {protocol.BINARY_OPTION}
+    assert protocol.config_options(CONFIG, 6) == set()
+
+
+def test_record_to_line_matches_csv():
+    evs = [ev for ev in events() if ev.state != 'QUEUED']
+    records, _ = protocol.decode_frames(protocol.encode_frame(evs))
+    csv = protocol.encode_csv(evs).decode().splitlines()
+    for rec, line in zip(records.tolist(), csv):
+        assert protocol.record_to_line(rec).split(',')[:3] == line.split(',')[:3]
+
+
+def feed_in_pieces(pipeline, data, size):
+    for i in range(0, len(data), size):
+        pipeline.feed(data[i:i + size])
+    return pipeline.drain()
+
+
+def test_binary_ingest_matches_csv_ingest():
+    evs = events()
+    frames = protocol.BINARY_ACK + b"".join(protocol.encode_frame(b) for b in batched(evs))
+    binary = IngestPipeline()
+    binary.expect_binary = True
+    got = feed_in_pieces(binary, frames, 7)
+    assert binary.binary
+    text = IngestPipeline()
+    csv = feed_in_pieces(text, protocol.encode_csv(evs), 7)
+    assert ([protocol.record_to_line(ev).split(',')[:3] for ev in got.events] ==
+            [line.split(',')[:3] for line in csv.lines])
+    assert (got.received, got.coalesced) == (csv.received, csv.coalesced)
+    assert binary.state_counts == text.state_counts
+
+
+def test_expect_binary_falls_back_to_csv():
+    p = IngestPipeline()
+    p.expect_binary = True
+    p.feed(b"1,WAITING,0,0.0\n")
+    assert not p.binary and not p.expect_binary
+    assert p.drain().lines == ["1,WAITING,0,0.0"]
+
+
+def test_server_negotiates_binary():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    thread, stop = start_server_thread(port=port, time_scale=1000.0, seed=1)
+    try:
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                conn = socket.create_connection(('127.0.0.1', port), timeout=5)
+                break
+            except ConnectionRefusedError:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        with conn:
+            conn.sendall(CONFIG.encode() + b",BIN\n")
+            buf = b""
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                buf += data
+    finally:
+        stop.set()
+        thread.join(5)
+    assert buf.startswith(protocol.BINARY_ACK)
+    records, consumed = protocol.decode_frames(buf[len(protocol.BINARY_ACK):])
+    assert consumed == len(buf) - len(protocol.BINARY_ACK)
+    assert (records['state'] == protocol.STATE_CODE['COMPLETED']).sum() == 6
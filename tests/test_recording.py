@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+import pytest
+
+import workload
+from ingest import IngestPipeline
+from protocol import RECORD_DTYPE, STATE_CODE
+from recording import (INDEX_MAGIC, COLUMNS, RunwayState, SessionRecorder, SessionReader,
+                       ReplaySource, lines_to_records)
+from runway_engine import RunwayEngine
+
+CONFIG = "CONFIG,3,0"
+
+
+def engine_records(planes=30, seed=4):
+    arrivals = workload.from_spec(f"poisson:rate=1.5,limit={planes}", seed)
+    engine = RunwayEngine(3, [], seed=seed, arrivals=arrivals)
+    return np.array([(ev.pid, STATE_CODE[ev.state], ev.runway, ev.value, ev.time)
+                     for ev in engine.run()], dtype=RECORD_DTYPE)
+
+
+@pytest.fixture
+def recording(tmp_path):
+    records = engine_records()
+    path = str(tmp_path / "session.rwy")
+    rec = SessionRecorder(path, CONFIG, snapshot_every=97, buffer_records=50)
+    for i in range(0, len(records), 40):
+        rec.write_records(records[i:i + 40], restamp=False)
+    rec.close()
+    reader = SessionReader(path)
+    yield path, records, reader
+    reader.close()
+
+
+def brute_force(records, t):
+    state = RunwayState()
+    for rec in records[records['time'] <= t]:
+        state.apply(rec[None])
+    return state
+
+
+def assert_same_state(a, b):
+    sa, sb = a.snapshot(), b.snapshot()
+    assert sa['pid'].tolist() == sb['pid'].tolist()
+    for name in COLUMNS:
+        np.testing.assert_array_equal(sa[name], sb[name], err_msg=name)
+
+
+def test_reader_sees_what_was_recorded(recording):
+    path, records, reader = recording
+    assert reader.config == CONFIG
+    assert len(reader) == len(records)
+    assert np.array_equal(reader.records, records)
+    assert reader.duration == records['time'][-1]
+    assert len(reader.snapshots) == len(records) // 97 + 1
+
+
+def test_state_at_matches_brute_force(recording):
+    _, records, reader = recording
+    for t in np.linspace(0.0, reader.duration, 9):
+        state, index = reader.state_at(t)
+        assert index == reader.index_at(t) == (records['time'] <= t).sum()
+        assert_same_state(state, brute_force(records, t))
+
+
+def test_state_keeps_plane_history(recording):
+    _, records, reader = recording
+    state, _ = reader.state_at(reader.duration)
+    for pid in np.unique(records['pid']).tolist():
+        mine = records[records['pid'] == pid]
+        by_state = {code: mine[mine['state'] == code] for code in set(mine['state'].tolist())}
+        assert state.priority[pid] == by_state[STATE_CODE['QUEUED']]['value'][-1]
+        assert state.queued[pid] == by_state[STATE_CODE['WAITING']]['time'][-1]
+        assert state.started[pid] == by_state[STATE_CODE['RUNNING']]['time'][-1]
+        assert state.duration[pid] == by_state[STATE_CODE['RUNNING']]['value'][-1]
+        assert state.ended[pid] == by_state[STATE_CODE['COMPLETED']]['time'][-1]
+
+
+def test_index_with_old_magic_is_ignored(recording):
+    path, records, reader = recording
+    assert INDEX_MAGIC != b"RWYIDX01"
+    with open(path + ".idx", 'r+b') as fh:
+        fh.write(b"RWYIDX01")
+    old = SessionReader(path)
+    try:
+        assert len(old.snapshots) == 1 and len(old.snapshots[0][2]) == 0
+        t = reader.duration / 2
+        assert_same_state(old.state_at(t)[0], reader.state_at(t)[0])
+    finally:
+        old.close()
+
+
+def test_lines_to_records_skips_malformed():
+    recs = lines_to_records(["1,WAITING,0,0.0", "junk", "2,FLYING,1,0.5", "3,RUNNING,x,1",
+                             "4,running,2,3.50"], now=1.5)
+    assert recs['pid'].tolist() == [1, 4]
+    assert recs['state'].tolist() == [STATE_CODE['WAITING'], STATE_CODE['RUNNING']]
+    assert recs['time'].tolist() == [1.5, 1.5]
+
+
+def test_seek_drops_in_flight_records(recording):
+    _, records, reader = recording
+    pipeline = IngestPipeline()
+    source = ReplaySource(reader, pipeline, speed=None, frame_s=0.001)
+    pipeline.feed_records(records[:200])
+    t = float(records['time'][len(records) // 2])
+    state = source.seek(t)
+    assert pipeline.backlog() == 0 and not pipeline.drain().events
+    assert_same_state(state, brute_force(records, t))
+
+    source.start()
+    deadline = time.monotonic() + 5
+    while source.position() < reader.duration:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    source.stop()
+    source.thread.join(5)
+    assert pipeline.drain().received == len(records) - reader.index_at(t)
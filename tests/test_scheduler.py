@@ -0,0 +1,62 @@
+import random
+
+from scheduler import WaitingQueue
+
+
+def drain(q):
+    out = []
+    while q:
+        out.append(q.pop())
+    return out
+
+
+def test_lowest_priority_first_fifo_among_equals():
+    q = WaitingQueue()
+    for pid, prio in [(1, 3), (2, 1), (3, 3), (4, 2), (5, 1)]:
+        q.push(pid, prio)
+    assert len(q) == 5
+    assert q.peek() == (2, 1)
+    assert drain(q) == [(2, 1), (5, 1), (4, 2), (1, 3), (3, 3)]
+    assert not q
+
+
+def test_aging_matches_effective_priority_at_any_time():
+    rng = random.Random(1)
+    q = WaitingQueue(aging_rate=0.5)
+    planes = []
+    for pid in range(1, 200):
+        now = pid * 0.25
+        prio = rng.randint(1, 10)
+        q.push(pid, prio, now)
+        planes.append((pid, prio, now))
+    for t in (20.0, 100.0):
+        expected = sorted(planes, key=lambda p: (q.effective_priority(p[1], p[2], t), p[2]))
+        assert [pid for pid, _ in drain(q)] == [p[0] for p in expected]
+        for pid, prio, now in planes:
+            q.push(pid, prio, now)
+
+
+def test_long_wait_overtakes_higher_priority():
+    q = WaitingQueue(aging_rate=1.0)
+    q.push(1, 5, now=0.0)
+    q.push(2, 1, now=10.0)
+    assert q.pop() == (1, 5)
+
+
+def test_head_key_orders_queues_like_one_queue():
+    a, b, both = WaitingQueue(0.2), WaitingQueue(0.2), WaitingQueue(0.2)
+    for pid, prio, now in [(1, 4, 0.0), (2, 2, 1.0), (3, 4, 2.0), (4, 1, 9.0), (5, 3, 9.5)]:
+        (a if pid % 2 else b).push(pid, prio, now)
+        both.push(pid, prio, now)
+    merged = []
+    while a or b:
+        q = min((q for q in (a, b) if q), key=WaitingQueue.head_key)
+        merged.append(q.pop())
+    assert merged == drain(both)
+
+
+def test_clear():
+    q = WaitingQueue()
+    q.push(1, 1)
+    q.clear()
+    assert len(q) == 0 and not q
@@ -0,0 +1,102 @@
+import numpy as np
+
+from sprites import DONE_FILL, FULL, LOD, SpritePool
+
+
+class FakeCanvas:
+    # records what a Tk canvas would be asked to do
+    def __init__(self):
+        self.items = {}
+        self.moves = []
+
+    def _new(self, kind, tags=(), **opts):
+        item = len(self.items) + 1
+        self.items[item] = dict(opts, kind=kind, tags=tags)
+        return item
+
+    def create_rectangle(self, *coords, **opts):
+        return self._new('rectangle', **opts)
+
+    def create_polygon(self, *coords, **opts):
+        return self._new('polygon', **opts)
+
+    def create_oval(self, *coords, **opts):
+        return self._new('oval', **opts)
+
+    def create_text(self, *coords, **opts):
+        return self._new('text', **opts)
+
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = coords
+
+    def itemconfigure(self, item, **opts):
+        self.items[item].update(opts)
+
+    def move(self, tag, dx, dy):
+        self.moves.append((tag, dx, dy))
+
+
+def place(pool, row, x=100.0):
+    pool.place(row, x, 50.0, 10, "#f00", f"P{row}", 30, -10, None)
+
+
+def test_place_release_recycles_items():
+    canvas = FakeCanvas()
+    pool = SpritePool(canvas)
+    place(pool, 0)
+    place(pool, 1)
+    assert pool.created == 2 and len(canvas.items) == 10
+    assert pool.anchor[0] == 130.0
+    pool.release(0)
+    assert not pool.has(0) and np.isnan(pool.anchor[0])
+    assert all(canvas.items[i]['state'] == 'hidden' for i in range(1, 6))
+    place(pool, 2)
+    assert pool.created == 2 and pool.has(2)
+    # placing an already-placed row reuses its own sprite
+    place(pool, 2, x=200.0)
+    assert pool.created == 2 and pool.anchor[2] == 230.0
+
+
+def test_lod_sprites_are_single_rectangles():
+    canvas = FakeCanvas()
+    pool = SpritePool(canvas, lod_threshold=1)
+    pool.update_lod(2)
+    place(pool, 0)
+    kind, _, items = pool._slots[0]
+    assert kind == LOD and len(items) == 1
+    assert pool.anchor[0] == 130.0
+    pool.finish(0)
+    assert canvas.items[items[0]]['fill'] == DONE_FILL
+    pool.update_lod(1)
+    place(pool, 1)
+    assert pool._slots[1][0] == FULL
+
+
+def test_anchor_grows_past_initial_size():
+    pool = SpritePool(FakeCanvas())
+    place(pool, 200)
+    assert len(pool.anchor) > 200 and pool.anchor[200] == 130.0
+
+
+def test_move_to_skips_small_and_released():
+    canvas = FakeCanvas()
+    pool = SpritePool(canvas)
+    for row in range(3):
+        place(pool, row)
+    tag1 = pool._slots[1][1]
+    pool.release(2)
+    rows = np.array([0, 1])
+    assert pool.move_to(rows, np.array([130.2, 150.0])) == 1
+    assert canvas.moves == [(tag1, 20.0, 0)]
+    assert list(pool.anchor[:2]) == [130.0, 150.0]
+    assert pool.move_to(np.array([], dtype=int), np.array([])) == 0
+
+
+def test_prewarm_and_reset():
+    pool = SpritePool(FakeCanvas())
+    pool.prewarm(4)
+    assert pool.created == 4
+    place(pool, 0)
+    assert pool.created == 4
+    pool.reset()
+    assert not pool.has(0) and np.isnan(pool.anchor).all()
@@ -0,0 +1,118 @@
+import numpy as np
+
+from event_store import PlaneStore
+from status_view import ALL, COLUMNS, VirtualStatusTable
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class Widget:
+    # stands in for the Treeview, Scrollbar, Label and Combobox the table drives
+    def __init__(self):
+        self.values = {}
+        self.options = {}
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def set(self, *args):
+        self.options['set'] = args
+
+    def config(self, **opts):
+        self.options.update(opts)
+
+    configure = config
+
+
+def table(store, num_runways=3, rows=4):
+    # a VirtualStatusTable without Tk: the widgets it touches are replaced by Widget
+    t = VirtualStatusTable.__new__(VirtualStatusTable)
+    t.store, t.rows, t.top = store, rows, 0
+    t.order = np.empty(0, dtype=np.intp)
+    t.sort_column, t.sort_reverse = None, False
+    t._dirty, t._view_stale, t._order_generation = set(), True, -1
+    t._shown = [None] * rows
+    t.status_filter, t.runway_filter = Var(ALL), Var(ALL)
+    t.tree, t.scroll, t.count_label, t.runway_box = Widget(), Widget(), Widget(), Widget()
+    for i in range(rows):
+        t.tree.item(f"v{i}", values=("",) * len(COLUMNS))
+    t.set_runways(num_runways)
+    return t
+
+
+def shown(t):
+    return [t.tree.values[f"v{i}"] for i in range(t.rows)]
+
+
+def test_default_order_is_by_pid_even_with_reused_rows():
+    store = PlaneStore()
+    for pid in (1, 2, 3):
+        store.add(pid, 1)
+    store.release(1)
+    store.add(4, 1)  # takes row 0
+    t = table(store)
+    t.refresh()
+    assert [v[0] for v in shown(t)[:3]] == [2, 3, 4]
+    assert shown(t)[3] == ("",) * len(COLUMNS)
+    assert t.count_label.options['text'] == "3 / 3 planes"
+
+
+def test_runway_filter_uses_displayed_runway():
+    store = PlaneStore()
+    for pid in (1, 2, 3):
+        store.add(pid, pid)
+    store.record(1, 'RUNNING', 2, 5.0, 0.0)
+    store.record(2, 'RUNNING', 2, 5.0, 0.0)
+    store.record(2, 'COMPLETED', 2, 1.0, 5.0)  # landed planes show runway 0
+    store.record(3, 'RUNNING', 1, 5.0, 0.0)
+    t = table(store)
+    t.runway_filter.set("2")
+    t.invalidate()
+    t.refresh()
+    assert [v[0] for v in shown(t) if v[0] != ""] == [1]
+    assert shown(t)[0][2] == 2
+
+
+def test_sort_and_dirty_rows():
+    store = PlaneStore()
+    for pid, prio in ((1, 3), (2, 1), (3, 2)):
+        store.add(pid, prio)
+    t = table(store)
+    t.sort_by("Prio")
+    assert [v[0] for v in shown(t)[:3]] == [2, 3, 1]
+    t.sort_by("Prio")
+    assert [v[0] for v in shown(t)[:3]] == [1, 3, 2]
+    store.record(3, 'WAITING', 0, 0.0, 1.0)
+    t.mark_dirty(store.rows[3])
+    t.refresh()
+    assert shown(t)[1][3] == "WAITING"
+
+
+def test_set_runways_resets_out_of_range_filter():
+    t = table(PlaneStore(), num_runways=4)
+    t.runway_filter.set("4")
+    t._view_stale = False
+    t.set_runways(2)
+    assert t.runway_filter.get() == ALL and t._view_stale
+    assert t.runway_box.options['values'] == (ALL, "1", "2")
+
+
+def test_scroll_clamps_to_order():
+    store = PlaneStore()
+    for pid in range(1, 11):
+        store.add(pid, 1)
+    t = table(store)
+    t.refresh()
+    t.scroll_to(100)
+    assert t.top == 6 and [v[0] for v in shown(t)] == [7, 8, 9, 10]
+    t.scroll_to(-5)
+    assert t.top == 0
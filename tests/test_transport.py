@@ -0,0 +1,100 @@
+import asyncio
+import concurrent.futures
+import socket
+import threading
+
+import pytest
+
+from transport import NEW_CONNECTION, BackendConnection, Subscription
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=2)
+    loop.close()
+
+
+def put(loop, sub, item):
+    return asyncio.run_coroutine_threadsafe(sub._put(item), loop)
+
+
+def test_overflow_must_be_known(loop):
+    with pytest.raises(ValueError):
+        Subscription(loop, 10, 'drop')
+
+
+def test_block_waits_for_room(loop):
+    sub = Subscription(loop, 10, 'block')
+    put(loop, sub, b"x" * 8).result(1)
+    # a chunk larger than the whole budget is still taken when the subscription is empty
+    blocked = put(loop, sub, b"y" * 12)
+    with pytest.raises(concurrent.futures.TimeoutError):
+        blocked.result(0.2)
+    assert sub.depth == 8
+    assert sub.get(1) == b"x" * 8
+    blocked.result(1)
+    assert sub.get(1) == b"y" * 12
+    assert sub.depth == 0 and sub.delivered == 20
+    assert sub.get(0.05) is None
+
+
+def test_close_overflow_keeps_what_was_queued(loop):
+    sub = Subscription(loop, 10, 'close')
+    put(loop, sub, NEW_CONNECTION).result(1)
+    put(loop, sub, b"a" * 6).result(1)
+    put(loop, sub, b"b" * 6).result(1)
+    assert sub.closed
+    put(loop, sub, b"c").result(1)
+    assert [sub.get(1), sub.get(1), sub.get(1)] == [NEW_CONNECTION, b"a" * 6, None]
+
+
+def test_close_releases_reader_and_blocked_put(loop):
+    sub = Subscription(loop, 4, 'block')
+    put(loop, sub, b"1234").result(1)
+    blocked = put(loop, sub, b"5")
+    got = []
+    reader = threading.Thread(target=lambda: got.append(sub.get(5)))
+    sub.close()
+    blocked.result(1)
+    reader.start()
+    reader.join(2)
+    assert got == [None] and sub.depth == 0
+
+
+def test_connection_streams_and_sends():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    received = []
+
+    def backend():
+        conn, _ = server.accept()
+        conn.sendall(b"1,QUEUED,0,1\n")
+        received.append(conn.recv(100))
+        conn.sendall(b"1,WAITING,0,0.0\n")
+        conn.close()
+
+    threading.Thread(target=backend, daemon=True).start()
+    connection = BackendConnection("127.0.0.1", server.getsockname()[1], backoff=(0.05, 0.1))
+    sub = connection.subscribe()
+    connection.start()
+    try:
+        assert sub.get(5) is NEW_CONNECTION
+        assert sub.get(5) == b"1,QUEUED,0,1\n"
+        assert connection.connected and connection.send(b"CONFIG,1,1,1\n")
+        data = b""
+        while len(data) < len(b"1,WAITING,0,0.0\n"):
+            data += sub.get(5)
+        assert data == b"1,WAITING,0,0.0\n"
+        assert received == [b"CONFIG,1,1,1\n"]
+        health = connection.health()
+        assert health['subscribers'] == 1 and health['bytes_received'] == 29
+    finally:
+        connection.stop()
+        server.close()
+    assert sub.closed and not connection.send(b"late\n")
@@ -0,0 +1,71 @@
+import itertools
+import random
+
+import pytest
+
+import workload
+from workload import Arrival, from_spec, read_trace
+
+
+def take(arrivals, n=50):
+    return list(itertools.islice(arrivals, n))
+
+
+def test_stream_is_deterministic_per_seed():
+    def make(seed):
+        times = workload.poisson(0.8, random.Random(seed))
+        return take(workload.stream(times, workload.exponential(), seed=seed))
+    assert make(3) == make(3)
+    assert make(3) != make(4)
+    arrivals = make(3)
+    assert [a.pid for a in arrivals] == list(range(1, 51))
+    assert all(b.time > a.time for a, b in zip(arrivals, arrivals[1:]))
+    assert all(1 <= a.priority <= 5 and a.needs == 0 for a in arrivals)
+
+
+def test_from_spec_is_deterministic_and_limited():
+    spec = "mmpp:rates=0.5/2.5,dwell=30/5,service=lognormal,levels=3,limit=200"
+    a, b = list(from_spec(spec, seed=9)), list(from_spec(spec, seed=9))
+    assert a == b and len(a) == 200
+    assert {x.priority for x in a} <= {1, 2, 3}
+    poisson = "poisson:rate=2"
+    assert take(from_spec(poisson, seed=1), 5) == take(from_spec(poisson, seed=1), 5)
+    with pytest.raises(ValueError):
+        from_spec("poisson:rate=1,colour=red")
+    with pytest.raises(ValueError):
+        from_spec("uniform:rate=1")
+
+
+def test_poisson_rate():
+    times = take(workload.poisson(2.0, random.Random(0)), 20000)
+    assert times[-1] / len(times) == pytest.approx(0.5, rel=0.05)
+
+
+def test_empirical_and_mix_stay_in_range():
+    rng = random.Random(0)
+    draw = workload.empirical(["4", "2", "3"])
+    assert all(2.0 <= draw(rng) <= 4.0 for _ in range(1000))
+    with pytest.raises(ValueError):
+        workload.empirical([])
+    both = workload.mix((1, workload.constant(1.0)), (3, workload.constant(9.0)))
+    draws = [both(rng) for _ in range(4000)]
+    assert set(draws) == {1.0, 9.0}
+    assert draws.count(9.0) / len(draws) == pytest.approx(0.75, abs=0.03)
+
+
+def test_read_trace(tmp_path):
+    path = tmp_path / "arrivals.csv"
+    path.write_text("time,priority,service,needs\n# comment\n0.5,2,3.5\n1.0,1,,0x3\n1.0,4\n")
+    arrivals = list(read_trace(str(path), service=workload.constant(7.0)))
+    assert arrivals == [Arrival(0.5, 1, 2, 3.5, 0), Arrival(1.0, 2, 1, 7.0, 3),
+                        Arrival(1.0, 3, 4, 7.0, 0)]
+    assert list(from_spec(f"trace:{path}", seed=0))[0] == arrivals[0]
+
+
+def test_read_trace_rejects_out_of_order_rows(tmp_path):
+    path = tmp_path / "arrivals.csv"
+    path.write_text("0.0,1\n2.0,1\n1.5,1\n")
+    rows = read_trace(str(path))
+    assert len(take(rows, 2)) == 2
+    with pytest.raises(ValueError, match=r"arrivals\.csv:3:"):
+        next(rows)
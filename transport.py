@@ -0,0 +1,241 @@
+import asyncio, random, threading, time
+from collections import deque
+
+# Backend connection on its own asyncio event-loop thread.
+#
+# The loop connects (and after any disconnect reconnects) with exponential backoff, reads
+# the stream into every Subscription and writes queued commands. Nothing here blocks the
+# caller: send() only enqueues, subscribers pull with get() from their own thread.
+#
+# Both directions are bounded. The send queue holds at most max_send commands; send()
+# returns False instead of queueing more. A Subscription holds at most max_bytes; when a
+# subscriber is full the reader either stops reading the socket until it has room
+# (overflow='block', so the backend's sends block on a full TCP window) or closes that
+# subscription (overflow='close', for monitors that must never slow the GUI down).
+# Dropping chunks is not offered: it would cut lines and frames in half.
+
+NEW_CONNECTION = object()
+
+
+class Subscription:
+    def __init__(self, loop, max_bytes, overflow):
+        if overflow not in ('block', 'close'):
+            raise ValueError(f"overflow must be 'block' or 'close', not {overflow!r}")
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self.closed = False
+        self.delivered = 0
+        self._loop = loop
+        self._chunks = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+        self._space = asyncio.Event()
+        self._space.set()
+
+    @property
+    def depth(self):
+        return self._bytes
+
+    async def _put(self, item):
+        size = 0 if item is NEW_CONNECTION else len(item)
+        while True:
+            with self._cond:
+                if self.closed:
+                    return
+                if not self._bytes or self._bytes + size <= self.max_bytes:
+                    self._chunks.append(item)
+                    self._bytes += size
+                    self._cond.notify()
+                    return
+                if self.overflow == 'close':
+                    self.closed = True
+                    self._cond.notify()
+                    return
+                self._space.clear()
+            await self._space.wait()
+
+    def get(self, timeout=None):
+        # next chunk (bytes), NEW_CONNECTION at the start of each connection's stream,
+        # or None on timeout / once closed and empty
+        with self._cond:
+            if not self._chunks and not self.closed:
+                self._cond.wait(timeout)
+            if not self._chunks:
+                return None
+            item = self._chunks.popleft()
+            if item is not NEW_CONNECTION:
+                self._bytes -= len(item)
+                self.delivered += len(item)
+        self._wake()
+        return item
+
+    def _wake(self):
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._space.set)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._chunks.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+        self._wake()
+
+
+class BackendConnection:
+    def __init__(self, host, port, max_send=256, backoff=(0.1, 5.0), log=None):
+        self.host = host
+        self.port = port
+        self.max_send = max_send
+        self.backoff_min, self.backoff_max = backoff
+        self.log = log
+        self.connected = False
+        self.reconnects = 0
+        self.connect_time = None
+        self.rtt = None
+        self.bytes_received = 0
+        self.send_dropped = 0
+        self.last_receive = None
+        self.loop = asyncio.new_event_loop()
+        self._subscriptions = []
+        self._send_queue = None
+        self._sent_at = None
+        self._task = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        for sub in list(self._subscriptions):
+            sub.close()
+        if self._task is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout=2)
+
+    def subscribe(self, max_bytes=4_000_000, overflow='block'):
+        sub = Subscription(self.loop, max_bytes, overflow)
+        self._subscriptions.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.close()
+        if sub in self._subscriptions:
+            self._subscriptions.remove(sub)
+
+    def send(self, data):
+        # non-blocking; False if not connected or the send queue is full
+        queue = self._send_queue
+        if not self.connected or queue is None or queue.qsize() >= self.max_send:
+            self.send_dropped += 1
+            return False
+        self.loop.call_soon_threadsafe(self._enqueue, data)
+        return True
+
+    def _enqueue(self, data):
+        try:
+            self._send_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.send_dropped += 1
+
+    def health(self):
+        subs = [s for s in self._subscriptions if not s.closed]
+        return {
+            'connected': self.connected,
+            'reconnects': self.reconnects,
+            'connect_ms': self.connect_time * 1000 if self.connect_time is not None else None,
+            'rtt_ms': self.rtt * 1000 if self.rtt is not None else None,
+            'send_queue': self._send_queue.qsize() if self._send_queue else 0,
+            'send_dropped': self.send_dropped,
+            'recv_queue_bytes': max((s.depth for s in subs), default=0),
+            'subscribers': len(subs),
+            'bytes_received': self.bytes_received,
+            'idle_s': time.monotonic() - self.last_receive if self.last_receive else None,
+        }
+
+    def _log(self, msg):
+        if self.log is not None:
+            self.log(msg)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self._send_queue = asyncio.Queue(self.max_send)
+        self._task = self.loop.create_task(self._maintain())
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    async def _maintain(self):
+        delay = self.backoff_min
+        attempts = 0
+        while True:
+            t0 = time.monotonic()
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), timeout=2.0)
+            except (OSError, asyncio.TimeoutError) as e:
+                attempts += 1
+                if attempts == 1 or attempts % 20 == 0:
+                    self._log(f"[IPC] Backend not reachable ({e}); retrying, attempt {attempts}")
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, self.backoff_max)
+                continue
+            self.connect_time = time.monotonic() - t0
+            self._log(f"[IPC] Connected to backend on attempt {attempts + 1}.")
+            delay, attempts = self.backoff_min, 0
+            for sub in list(self._subscriptions):
+                await sub._put(NEW_CONNECTION)
+            self.connected = True
+            reader_task = asyncio.create_task(self._read(reader))
+            writer_task = asyncio.create_task(self._write(writer))
+            try:
+                # whichever side fails first ends the connection and we reconnect
+                done, _ = await asyncio.wait((reader_task, writer_task),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                task = done.pop()
+                error = task.exception()
+                if error is None:
+                    self._log("[IPC] Backend closed connection.")
+                elif isinstance(error, OSError):
+                    side = "recv" if task is reader_task else "send"
+                    self._log(f"[ERROR] Socket {side} error: {error}")
+                else:
+                    raise error
+            finally:
+                self.connected = False
+                reader_task.cancel()
+                writer_task.cancel()
+                writer.close()
+                self._sent_at = None
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+
+    async def _read(self, reader):
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            now = time.monotonic()
+            if self._sent_at is not None:
+                # the backend has no ping: RTT is command-to-first-response latency
+                sample = now - self._sent_at
+                self.rtt = sample if self.rtt is None else 0.8 * self.rtt + 0.2 * sample
+                self._sent_at = None
+            self.last_receive = now
+            self.bytes_received += len(data)
+            for sub in list(self._subscriptions):
+                if sub.closed:
+                    self._subscriptions.remove(sub)
+                    continue
+                await sub._put(data)
+
+    async def _write(self, writer):
+        while True:
+            data = await self._send_queue.get()
+            writer.write(data)
+            await writer.drain()
+            self._sent_at = time.monotonic()
@@ -0,0 +1,165 @@
+import bisect, csv, itertools, math, random
+from collections import namedtuple
+
+# Open-system workloads. Everything here is lazy: arrival processes are infinite generators
+# of arrival times, samplers are callables taking an rng (like backend_service_time), and
+# stream() zips them into Arrival tuples for RunwayEngine one plane at a time, so a run of any
+# length holds only the planes currently in the system.
+
+# needs: runway capability flags the plane requires (see runway_pool), 0 for any runway
+Arrival = namedtuple('Arrival', 'time pid priority service needs', defaults=(0,))
+
+
+def backend_service_time(rng):
+    # runway_time = (rand() % 3) + 2.0 in plane_thread_func
+    return float(rng.randint(2, 4))
+
+
+def poisson(rate, rng):
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        yield t
+
+
+def mmpp(rates, dwell, rng):
+    # Markov-modulated Poisson process: stay in phase i for an exponential time with mean
+    # dwell[i] seconds, arriving at rates[i]; phases are visited in turn. Memorylessness lets
+    # the inter-arrival draw simply restart at each phase boundary.
+    t = 0.0
+    for phase in itertools.cycle(range(len(rates))):
+        end = t + rng.expovariate(1.0 / dwell[phase])
+        rate = rates[phase]
+        while rate > 0:
+            nxt = t + rng.expovariate(rate)
+            if nxt >= end:
+                break
+            t = nxt
+            yield t
+        t = end
+
+
+def bursty(rate, burst_rate, rng, mean_calm=60.0, mean_burst=10.0):
+    # two-phase MMPP: a calm background rate with bursts of burst_rate
+    return mmpp((rate, burst_rate), (mean_calm, mean_burst), rng)
+
+
+def constant(value):
+    return lambda rng: value
+
+
+def exponential(mean=3.0):
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+def lognormal(mean=3.0, sigma=1.0):
+    # heavy-tailed occupancy with the same mean as the backend's uniform {2,3,4}
+    mu = math.log(mean) - sigma * sigma / 2
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def empirical(samples):
+    # inverse-CDF sampling from observed runway times, interpolating between order statistics
+    data = sorted(float(s) for s in samples)
+    if not data:
+        raise ValueError("empirical distribution needs at least one sample")
+    last = len(data) - 1
+
+    def draw(rng):
+        u = rng.random() * last
+        i = int(u)
+        if i >= last:
+            return data[last]
+        return data[i] + (data[i + 1] - data[i]) * (u - i)
+    return draw
+
+
+def mix(*components):
+    # (weight, sampler) pairs, e.g. a landing/takeoff mix of two service distributions
+    weights = list(itertools.accumulate(w for w, _ in components))
+    samplers = [s for _, s in components]
+    total = weights[-1]
+    return lambda rng: samplers[bisect.bisect_right(weights, rng.random() * total)](rng)
+
+
+def priority_classes(levels=5, weights=None):
+    classes = list(range(1, levels + 1))
+    if weights is None:
+        return lambda rng: rng.randint(1, levels)
+    cum = list(itertools.accumulate(weights))
+    return lambda rng: classes[bisect.bisect_right(cum, rng.random() * cum[-1])]
+
+
+SERVICE_TIMES = {
+    'backend': backend_service_time,
+    'exponential': exponential(),
+    'lognormal': lognormal(),
+}
+
+
+def stream(times, service=backend_service_time, priority=priority_classes(), seed=None,
+           limit=None, first_pid=1, needs=None):
+    rng = random.Random(seed)
+    for pid, t in enumerate(itertools.islice(times, limit), first_pid):
+        if needs is None:
+            yield Arrival(t, pid, priority(rng), service(rng))
+        else:
+            yield Arrival(t, pid, priority(rng), service(rng), needs(rng))
+
+
+def read_trace(path, service=backend_service_time, seed=None, first_pid=1):
+    # CSV rows of time,priority[,service[,needs]]; a '#' line or a non-numeric header is skipped and
+    # a missing service column is drawn from `service`. Read one row at a time, so rows must
+    # already be in time order: an earlier time than the row before raises ValueError.
+    rng = random.Random(seed)
+    pid = first_pid
+    last = -math.inf
+    with open(path, newline='') as fh:
+        reader = csv.reader(fh)
+        for row in reader:
+            if not row or row[0].lstrip().startswith('#'):
+                continue
+            try:
+                t, prio = float(row[0]), int(row[1])
+                d = float(row[2]) if len(row) > 2 and row[2].strip() else service(rng)
+                needs = int(row[3], 0) if len(row) > 3 and row[3].strip() else 0
+            except (ValueError, IndexError):
+                continue
+            if t < last:
+                raise ValueError(f"{path}:{reader.line_num}: arrival at {t} is before the "
+                                 f"previous row's {last}; trace rows must be in time order")
+            last = t
+            yield Arrival(t, pid, prio, d, needs)
+            pid += 1
+
+
+def _floats(text):
+    return [float(x) for x in text.split('/')]
+
+
+def from_spec(spec, seed=None):
+    # "poisson:rate=0.9,service=lognormal,levels=5,limit=100000"
+    # "mmpp:rates=0.5/2.5,dwell=120/20"   "trace:arrivals.csv"
+    # service= also accepts empirical:<file of one runway time per line>
+    kind, _, rest = spec.partition(':')
+    if kind == 'trace':
+        return read_trace(rest, seed=seed)
+    opts = dict(item.split('=', 1) for item in rest.split(',') if item)
+    rng = random.Random(seed)
+    if kind == 'poisson':
+        times = poisson(float(opts.pop('rate', 1.0)), rng)
+    elif kind == 'mmpp':
+        times = mmpp(_floats(opts.pop('rates')), _floats(opts.pop('dwell')), rng)
+    else:
+        raise ValueError(f"unknown workload {kind!r}, expected poisson, mmpp or trace")
+    service = opts.pop('service', 'backend')
+    if service.startswith('empirical:'):
+        with open(service.partition(':')[2]) as fh:
+            service = empirical(line for line in fh if line.strip())
+    else:
+        service = SERVICE_TIMES[service]
+    priority = priority_classes(int(opts.pop('levels', 5)))
+    limit = int(opts.pop('limit')) if 'limit' in opts else None
+    if opts:
+        raise ValueError(f"unknown workload options: {', '.join(opts)}")
+    return stream(times, service, priority, rng.getrandbits(64), limit)